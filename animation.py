@@ -0,0 +1,81 @@
+import math
+
+# =======================================================================================
+# BỘ LẬP LỊCH HOẠT ẢNH KHÔNG CHẶN
+# Mỗi bước là một hàm vẽ; các bước chạy bằng chuỗi root.after(ms, ...) thay vì
+# root.update() + root.after(delay) chặn vòng lặp sự kiện. Tốc độ cao hoặc đường đi dài thì
+# nhiều bước được gộp vào một khung hình để tổng thời gian không vượt quá MAX_SECONDS.
+# =======================================================================================
+FRAME_MS = 16
+MAX_SECONDS = 10.0
+
+class Animator:
+    def __init__(self, root, speed=4.0):
+        self.root = root; self.speed = speed   # speed: số bước mỗi giây
+        self.steps = None; self.pos = 0; self.after_id = None
+        self.paused = False; self.pending = []
+
+    @property
+    def active(self): return self.steps is not None
+
+    def play(self, steps):
+        self.stop()
+        self.steps = list(steps); self.pos = 0; self.paused = False
+        self._schedule(0)
+
+    # Số bước mỗi khung hình và khoảng cách giữa hai khung (ms)
+    def frame(self):
+        interval = 1000.0 / max(self.speed, 1e-3); delay = max(interval, FRAME_MS)
+        per = math.ceil(delay / interval)
+        frames = MAX_SECONDS * 1000.0 / delay
+        return max(per, math.ceil(len(self.steps) / frames)), int(delay)
+
+    def _schedule(self, ms):
+        if self.after_id is None: self.after_id = self.root.after(ms, self._tick)
+
+    def _cancel(self):
+        if self.after_id is not None: self.root.after_cancel(self.after_id); self.after_id = None
+
+    def _tick(self):
+        self.after_id = None
+        if self.paused or not self.active: return
+        n, delay = self.frame(); end = min(len(self.steps), self.pos + n)
+        while self.pos < end: self.steps[self.pos](); self.pos += 1
+        if self.pos >= len(self.steps): self._finish()
+        else: self._schedule(delay)
+
+    def _finish(self):
+        self.steps = None; self._cancel()
+        cbs, self.pending = self.pending, []
+        self._run(cbs)
+
+    @staticmethod
+    def _run(cbs):
+        for cb in cbs: cb()
+
+    def pause(self):
+        if self.active and not self.paused: self.paused = True; self._cancel()
+
+    def resume(self):
+        if self.active and self.paused: self.paused = False; self._schedule(0)
+
+    def toggle(self): self.resume() if self.paused else self.pause()
+
+    # Vẽ ngay các bước còn lại
+    def skip(self):
+        if not self.active: return
+        while self.pos < len(self.steps): self.steps[self.pos](); self.pos += 1
+        self._finish()
+
+    # Hủy các bước còn lại (vd. canvas bị vẽ lại); hàm chờ trong then() vẫn được gọi
+    def stop(self):
+        if not self.active: return
+        self.steps = None; self._cancel()
+        if self.pending:
+            cbs, self.pending = self.pending, []
+            self.root.after_idle(self._run, cbs)
+
+    # Gọi fn khi hoạt ảnh hiện tại kết thúc (ngay lập tức nếu không có hoạt ảnh)
+    def then(self, fn):
+        if self.active: self.pending.append(fn)
+        else: fn()
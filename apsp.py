@@ -0,0 +1,136 @@
+import heapq
+import weakref
+from array import array
+from collections import deque
+
+from model import MIXED, TOL
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# =======================================================================================
+# ĐƯỜNG ĐI NGẮN NHẤT MỌI CẶP (bao đóng metric cho TSP, bảng khoảng cách trong giao diện)
+# - DIJKSTRA: Dijkstra từ mọi đỉnh trên cùng một CSR, O(V (V + E) log V).
+# - JOHNSON: có trọng số âm — thế vị h từ SPFA (nguồn ảo nối mọi đỉnh), trọng số mới
+#   w + h[u] - h[v] >= 0 rồi chạy như DIJKSTRA.
+# - FLOYD: Floyd-Warshall vector hóa bằng NumPy (mỗi k một phép toán trên cả ma trận), hợp
+#   với đồ thị dày; không có NumPy thì AUTO không chọn.
+# Kết quả là DistanceMatrix: dist (array 'd', n*n, vô cực = không tới được) và pred (array
+# 'i', đỉnh liền trước j trên đường i -> j, -1 nếu không có), n = số ô đỉnh (ô đã xóa là
+# hàng / cột vô cực). cached() giữ kết quả theo Graph.version (đổi trọng số / cạnh / đỉnh đều
+# tăng version; dời đỉnh không ảnh hưởng khoảng cách). Chu trình âm: ValueError.
+# =======================================================================================
+AUTO, DIJKSTRA, JOHNSON, FLOYD = "auto", "dijkstra", "johnson", "floyd"
+FLOYD_LIMIT = 1000
+DENSE = 0.2          # tỉ lệ số cạnh / số cặp đỉnh để coi là dày
+INF = float("inf")
+
+class DistanceMatrix:
+    __slots__ = ("n", "dist", "pred", "method", "version", "complete")
+
+    def __init__(self, n, dist, pred, method, version, complete=True):
+        self.n = n; self.dist = dist; self.pred = pred; self.method = method
+        self.version = version; self.complete = complete
+
+    def d(self, i, j): return self.dist[i * self.n + j]
+    def row(self, i): return self.dist[i * self.n:(i + 1) * self.n]
+
+    def path(self, i, j):
+        n, pred = self.n, self.pred
+        if self.dist[i * n + j] == INF: return None
+        p = [j]
+        while j != i: j = pred[i * n + j]; p.append(j)
+        return p[::-1]
+
+def _negative(graph): return any(w < 0 for w in graph.edges.w)
+
+# Thế vị Johnson: SPFA với mọi đỉnh xuất phát ở 0 (tương đương nguồn ảo), chu trình âm khi
+# đường tới một đỉnh vượt quá n cạnh
+def potentials(graph, budget=None):
+    c = graph.csr(MIXED); off, nbr, wt, n = c.off, c.nbr, c.wt, c.n
+    h = [0.0] * n; hops = [0] * n; inq = bytearray(b"\1" * n); q = deque(range(n))
+    while q:
+        if budget and budget.expired(): return None
+        u = q.popleft(); inq[u] = 0; hu = h[u]
+        for k in range(off[u], off[u + 1]):
+            v = nbr[k]; nh = hu + wt[k]
+            if nh < h[v] and h[v] - nh > TOL * (1 + abs(nh)):
+                h[v] = nh; hops[v] = hops[u] + 1
+                if hops[v] > n: raise ValueError("Đồ thị có chu trình âm — không có đường đi ngắn nhất")
+                if not inq[v]: inq[v] = 1; q.append(v)
+    return h
+
+def _dijkstra_rows(graph, method, budget=None):
+    c = graph.csr(MIXED); off, nbr, wt, n = c.off, c.nbr, c.wt, c.n; alive = graph.nodes.alive
+    dist = array('d', [INF]) * (n * n); pred = array('i', [-1]) * (n * n); complete = True; pops = 0
+    h = potentials(graph, budget) if method == JOHNSON else None
+    if method == JOHNSON and h is None: return dist, pred, False
+    if h is not None: wt = array('d', (max(0.0, wt[k] + h[u] - h[nbr[k]]) for u in range(n) for k in range(off[u], off[u + 1])))
+    for s in range(n):
+        if not alive[s]: continue
+        if budget and budget.expired(): complete = False; break
+        base = s * n; dist[base + s] = 0.0; pq = [(0.0, s)]
+        while pq:
+            d, u = heapq.heappop(pq); pops += 1
+            if d > dist[base + u]: continue
+            for k in range(off[u], off[u + 1]):
+                v = nbr[k]; nd = d + wt[k]
+                if nd < dist[base + v]: dist[base + v] = nd; pred[base + v] = u; heapq.heappush(pq, (nd, v))
+        if h is not None:
+            hs = h[s]
+            for v in range(n):
+                if dist[base + v] != INF: dist[base + v] += h[v] - hs
+    if budget: budget.tally(sources=n if complete else s, pops=pops)
+    return dist, pred, complete
+
+def _floyd(graph, budget=None):
+    n = len(graph.nodes); E = graph.edges
+    D = np.full((n, n), np.inf); P = np.full((n, n), -1, dtype=np.int32)
+    for u, v, w, d in zip(E.u, E.v, E.w, E.d):
+        if w < D[u, v]: D[u, v] = w; P[u, v] = u
+        if not d and w < D[v, u]: D[v, u] = w; P[v, u] = v
+    live = np.frombuffer(bytes(graph.nodes.alive), dtype=np.uint8).astype(bool); idx = np.flatnonzero(live)
+    D[idx, idx] = np.minimum(D[idx, idx], 0.0); complete = True
+    for k in range(n):
+        if budget and budget.expired(): complete = False; break
+        alt = D[:, k, None] + D[None, k, :]; better = alt < D
+        if better.any(): D = np.where(better, alt, D); P = np.where(better, P[k][None, :], P)
+    if complete and (np.diag(D) < 0).any(): raise ValueError("Đồ thị có chu trình âm — không có đường đi ngắn nhất")
+    for i in idx: P[i, i] = -1
+    if budget: budget.tally(pivots=k + 1 if n else 0)
+    dist = array('d'); dist.frombytes(np.ascontiguousarray(D, dtype=np.float64).tobytes())
+    pred = array('i'); pred.frombytes(np.ascontiguousarray(P, dtype=np.int32).tobytes())
+    return dist, pred, complete
+
+def choose(graph):
+    n = graph.nodes.count; m = len(graph.edges)
+    if np is not None and n <= FLOYD_LIMIT and m >= DENSE * n * (n - 1) / 2: return FLOYD
+    return JOHNSON if _negative(graph) else DIJKSTRA
+
+def all_pairs(graph, method=AUTO, budget=None):
+    if method == AUTO: method = choose(graph)
+    if method == FLOYD and np is None: raise ValueError("Floyd-Warshall cần NumPy (pip install numpy)")
+    if method == DIJKSTRA and _negative(graph): method = JOHNSON
+    dist, pred, complete = _floyd(graph, budget) if method == FLOYD else _dijkstra_rows(graph, method, budget)
+    return DistanceMatrix(len(graph.nodes), dist, pred, method, graph.version, complete)
+
+_cache = weakref.WeakKeyDictionary()
+
+# Kết quả đầy đủ đã có cho graph ở version hiện tại (None nếu chưa có / đã cũ)
+def lookup(graph):
+    D = _cache.get(graph)
+    return D if D is not None and D.version == graph.version and len(graph.nodes) == D.n else None
+
+# Ghi nhận kết quả tính ở nơi khác (vd. tiến trình con trên bản chụp) cho graph ở version hiện tại
+def store(graph, D):
+    D.version = graph.version
+    if D.complete: _cache[graph] = D
+
+# Như all_pairs nhưng dùng lại kết quả đầy đủ gần nhất khi đồ thị chưa đổi version
+def cached(graph, method=AUTO, budget=None):
+    D = lookup(graph)
+    if D is not None: return D
+    D = all_pairs(graph, method, budget); store(graph, D)
+    return D
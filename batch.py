@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+
+from model import MIXED, TOL, Budget
+
+# =======================================================================================
+# TRUY VẤN ĐƯỜNG ĐI NGẮN NHẤT HÀNG LOẠT TRÊN NHIỀU TIẾN TRÌNH
+# shortest_paths(graph, pairs) nhận danh sách / iterator các cặp (s, e), đọc từng cửa sổ
+# WINDOW cặp, gom theo nguồn và mỗi nguồn chạy một lần Dijkstra (dừng khi đã chốt mọi đích
+# của nguồn đó; trọng số âm: SPFA, chu trình âm -> ValueError). Kết quả trả về dạng generator
+# (s, e, đường đi, chi phí) theo thứ tự xong trước — không theo thứ tự đầu vào.
+# CSR MIXED (off, nbr, wt) được chép một lần vào một khối SharedMemory; các tiến trình con
+# gắn vào khối đó qua initializer và chỉ đọc, nên không phải gửi đồ thị theo từng việc. Số
+# việc đang chạy giới hạn ở AHEAD * workers để đầu vào được đọc dần. workers=1 hoặc không
+# tạo được tiến trình / bộ nhớ chung: chạy ngay trong tiến trình hiện tại.
+# Hết giờ / hủy (budget): báo cho các tiến trình con qua multiprocessing.Event và dừng.
+# =======================================================================================
+WINDOW = 4096
+AHEAD = 4
+INF = float("inf")
+_CSR = None
+_SHM = None
+_CANCEL = None
+
+class SharedCSR:
+    # Bố cục khối: off (q, n + 1) | nbr (q, m) | wt (d, m)
+    def __init__(self, c):
+        n, m = c.n, len(c.nbr); self.n = n; self.m = m
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * (n + 1 + 2 * m)))
+        buf = self.shm.buf; pos = 0
+        for a in (c.off, c.nbr, c.wt):
+            k = 8 * len(a); buf[pos:pos + k] = memoryview(a).cast('B'); pos += k
+        del buf
+
+    @property
+    def name(self): return self.shm.name
+
+    def close(self): self.shm.close(); self.shm.unlink()
+
+def _views(buf, n, m):
+    a = 8 * (n + 1); b = a + 8 * m
+    return buf[:a].cast('q'), buf[a:b].cast('q'), buf[b:b + 8 * m].cast('d')
+
+def _init(name, n, m, negative, event):
+    global _CSR, _SHM, _CANCEL
+    _SHM = shared_memory.SharedMemory(name=name); _CANCEL = event
+    _CSR = _views(_SHM.buf, n, m) + (n, negative)
+
+# Một nguồn, nhiều đích: [(e, đường đi, chi phí)], số đỉnh đã lấy ra khỏi hàng đợi
+def _search(off, nbr, wt, n, negative, s, targets, budget=None):
+    dist = {s: 0.0}; par = {s: -1}; pops = 0
+    if negative:
+        # SPFA; đường tới một đỉnh vượt quá n cạnh = có chu trình âm tới được từ s
+        hops = {s: 0}; inq = {s}; q = deque([s])
+        while q:
+            if budget and budget.expired(): break
+            u = q.popleft(); inq.discard(u); du = dist[u]; pops += 1
+            for k in range(off[u], off[u + 1]):
+                v = nbr[k]; nd = du + wt[k]
+                if nd < dist.get(v, INF) and dist.get(v, INF) - nd > TOL * (1 + abs(nd)):
+                    dist[v] = nd; par[v] = u; hops[v] = hops[u] + 1
+                    if hops[v] > n: raise ValueError("Có chu trình âm tới được từ nguồn — không có đường đi ngắn nhất")
+                    if v not in inq: inq.add(v); q.append(v)
+    else:
+        left = set(targets); left.discard(s); pq = [(0.0, s)]; done = set()
+        while pq and left:
+            if budget and budget.expired(): break
+            d, u = heapq.heappop(pq); pops += 1
+            if u in done: continue
+            done.add(u); left.discard(u)
+            for k in range(off[u], off[u + 1]):
+                v = nbr[k]; nd = d + wt[k]
+                if nd < dist.get(v, INF): dist[v] = nd; par[v] = u; heapq.heappush(pq, (nd, v))
+    out = []
+    for e in targets:
+        if e == s: out.append((e, [s], 0)); continue
+        if e not in dist: out.append((e, None, INF)); continue
+        p = [e]; x = e
+        while x != s: x = par[x]; p.append(x)
+        out.append((e, p[::-1], dist[e]))
+    return out, pops
+
+def _task(s, targets):
+    off, nbr, wt, n, negative = _CSR
+    res, pops = _search(off, nbr, wt, n, negative, s, targets, Budget(event=_CANCEL))
+    return s, res, pops
+
+def _groups(it, window):
+    while True:
+        chunk = list(itertools.islice(it, window))
+        if not chunk: return
+        by = {}
+        for s, e in chunk: by.setdefault(s, []).append(e)
+        yield from by.items()
+
+def _pool(shared, workers, negative, event):
+    try:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init,
+                                   initargs=(shared.name, shared.n, shared.m, negative, event))
+    except (OSError, ImportError, NotImplementedError): return None
+
+def shortest_paths(graph, pairs, workers=None, budget=None, window=WINDOW):
+    c = graph.csr(MIXED); negative = any(w < 0 for w in graph.edges.w)
+    workers = workers or os.cpu_count() or 1; it = iter(pairs)
+    sources = 0; answered = 0; pops = 0
+    shared = pool = None
+    if workers > 1:
+        try:
+            shared = SharedCSR(c); event = mp.Event(); pool = _pool(shared, workers, negative, event)
+        except OSError: pool = None
+        if pool is None and shared is not None: shared.close(); shared = None
+    try:
+        if pool is None:
+            for s, targets in _groups(it, window):
+                if budget and budget.expired(): return
+                res, k = _search(c.off, c.nbr, c.wt, c.n, negative, s, targets, budget)
+                if budget and budget.stopped: return
+                sources += 1; pops += k; answered += len(res)
+                for e, p, d in res: yield s, e, p, d
+            return
+        pending = set(); groups = _groups(it, window); more = True
+        while more or pending:
+            while more and len(pending) < AHEAD * workers:
+                g = next(groups, None)
+                if g is None: more = False
+                else: pending.add(pool.submit(_task, *g))
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            if budget and (budget.stopped or budget.check()): return
+            for f in done:
+                s, res, k = f.result()
+                sources += 1; pops += k; answered += len(res)
+                for e, p, d in res: yield s, e, p, d
+    finally:
+        if pool is not None: event.set(); pool.shutdown(wait=True, cancel_futures=True)
+        if shared is not None: shared.close()
+        if budget: budget.tally(sources=sources, pairs=answered, pops=pops)
+
+# Như shortest_paths nhưng gom hết thành danh sách (cli, bench)
+def solve(graph, pairs, workers=None, budget=None):
+    return list(shortest_paths(graph, [tuple(p) for p in pairs], workers, budget))
@@ -0,0 +1,127 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from model import Budget
+import generators as gen
+import apsp
+import batch
+import ch
+import flow
+import sssp
+import tsp
+
+# =======================================================================================
+# BENCHMARK CÁC THUẬT TOÁN CỦA Graph
+#   python -m bench --scale small -o new.json
+#   python -m bench --scale small --compare old.json     (mã thoát 1 nếu có hồi quy)
+# Mỗi trường hợp: sinh đồ thị (ngoài phần đo), chạy `repeat` lần lấy thời gian nhỏ nhất, rồi
+# chạy thêm một lần dưới tracemalloc để lấy đỉnh bộ nhớ. Bộ đệm CSR được xóa trước mỗi lần
+# đo nên thời gian gồm cả việc dựng danh sách kề. Báo cáo JSON so sánh theo khóa (case, n).
+# Bộ đếm thao tác (Budget.counters) của lần chạy cuối được ghi kèm để giải thích chênh lệch.
+# =======================================================================================
+SCALES = {"tiny": 0.1, "small": 1, "medium": 10, "large": 100}
+CASE_SECONDS = 60.0
+
+def _euler_start(g):
+    return g.get_euler_status()[2]
+
+# (tên thuật toán, bộ sinh, n cơ sở, n tối đa, hàm chạy(graph, budget))
+CASES = [
+    ("bfs", "geometric", 2000, None, lambda g, b: g.bfs(0, budget=b)),
+    ("dfs", "geometric", 2000, None, lambda g, b: g.dfs(0, budget=b)),
+    ("dijkstra", "geometric", 2000, None, lambda g, b: g.dijkstra(0, len(g.nodes) - 1, budget=b)),
+    ("dijkstra", "scale_free", 2000, None, lambda g, b: g.dijkstra(0, len(g.nodes) - 1, budget=b)),
+    ("shortest_tree", "geometric", 2000, None, lambda g, b: sssp.shortest_tree(g, 0, budget=b)),
+    ("batch_paths", "geometric", 2000, None, lambda g, b: batch.solve(g, [(i % 20, i * 7919 % len(g.nodes)) for i in range(500)], budget=b)),
+    ("ch_build", "geometric", 2000, 20000, lambda g, b: ch.build(g, budget=b)),
+    ("astar", "geometric", 2000, None, lambda g, b: g.astar(0, len(g.nodes) - 1, budget=b)),
+    ("bidirectional_dijkstra", "geometric", 2000, None, lambda g, b: g.bidirectional_dijkstra(0, len(g.nodes) - 1, budget=b)),
+    ("bellman_ford", "erdos_renyi", 300, None, lambda g, b: g.bellman_ford(0, len(g.nodes) - 1, budget=b)),
+    ("spfa", "erdos_renyi", 300, None, lambda g, b: g.spfa(0, len(g.nodes) - 1, budget=b)),
+    ("all_pairs", "geometric", 200, 2000, lambda g, b: apsp.all_pairs(g, apsp.DIJKSTRA, budget=b)),
+    ("all_pairs", "erdos_renyi", 200, 1000, lambda g, b: apsp.all_pairs(g, apsp.JOHNSON, budget=b)),
+    ("prim", "geometric", 2000, None, lambda g, b: g.prim(budget=b)),
+    ("kruskal", "geometric", 2000, None, lambda g, b: g.kruskal(budget=b)),
+    ("ford_fulkerson", "grid", 2000, None, lambda g, b: g.ford_fulkerson(0, len(g.nodes) - 1, budget=b)),
+    ("push_relabel", "geometric", 2000, None, lambda g, b: flow.max_flow(g, 0, len(g.nodes) - 1, flow.PUSH_RELABEL, budget=b)),
+    ("hierholzer_algo", "eulerian", 2000, None, lambda g, b: g.hierholzer_algo(_euler_start(g), budget=b)),
+    ("fleury_algo", "eulerian", 2000, None, lambda g, b: g.fleury_algo(_euler_start(g), budget=b)),
+    ("check_bipartite", "grid", 2000, None, lambda g, b: g.check_bipartite(budget=b)),
+    ("check_hamilton", "hamiltonian", 16, 40, lambda g, b: g.check_hamilton(budget=b)),
+    ("check_hamilton_path", "hamiltonian", 16, 40, lambda g, b: g.check_hamilton_path(budget=b)),
+    ("tsp", "complete_euclidean", 200, 20000, lambda g, b: tsp.solve(g, metric=tsp.EUCLID, budget=b)),
+]
+
+def build(kind, n, seed=0):
+    if kind == "grid":
+        side = max(2, int(round(n ** 0.5))); return gen.grid_graph(side, side, seed=seed)
+    if kind == "erdos_renyi": return gen.erdos_renyi(n, m=4 * n, seed=seed)
+    return gen.GENERATORS[kind](n, seed=seed)
+
+def measure(fn, g, repeat=3, seconds=CASE_SECONDS):
+    best = None; timed_out = False; counters = {}
+    for _ in range(repeat):
+        g.invalidate_csr(); gc.collect(); b = Budget(seconds)
+        t = time.perf_counter(); fn(g, b); dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt); timed_out |= b.timed_out; counters = b.counters
+    g.invalidate_csr(); gc.collect(); tracemalloc.start()
+    try: fn(g, Budget(seconds)); peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    return best, peak, timed_out, counters
+
+def run(scale="small", repeat=3, only=None, seed=0, log=None):
+    f = SCALES[scale]; results = []
+    for name, kind, base, cap, fn in CASES:
+        if only and name not in only: continue
+        n = max(4, int(base * f))
+        if cap: n = min(n, cap)
+        t = time.perf_counter(); g = build(kind, n, seed); build_s = time.perf_counter() - t
+        sec, peak, timed_out, counters = measure(fn, g, repeat)
+        r = {"case": f"{name}/{kind}", "algorithm": name, "generator": kind, "n": g.nodes.count, "m": len(g.edges),
+             "seconds": sec, "peak_bytes": peak, "build_seconds": build_s, "timed_out": timed_out, "counters": counters}
+        results.append(r)
+        if log: log(f"{r['case']:<36} n={r['n']:<7} m={r['m']:<8} {sec * 1000:10.2f} ms  {peak / 1024:10.1f} KiB" + ("  (hết giờ)" if timed_out else ""))
+    return {"meta": {"python": sys.version.split()[0], "platform": platform.platform(), "scale": scale,
+                     "repeat": repeat, "seed": seed, "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+# So sánh với báo cáo cũ: trả về danh sách (case, n, tỉ lệ thời gian, tỉ lệ bộ nhớ) vượt ngưỡng
+def compare(old, new, threshold=1.25, min_seconds=1e-3):
+    base = {(r["case"], r["n"]): r for r in old["results"]}; out = []
+    for r in new["results"]:
+        o = base.get((r["case"], r["n"]))
+        if not o: continue
+        rt = r["seconds"] / o["seconds"] if o["seconds"] > 0 else 1.0
+        rm = r["peak_bytes"] / o["peak_bytes"] if o["peak_bytes"] > 0 else 1.0
+        slow = rt > threshold and r["seconds"] > min_seconds
+        out.append((r["case"], r["n"], rt, rm, slow or rm > threshold))
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench", description="Benchmark các thuật toán đồ thị.")
+    ap.add_argument("--scale", choices=sorted(SCALES, key=SCALES.get), default="small")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--only", nargs="*", help="chỉ chạy các thuật toán này")
+    ap.add_argument("-o", "--output", help="ghi báo cáo JSON")
+    ap.add_argument("--compare", help="báo cáo JSON cũ để so sánh")
+    ap.add_argument("--threshold", type=float, default=1.25, help="tỉ lệ chậm hơn / tốn bộ nhớ hơn bị coi là hồi quy")
+    args = ap.parse_args(argv)
+    report = run(args.scale, args.repeat, args.only, args.seed, log=lambda s: print(s, file=sys.stderr))
+    if args.output:
+        with open(args.output, "w") as f: json.dump(report, f, indent=1)
+    else: print(json.dumps(report, indent=1))
+    if not args.compare: return 0
+    with open(args.compare) as f: old = json.load(f)
+    rows = compare(old, report, args.threshold); bad = [r for r in rows if r[4]]
+    for case, n, rt, rm, flag in rows:
+        print(f"{case:<36} n={n:<7} thời gian x{rt:5.2f}  bộ nhớ x{rm:5.2f}" + ("  <-- HỒI QUY" if flag else ""), file=sys.stderr)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
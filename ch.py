@@ -0,0 +1,222 @@
+import argparse
+import hashlib
+import heapq
+import os
+import struct
+import sys
+import weakref
+from array import array
+
+from model import MIXED
+
+# =======================================================================================
+# CONTRACTION HIERARCHY (CH) CHO TRUY VẤN ĐIỂM - ĐIỂM LẶP LẠI TRÊN ĐỒ THỊ ÍT THAY ĐỔI
+# Tiền xử lý: co lần lượt các đỉnh theo độ ưu tiên "hiệu số cạnh" (số cạnh tắt cần thêm - số
+# cạnh bị bỏ + số láng giềng đã co), cập nhật lười bằng heap. Khi co x, mỗi cặp u -> x -> v
+# không có đường chứng kiến (Dijkstra cục bộ tránh x, giới hạn SETTLE đỉnh) ngắn hơn hoặc bằng
+# thì thêm cạnh tắt u -> v qua x. Truy vấn: Dijkstra hai chiều chỉ đi lên theo hạng, rồi bung
+# các cạnh tắt thành đường đi gốc — cùng chi phí với Graph.dijkstra (đường đi có thể khác khi
+# có nhiều đường ngắn nhất bằng nhau). Chỉ dùng cho trọng số không âm (MIXED: cạnh vô hướng
+# là hai cung).
+# Lưu cạnh file đồ thị: "<file>.ch" (nhị phân, kèm dấu vân tay nội dung cạnh). hierarchy()
+# giữ CH theo Graph.version, nên add_edge / remove_edge / đổi trọng số làm CH cũ mất hiệu lực
+# và được dựng lại ở lần truy vấn sau.
+# =======================================================================================
+SETTLE = 200
+SUFFIX = ".ch"
+MAGIC = b"TSCH"
+FORMAT = 1
+HEADER = struct.Struct("<4sHHqq32s")   # magic, phiên bản, (dự trữ), n, số cung, dấu vân tay
+SWAP = sys.byteorder != "little"
+INF = float("inf")
+
+def fingerprint(graph):
+    h = hashlib.blake2b(digest_size=32); N, E = graph.nodes, graph.edges
+    h.update(struct.pack("<q", len(N))); h.update(bytes(N.alive))
+    for a in (E.u, E.v, E.w):
+        if SWAP: a = a[:]; a.byteswap()
+        h.update(a)
+    h.update(bytes(E.d))
+    return h.digest()
+
+class Hierarchy:
+    # rank: thứ tự co; cung (au, av, aw, amid) gồm cung gốc và cạnh tắt (amid = đỉnh giữa, -1 nếu gốc)
+    def __init__(self, n, rank, au, av, aw, amid, fp=b"", version=None):
+        self.n = n; self.rank = rank; self.au = au; self.av = av; self.aw = aw; self.amid = amid
+        self.fp = fp; self.version = version
+        up = [[] for _ in range(n)]; down = [[] for _ in range(n)]; self.mid = {}
+        for u, v, w, x in zip(au, av, aw, amid):
+            if rank[u] < rank[v]: up[u].append((v, w))
+            else: down[v].append((u, w))
+            if x >= 0: self.mid[(u, v)] = x
+        self.up = up; self.down = down
+
+    @property
+    def shortcuts(self): return len(self.mid)
+
+    def query(self, s, e, budget=None):
+        if s == e: return [s], 0
+        dist = ({s: 0.0}, {e: 0.0}); par = ({s: None}, {e: None}); pq = ([(0.0, s)], [(0.0, e)])
+        adj = (self.up, self.down); best = INF; meet = None; settled = 0
+        try:
+            while pq[0] or pq[1]:
+                if budget and budget.expired(): return None, INF
+                # Mỗi phía dừng khi đỉnh heap >= đường tốt nhất đã nối được
+                side = 0 if pq[0] and (not pq[1] or pq[0][0][0] <= pq[1][0][0]) else 1
+                d, u = heapq.heappop(pq[side])
+                if d >= best: pq[side].clear(); continue
+                D = dist[side]
+                if d > D[u]: continue
+                settled += 1; other = dist[1 - side]
+                if u in other and d + other[u] < best: best = d + other[u]; meet = u
+                for v, w in adj[side][u]:
+                    nd = d + w
+                    if nd < D.get(v, INF): D[v] = nd; par[side][v] = u; heapq.heappush(pq[side], (nd, v))
+        finally:
+            if budget: budget.tally(settled=settled)
+        if meet is None: return None, INF
+        # s ... meet theo cha phía tiến, meet ... e theo cha phía lùi, rồi bung từng cung
+        fw = []; x = meet
+        while x is not None: fw.append(x); x = par[0][x]
+        nodes = fw[::-1]; x = par[1][meet]
+        while x is not None: nodes.append(x); x = par[1][x]
+        path = [s]
+        for a, b in zip(nodes, nodes[1:]): self._unpack(a, b, path)
+        return path, best
+
+    def _unpack(self, a, b, out):
+        stack = [(a, b)]; mid = self.mid
+        while stack:
+            u, v = stack.pop(); x = mid.get((u, v), -1)
+            if x < 0: out.append(v)
+            else: stack.append((x, v)); stack.append((u, x))
+
+    # --- LƯU / ĐỌC (nhị phân: HEADER | rank[n] au[m] av[m] amid[m] (i8) | aw[m] (f8)) ---
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT, 0, self.n, len(self.au), self.fp))
+            for a in (self.rank, self.au, self.av, self.amid, self.aw):
+                if SWAP: a = a[:]; a.byteswap()
+                f.write(a)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            head = f.read(HEADER.size)
+            if len(head) < HEADER.size: raise ValueError("File CH không hợp lệ")
+            magic, fmt, _, n, m, fp = HEADER.unpack(head)
+            if magic != MAGIC: raise ValueError("File CH không hợp lệ")
+            if fmt != FORMAT: raise ValueError(f"Không hỗ trợ phiên bản CH {fmt}")
+            cols = []
+            for code, k in (('q', n), ('q', m), ('q', m), ('q', m), ('d', m)):
+                a = array(code)
+                try: a.fromfile(f, k)
+                except EOFError: raise ValueError("File CH bị cắt cụt")
+                if SWAP: a.byteswap()
+                cols.append(a)
+        rank, au, av, amid, aw = cols
+        return cls(n, rank, au, av, aw, amid, fp)
+
+# --- TIỀN XỬ LÝ ---
+# Dijkstra cục bộ từ u tránh x; dừng khi vượt limit, đủ settle đỉnh hoặc đã chốt mọi đích
+def _witness(out, u, x, targets, limit, settle):
+    dist = {u: 0.0}; pq = [(0.0, u)]; n = 0; left = len(targets) - (u in targets)
+    while pq and n < settle and left > 0:
+        d, a = heapq.heappop(pq)
+        if d > dist[a]: continue
+        if d > limit: break
+        n += 1
+        if a in targets and a != u: left -= 1
+        for b, w in out[a].items():
+            if b == x: continue
+            nd = d + w
+            if nd < dist.get(b, INF): dist[b] = nd; heapq.heappush(pq, (nd, b))
+    return dist
+
+def _shortcuts(out, inn, x, settle):
+    res = []; targets = out[x]
+    if not targets: return res
+    top = max(targets.values())
+    for u, wu in inn[x].items():
+        dist = _witness(out, u, x, targets, wu + top, settle)
+        for v, wv in targets.items():
+            if v != u and dist.get(v, INF) > wu + wv: res.append((u, v, wu + wv))
+    return res
+
+def build(graph, budget=None, settle=SETTLE):
+    E = graph.edges; n = len(graph.nodes)
+    if any(w < 0 for w in E.w): raise ValueError("Contraction hierarchy cần trọng số không âm")
+    c = graph.csr(MIXED); out = [dict() for _ in range(n)]; inn = [dict() for _ in range(n)]
+    for u in range(n):
+        for v, w in c.row(u):
+            if v != u and w < out[u].get(v, INF): out[u][v] = w; inn[v][u] = w
+    mid = {}; deleted = [0] * n; done = bytearray(n); rank = array('q', [0]) * n
+    au = array('q'); av = array('q'); aw = array('d'); amid = array('q'); added = 0
+    def priority(x, sc): return len(sc) - len(out[x]) - len(inn[x]) + deleted[x]
+    pq = [(priority(x, _shortcuts(out, inn, x, settle)), x) for x in range(n)]; heapq.heapify(pq); r = 0
+    while pq:
+        if budget and budget.expired(): return None
+        p, x = heapq.heappop(pq)
+        if done[x]: continue
+        # Cập nhật lười: tính lại độ ưu tiên, còn lớn hơn đỉnh heap thì đẩy lại
+        sc = _shortcuts(out, inn, x, settle); q = priority(x, sc)
+        if pq and q > pq[0][0]: heapq.heappush(pq, (q, x)); continue
+        # Co x: các cung còn lại của x thành cung của hierarchy, rồi thêm cạnh tắt
+        for u, v, w in sc:
+            if w < out[u].get(v, INF): out[u][v] = w; inn[v][u] = w; mid[(u, v)] = x; added += 1
+        for v, w in out[x].items():
+            au.append(x); av.append(v); aw.append(w); amid.append(mid.get((x, v), -1)); del inn[v][x]; deleted[v] += 1
+        for u, w in inn[x].items():
+            au.append(u); av.append(x); aw.append(w); amid.append(mid.get((u, x), -1)); del out[u][x]; deleted[u] += 1
+        out[x] = {}; inn[x] = {}; done[x] = 1; rank[x] = r; r += 1
+        if budget: budget.report(r / n)
+    if budget: budget.tally(contracted=r, shortcuts=added)
+    return Hierarchy(n, rank, au, av, aw, amid, fingerprint(graph), graph.version)
+
+# --- BỘ ĐỆM THEO ĐỒ THỊ ---
+_cache = weakref.WeakKeyDictionary()
+
+def valid(h, graph): return h is not None and h.version == graph.version and h.n == len(graph.nodes)
+
+# CH còn hiệu lực của graph, dựng lại nếu đồ thị đã đổi version (None nếu budget dừng giữa chừng)
+def hierarchy(graph, budget=None):
+    h = _cache.get(graph)
+    if valid(h, graph): return h
+    h = build(graph, budget)
+    if h is not None: _cache[graph] = h
+    return h
+
+# Dùng "<path>.ch" nếu dấu vân tay khớp với đồ thị, không thì dựng và ghi lại file đó
+def for_file(graph, path, budget=None):
+    side = path + SUFFIX; fp = fingerprint(graph)
+    if os.path.exists(side):
+        try:
+            h = Hierarchy.load(side)
+            if h.fp == fp and h.n == len(graph.nodes):
+                h.version = graph.version; _cache[graph] = h
+                return h
+        except (OSError, ValueError): pass
+    h = hierarchy(graph, budget)
+    if h is not None: h.save(side)
+    return h
+
+# Như Graph.dijkstra(s, e) nhưng qua CH của đồ thị
+def query(graph, s, e, budget=None):
+    h = hierarchy(graph, budget)
+    if h is None: return None, INF
+    return h.query(s, e, budget)
+
+def main(argv=None):
+    import cli
+    ap = argparse.ArgumentParser(prog="python -m ch", description="Dựng contraction hierarchy và lưu cạnh file đồ thị (<file>.ch).")
+    ap.add_argument("file")
+    args = ap.parse_args(argv)
+    try:
+        g = cli.load(args.file); h = for_file(g, args.file)
+    except (OSError, ValueError) as e:
+        print(f"lỗi: {e}", file=sys.stderr); return 2
+    print(f"{args.file}{SUFFIX}: {h.n} đỉnh, {len(h.au)} cung, {h.shortcuts} cạnh tắt", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
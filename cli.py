@@ -0,0 +1,154 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+from model import Graph, Budget, Edge
+import apsp
+import batch
+import ch
+import flow
+import sssp
+import graphio
+import importers
+import instrument
+import tsp
+
+# =======================================================================================
+# CHẠY KHÔNG GIAO DIỆN (không import tkinter)
+#   python -m cli graph.tspg dijkstra s=0 e=5 --time-limit 10
+#   python -m cli --list
+# Đọc file (.tspg / .json qua graphio; .tsp / .atsp / .gr / .csv ... qua importers), chạy một
+# thuật toán theo tên với tham số key=value và in kết quả JSON kèm thời gian.
+# Dùng từ Python: load(path) -> Graph, run(graph, name, params, seconds) -> dict.
+# batch_paths pairs=[[s, e], ...] workers=N: nhiều cặp một lần trên nhiều tiến trình (batch.py).
+# ch_query dùng contraction hierarchy lưu cạnh file ("<file>.ch", dựng và ghi nếu thiếu / cũ).
+# Kết quả kèm "counters" (bộ đếm thao tác, xem instrument.py); --profile thêm bảng cProfile.
+# =======================================================================================
+IMPORT_EXT = {".tsp", ".atsp", ".gr", ".csv", ".txt", ".edges"}
+
+def load(path, budget=None):
+    g = Graph()
+    if os.path.splitext(path)[1].lower() in IMPORT_EXT: importers.read(g, path, budget=budget)
+    else: g.restore(*graphio.load(path))
+    return g
+
+def _euler(method):
+    def fn(g, start=None, budget=None):
+        kind, msg, s = g.get_euler_status()
+        if not kind: return {"euler": False, "status": msg, "path": []}
+        return {"euler": True, "status": msg, "path": getattr(g, method)(s if start is None else start, budget=budget)}
+    return fn
+
+def _path_cost(res):
+    p, c = res; return {"path": p, "cost": c}
+
+def _mst(res):
+    e, w = res; return {"edges": e, "weight": w}
+
+def _matrix(D):
+    n = D.n; return {"method": D.method, "complete": D.complete, "dist": [list(D.row(i)) for i in range(n)]}
+
+def _found(key):
+    def shape(res):
+        ok, x = res; return {"found": ok, key: x}
+    return shape
+
+# tên -> (hàm(graph, **params, budget), chuyển kết quả sang dict)
+ALGORITHMS = {
+    "bfs": (Graph.bfs, None),
+    "dfs": (Graph.dfs, None),
+    "dijkstra": (Graph.dijkstra, _path_cost),
+    "astar": (Graph.astar, _path_cost),
+    "bidirectional_dijkstra": (Graph.bidirectional_dijkstra, _path_cost),
+    "bellman_ford": (Graph.bellman_ford, _path_cost),
+    "spfa": (Graph.spfa, _path_cost),
+    "prim": (Graph.prim, _mst),
+    "kruskal": (Graph.kruskal, _mst),
+    "hamilton": (Graph.check_hamilton, _found("path")),
+    "hamilton_path": (Graph.check_hamilton_path, _found("path")),
+    "fleury": (_euler("fleury_algo"), None),
+    "hierholzer": (_euler("hierholzer_algo"), None),
+    "bipartite": (Graph.check_bipartite, _found("colors")),
+    "all_pairs": (apsp.all_pairs, _matrix),
+    "shortest_tree": (sssp.shortest_tree, lambda t: {"source": t.source, "dist": list(t.dist), "pred": list(t.pred)}),
+    "ch_query": (ch.query, _path_cost),
+    "batch_paths": (batch.solve, lambda res: [{"s": s, "e": e, "path": p, "cost": c} for s, e, p, c in res]),
+    "paths": (sssp.paths, lambda res: {"complete": res[1], "paths": {t: {"path": p, "cost": c} for t, (p, c) in res[0].items()}}),
+    "max_flow": (flow.max_flow, lambda res: {"flow": res[0], "edge_flows": res[1], "source_side": res[2], "cut": res[3]}),
+    "tsp": (tsp.solve, lambda res: {"tour": res[0], "cost": res[1]}),
+}
+
+# Giá trị JSON: Edge -> [u, v, w, có hướng], vô cực / NaN -> chuỗi, khóa dict -> chuỗi
+def jsonable(x):
+    if isinstance(x, Edge): return [x.u, x.v, x.weight, x.is_directed]
+    if isinstance(x, dict): return {str(k): jsonable(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)): return [jsonable(v) for v in x]
+    if isinstance(x, float) and not math.isfinite(x): return str(x)
+    return x
+
+def parse_params(items):
+    out = {}
+    for item in items:
+        key, sep, val = item.partition("=")
+        if not sep: raise ValueError(f"Tham số phải có dạng key=value: {item}")
+        try: out[key] = json.loads(val)
+        except ValueError: out[key] = val
+    return out
+
+# Tham số là id đỉnh (một đỉnh / danh sách đỉnh / danh sách cặp): phải là đỉnh còn sống của đồ thị
+NODE_PARAMS = {"s", "e", "t", "start", "source", "sink"}
+
+def check_nodes(graph, params):
+    N = graph.nodes
+    def ok(v): return isinstance(v, int) and not isinstance(v, bool) and 0 <= v < len(N) and N.alive[v]
+    for k, v in params.items():
+        if k in NODE_PARAMS: ids = [] if v is None else [v]
+        elif k == "targets": ids = v
+        elif k == "pairs": ids = [x for p in v for x in p]
+        else: continue
+        bad = [x for x in ids if not ok(x)]
+        if bad: raise ValueError(f"Tham số {k}: không có đỉnh {bad[0]!r} (id hợp lệ 0..{len(N) - 1}, trừ đỉnh đã xóa)")
+
+def run(graph, name, params=None, seconds=None, profile=False):
+    if name not in ALGORITHMS: raise ValueError(f"Không có thuật toán '{name}' (xem --list)")
+    check_nodes(graph, params or {})
+    fn, shape = ALGORITHMS[name]
+    res, st = instrument.run(fn, graph, budget=Budget(seconds), profile=profile, name=name, **(params or {}))
+    out = {"algorithm": name, "params": params or {}, "seconds": st.seconds,
+           "timed_out": st.timed_out, "cancelled": st.cancelled, "counters": st.counters,
+           "result": jsonable(shape(res) if shape else res)}
+    if profile: out["profile"] = st.profile
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m cli", description="Chạy thuật toán đồ thị không cần giao diện.")
+    ap.add_argument("file", nargs="?", help="file đồ thị (.tspg, .json, .tsp, .atsp, .gr, .csv)")
+    ap.add_argument("algorithm", nargs="?", help="tên thuật toán (xem --list)")
+    ap.add_argument("params", nargs="*", help="tham số key=value (giá trị đọc như JSON)")
+    ap.add_argument("-t", "--time-limit", type=float, default=None, help="giới hạn thời gian (giây)")
+    ap.add_argument("-o", "--output", help="ghi JSON ra file thay vì stdout")
+    ap.add_argument("--profile", action="store_true", help="chạy dưới cProfile, thêm bảng hồ sơ vào kết quả")
+    ap.add_argument("--list", action="store_true", help="liệt kê thuật toán")
+    args = ap.parse_args(argv)
+    if args.list: print("\n".join(sorted(ALGORITHMS))); return 0
+    if not args.file or not args.algorithm: ap.error("cần file và tên thuật toán")
+    try:
+        params = parse_params(args.params)
+        t = time.perf_counter(); g = load(args.file); load_s = time.perf_counter() - t
+        out = {"file": args.file, "nodes": g.nodes.count, "edges": len(g.edges), "load_seconds": load_s}
+        if args.algorithm == "ch_query":
+            t = time.perf_counter(); ch.for_file(g, args.file); out["ch_seconds"] = time.perf_counter() - t
+        out.update(run(g, args.algorithm, params, args.time_limit, args.profile))
+    except (OSError, ValueError, TypeError) as e:
+        print(f"lỗi: {e}", file=sys.stderr); return 2
+    text = json.dumps(out, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f: f.write(text + "\n")
+    else: print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
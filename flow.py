@@ -0,0 +1,150 @@
+from collections import deque
+
+# =======================================================================================
+# LUỒNG CỰC ĐẠI TRÊN ĐỒ THỊ THẶNG DƯ THƯA (danh sách cung, không dùng ma trận n x n)
+# Mỗi cạnh i của Graph sinh hai cung 2i (u -> v, sức chứa w) và 2i+1 (v -> u, sức chứa 0
+# nếu có hướng, w nếu vô hướng); cung ngược của a là a ^ 1. Luồng ròng trên cạnh i theo
+# chiều u -> v là w - cap[2i] (âm: chảy v -> u, chỉ với cạnh vô hướng).
+# - DINIC: BFS phân tầng + luồng chặn bằng DFS lặp có con trỏ cung hiện tại, O(V^2 E).
+# - PUSH_RELABEL: FIFO, heuristic khe hở (gap) và gán nhãn lại toàn cục định kỳ, O(V^3).
+# max_flow trả về (giá trị, luồng theo chỉ số cạnh, đỉnh phía nguồn của lát cắt nhỏ nhất,
+# chỉ số các cạnh thuộc lát cắt). Hết giờ / bị hủy: Dinic trả về luồng hợp lệ đã đẩy được;
+# push-relabel trả về tiền luồng (giá trị = lượng đã tới đích, chưa cân bằng tại các đỉnh).
+# =======================================================================================
+DINIC, PUSH_RELABEL = "dinic", "push_relabel"
+EPS = 1e-9
+
+class Residual:
+    __slots__ = ("n", "m", "off", "arcs", "to", "cap", "w")
+
+    def __init__(self, graph):
+        E = graph.edges; n = len(graph.nodes); m = len(E)
+        to = [0] * (2 * m); cap = [0.0] * (2 * m); deg = [0] * (n + 1)
+        for i, (u, v, w, d) in enumerate(zip(E.u, E.v, E.w, E.d)):
+            to[2 * i] = v; to[2 * i + 1] = u; deg[u] += 1; deg[v] += 1
+            if u != v and w > 0: cap[2 * i] = w; cap[2 * i + 1] = 0.0 if d else w
+        off = [0] * (n + 1)
+        for u in range(n): off[u + 1] = off[u] + deg[u]
+        pos = off[:-1]; arcs = [0] * (2 * m)
+        for a in range(2 * m):
+            u = to[a ^ 1]; arcs[pos[u]] = a; pos[u] += 1
+        self.n = n; self.m = m; self.off = off; self.arcs = arcs; self.to = to; self.cap = cap; self.w = list(E.w)
+
+    # Luồng ròng theo chiều u -> v của từng cạnh
+    def flows(self):
+        cap, w = self.cap, self.w
+        return [(w[i] - cap[2 * i]) if w[i] > 0 else 0.0 for i in range(self.m)]
+
+    # Đỉnh tới được từ s trên đồ thị thặng dư (phía nguồn của lát cắt khi luồng đã cực đại)
+    def reach(self, s):
+        off, arcs, to, cap = self.off, self.arcs, self.to, self.cap
+        seen = bytearray(self.n); seen[s] = 1; q = deque([s])
+        while q:
+            u = q.popleft()
+            for k in range(off[u], off[u + 1]):
+                a = arcs[k]; v = to[a]
+                if cap[a] > EPS and not seen[v]: seen[v] = 1; q.append(v)
+        return seen
+
+def dinic(R, s, t, budget=None):
+    n, off, arcs, to, cap = R.n, R.off, R.arcs, R.to, R.cap
+    total = 0.0; phases = 0; aug = 0
+    try:
+        while True:
+            level = [-1] * n; level[s] = 0; q = deque([s])
+            while q:
+                u = q.popleft()
+                for k in range(off[u], off[u + 1]):
+                    a = arcs[k]; v = to[a]
+                    if cap[a] > EPS and level[v] < 0: level[v] = level[u] + 1; q.append(v)
+            if level[t] < 0: return total
+            phases += 1; it = off[:]; stack = []; u = s
+            while True:
+                if budget and budget.expired(): return total
+                if u == t:
+                    f = min(cap[a] for a in stack)
+                    for a in stack: cap[a] -= f; cap[a ^ 1] += f
+                    total += f; aug += 1
+                    # Lùi về đuôi của cung bão hòa đầu tiên trên đường
+                    k = next(i for i, a in enumerate(stack) if cap[a] <= EPS)
+                    del stack[k:]; u = to[stack[-1]] if stack else s
+                    continue
+                end = off[u + 1]; i = it[u]
+                while i < end:
+                    a = arcs[i]
+                    if cap[a] > EPS and level[to[a]] == level[u] + 1: break
+                    i += 1
+                it[u] = i
+                if i < end: stack.append(arcs[i]); u = to[arcs[i]]; continue
+                # Ngõ cụt: loại u khỏi đồ thị phân tầng và lùi một cung
+                level[u] = -1
+                if not stack: break
+                a = stack.pop(); u = to[a ^ 1]; it[u] += 1
+    finally:
+        if budget: budget.tally(phases=phases, augmentations=aug)
+
+def push_relabel(R, s, t, budget=None):
+    n, off, arcs, to, cap = R.n, R.off, R.arcs, R.to, R.cap
+    h = [0] * n; ex = [0.0] * n; cnt = [0] * (2 * n + 2); it = off[:]
+    active = deque(); pushes = 0; relabels = 0; gaps = 0; globals_ = 0
+
+    # Nhãn = khoảng cách tới t trên đồ thị thặng dư; đỉnh không tới được t: n + khoảng cách tới s
+    def global_relabel():
+        for u in range(n): h[u] = 2 * n
+        h[s] = n
+        for root, base in ((t, 0), (s, n)):
+            if root != s: h[root] = base
+            q = deque([root])
+            while q:
+                x = q.popleft()
+                for k in range(off[x], off[x + 1]):
+                    a = arcs[k]; y = to[a]
+                    if cap[a ^ 1] > EPS and h[y] == 2 * n and y != s: h[y] = h[x] + 1; q.append(y)
+        for i in range(len(cnt)): cnt[i] = 0
+        for u in range(n): cnt[h[u]] += 1; it[u] = off[u]
+
+    def push(u, a, v):
+        nonlocal pushes
+        f = min(ex[u], cap[a]); cap[a] -= f; cap[a ^ 1] += f; ex[u] -= f
+        if ex[v] <= EPS and v != s and v != t: active.append(v)
+        ex[v] += f; pushes += 1
+
+    try:
+        for k in range(off[s], off[s + 1]):
+            a = arcs[k]
+            if cap[a] > EPS: ex[s] += cap[a]; push(s, a, to[a])
+        global_relabel(); since = 0
+        while active:
+            if budget and budget.expired(): return ex[t]
+            u = active.popleft()
+            while ex[u] > EPS:
+                if it[u] == off[u + 1]:
+                    old = h[u]; low = 2 * n
+                    for k in range(off[u], off[u + 1]):
+                        a = arcs[k]
+                        if cap[a] > EPS and h[to[a]] < low: low = h[to[a]]
+                    cnt[old] -= 1; h[u] = low + 1; cnt[h[u]] += 1; it[u] = off[u]; relabels += 1; since += 1
+                    if cnt[old] == 0 and old < n:
+                        # Khe hở: mọi đỉnh có nhãn trong (old, n) không còn tới được t
+                        gaps += 1
+                        for v in range(n):
+                            if old < h[v] < n: cnt[h[v]] -= 1; h[v] = n + 1; cnt[n + 1] += 1; it[v] = off[v]
+                    if since >= n: global_relabel(); globals_ += 1; since = 0
+                    continue
+                a = arcs[it[u]]; v = to[a]
+                if cap[a] > EPS and h[u] == h[v] + 1: push(u, a, v)
+                else: it[u] += 1
+        return ex[t]
+    finally:
+        if budget: budget.tally(pushes=pushes, relabels=relabels, gaps=gaps, global_relabels=globals_)
+
+METHODS = {DINIC: dinic, PUSH_RELABEL: push_relabel}
+
+def max_flow(graph, s, t, method=DINIC, budget=None):
+    R = Residual(graph)
+    if s == t: return 0.0, [0.0] * R.m, [s], []
+    value = METHODS[method](R, s, t, budget)
+    side = R.reach(s); E = graph.edges
+    cut = [i for i, (u, v, d) in enumerate(zip(E.u, E.v, E.d))
+           if R.w[i] > 0 and (side[u] and not side[v] or (not d and side[v] and not side[u]))]
+    return value, R.flows(), [u for u in range(R.n) if side[u]], cut
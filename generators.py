@@ -0,0 +1,106 @@
+import math
+import random
+
+from model import Graph
+from spatial import Grid
+
+# =======================================================================================
+# SINH ĐỒ THỊ NGẪU NHIÊN (benchmark, thử nghiệm)
+# Mọi hàm nhận seed để kết quả lặp lại được; đỉnh luôn có tọa độ (rải đều trong hình vuông
+# cạnh `size`, trừ lưới) để vẽ được và dùng được cho TSP Euclid.
+# Trọng số là số nguyên trong [1, wmax] (khoảng cách làm tròn với đồ thị hình học).
+# =======================================================================================
+SIZE = 1000.0
+
+def _scatter(g, n, rnd, size=SIZE):
+    for _ in range(n): g.add_node(rnd.uniform(0, size), rnd.uniform(0, size))
+
+def _dist(g, u, v):
+    X, Y = g.nodes.x, g.nodes.y
+    return float(max(1, round(math.hypot(X[u] - X[v], Y[u] - Y[v]))))
+
+# Hình học ngẫu nhiên: nối mọi cặp đỉnh cách nhau < radius (mặc định bậc trung bình ~ degree)
+def random_geometric(n, radius=None, degree=8, seed=0, size=SIZE):
+    rnd = random.Random(seed); g = Graph(); _scatter(g, n, rnd, size)
+    r = radius or size * math.sqrt(degree / (math.pi * max(n, 1)))
+    G = Grid(g.nodes, g.edges, cell=r); X, Y = g.nodes.x, g.nodes.y; rows = []
+    for u in range(n):
+        for v in G.nodes_near(X[u], Y[u], r):
+            if v > u: rows.append((u, v, _dist(g, u, v), False))
+    g.add_edges(rows)
+    return g
+
+# Erdős–Rényi G(n, m): m cạnh phân biệt chọn ngẫu nhiên (m = p * số cặp nếu cho p)
+def erdos_renyi(n, p=None, m=None, seed=0, directed=False, wmax=100):
+    rnd = random.Random(seed); g = Graph(); _scatter(g, n, rnd)
+    pairs = n * (n - 1) // (1 if directed else 2)
+    m = min(pairs, m if m is not None else int(round((p or 0) * pairs)))
+    seen = set(); rows = []
+    while len(rows) < m:
+        u, v = rnd.randrange(n), rnd.randrange(n)
+        if u == v: continue
+        key = (u, v) if directed or u < v else (v, u)
+        if key in seen: continue
+        seen.add(key); rows.append((key[0], key[1], float(rnd.randint(1, wmax)), directed))
+    g.add_edges(rows)
+    return g
+
+# Lưới rows x cols (4 láng giềng), là đồ thị 2 phía
+def grid_graph(rows, cols, seed=0, spacing=60.0, wmax=100):
+    rnd = random.Random(seed); g = Graph(); out = []
+    for r in range(rows):
+        for c in range(cols): g.add_node(c * spacing, r * spacing)
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            if c + 1 < cols: out.append((i, i + 1, float(rnd.randint(1, wmax)), False))
+            if r + 1 < rows: out.append((i, i + cols, float(rnd.randint(1, wmax)), False))
+    g.add_edges(out)
+    return g
+
+# Phi tỉ lệ (Barabási–Albert): mỗi đỉnh mới nối k đỉnh cũ theo xác suất tỉ lệ với bậc
+def scale_free(n, k=2, seed=0, wmax=100):
+    rnd = random.Random(seed); g = Graph(); _scatter(g, n, rnd)
+    k = max(1, min(k, n - 1)); targets = list(range(k)); pool = []; rows = []
+    for u in range(k, n):
+        for v in set(targets): rows.append((u, v, float(rnd.randint(1, wmax)), False)); pool += (u, v)
+        targets = [rnd.choice(pool) for _ in range(k)]
+    g.add_edges(rows)
+    return g
+
+# Đầy đủ Euclid cho TSP: mặc định chỉ có đỉnh (tsp.EUCLID); edges=True thêm mọi cặp
+def complete_euclidean(n, seed=0, edges=False):
+    rnd = random.Random(seed); g = Graph(); _scatter(g, n, rnd)
+    if edges: g.add_edges([(u, v, _dist(g, u, v), False) for u in range(n) for v in range(u + 1, n)])
+    return g
+
+# Euler: hợp của `cycles` chu trình ngẫu nhiên rời cạnh qua mọi đỉnh (mọi bậc chẵn, liên
+# thông). Chu trình trùng cạnh đã có thì xáo lại, bỏ qua sau `tries` lần.
+def eulerian(n, cycles=2, seed=0, wmax=100, tries=32):
+    rnd = random.Random(seed); g = Graph(); _scatter(g, n, rnd); rows = []; seen = set()
+    for c in range(cycles):
+        for _ in range(tries if c else 1):
+            order = list(range(n)); rnd.shuffle(order)
+            keys = [(min(a, b), max(a, b)) for a, b in zip(order, order[1:] + order[:1])]
+            if len(set(keys)) == len(keys) and not seen.intersection(keys): break
+        else: continue
+        seen.update(keys); rows += [(a, b, float(rnd.randint(1, wmax)), False) for a, b in keys]
+    g.add_edges(rows)
+    return g
+
+# Có chu trình Hamilton cài sẵn cộng thêm `extra` cạnh ngẫu nhiên
+def hamiltonian(n, extra=None, seed=0, wmax=100):
+    rnd = random.Random(seed); g = Graph(); _scatter(g, n, rnd)
+    order = list(range(n)); rnd.shuffle(order); seen = set(); rows = []
+    def add(a, b):
+        key = (min(a, b), max(a, b))
+        if a != b and key not in seen: seen.add(key); rows.append((a, b, float(rnd.randint(1, wmax)), False))
+    for a, b in zip(order, order[1:] + order[:1]): add(a, b)
+    for _ in range(n if extra is None else extra): add(rnd.randrange(n), rnd.randrange(n))
+    g.add_edges(rows)
+    return g
+
+GENERATORS = {
+    "geometric": random_geometric, "erdos_renyi": erdos_renyi, "grid": grid_graph, "scale_free": scale_free,
+    "complete_euclidean": complete_euclidean, "eulerian": eulerian, "hamiltonian": hamiltonian,
+}
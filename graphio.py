@@ -0,0 +1,72 @@
+import json
+import mmap
+import struct
+import sys
+
+from model import NodeColumns, EdgeColumns, columns_to_dict, columns_from_dict
+
+# =======================================================================================
+# ĐỌC / GHI FILE ĐỒ THỊ
+# - JSON (.json): định dạng cũ, dễ đọc nhưng chậm và lớn với đồ thị triệu cạnh.
+# - Nhị phân (.tspg): header + các cột của NodeColumns / EdgeColumns ghi nguyên khối
+#   (little-endian). Khi mở, file được mmap và mỗi cột nạp bằng một lần frombytes — không
+#   tạo đối tượng Python cho từng đỉnh / cạnh.
+# Bố cục: HEADER | x[n] y[n] (f8) | u[m] v[m] (i8) | w[m] (f8) | alive[n] d[m] (u1)
+# Định dạng khi mở được nhận dạng theo MAGIC ở đầu file, không theo phần mở rộng.
+# =======================================================================================
+MAGIC = b"TSPG"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqq")   # magic, version, (dự trữ), n = số ô đỉnh, m = số cạnh
+BINARY, JSON = "binary", "json"
+BINARY_EXT = ".tspg"
+SWAP = sys.byteorder != "little"
+
+def detect(path):
+    with open(path, "rb") as f: return BINARY if f.read(len(MAGIC)) == MAGIC else JSON
+
+# Định dạng khi lưu: theo phần mở rộng, mặc định là nhị phân
+def format_for(path): return JSON if path.lower().endswith(".json") else BINARY
+
+# Bản sao các cột (chép nguyên khối) để luồng I/O ghi trong khi đồ thị vẫn được sửa
+def snapshot(graph): return graph.nodes.copy(), graph.edges.copy()
+
+# --- NHỊ PHÂN ---
+def write_binary(path, nodes, edges):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(nodes), len(edges)))
+        for a in (nodes.x, nodes.y, edges.u, edges.v, edges.w):
+            if SWAP: a = a[:]; a.byteswap()
+            f.write(a)
+        f.write(nodes.alive); f.write(edges.d)
+
+def read_binary(path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if len(mm) < HEADER.size: raise ValueError("File nhị phân không hợp lệ")
+        magic, version, _, n, m = HEADER.unpack_from(mm)
+        if magic != MAGIC: raise ValueError("File nhị phân không hợp lệ")
+        if version != VERSION: raise ValueError(f"Không hỗ trợ phiên bản {version}")
+        if len(mm) < HEADER.size + 17 * n + 25 * m: raise ValueError("File nhị phân bị cắt cụt")
+        N, E = NodeColumns(), EdgeColumns(); pos = HEADER.size
+        with memoryview(mm) as mv:
+            for a, k in ((N.x, n), (N.y, n), (E.u, m), (E.v, m), (E.w, m)):
+                a.frombytes(mv[pos:pos + 8 * k]); pos += 8 * k
+                if SWAP: a.byteswap()
+            N.alive = bytearray(mv[pos:pos + n]); pos += n
+            E.d = bytearray(mv[pos:pos + m])
+    N.dead = n - N.alive.count(1)
+    if m and (min(min(E.u), min(E.v)) < 0 or max(max(E.u), max(E.v)) >= n): raise ValueError("Cạnh trỏ tới đỉnh không tồn tại")
+    return N, E
+
+# --- JSON ---
+def write_json(path, nodes, edges):
+    with open(path, "w") as file: json.dump(columns_to_dict(nodes, edges), file)
+
+def read_json(path):
+    with open(path, "r") as file: return columns_from_dict(json.load(file))
+
+# --- GIAO DIỆN CHUNG: cột (NodeColumns, EdgeColumns), dùng với Graph.restore() ---
+def load(path): return read_binary(path) if detect(path) == BINARY else read_json(path)
+
+def save(path, nodes, edges):
+    if format_for(path) == JSON: write_json(path, nodes, edges)
+    else: write_binary(path, nodes, edges)
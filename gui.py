@@ -1,9 +1,18 @@
 import tkinter as tk
 from tkinter import filedialog, ttk
 import math
-import json
 
 from model import Graph
+from history import History
+from worker import Worker
+from animation import Animator
+from renderer import Renderer
+import tsp
+import flow
+import apsp
+import sssp
+import graphio
+import importers
 from components import RoundedButton, CustomPopup, EdgeDialog, ComboSelectionDialog, AlgorithmSelectorDialog
 
 class GraphGUI:
@@ -13,17 +22,23 @@ class GraphGUI:
         self.root.geometry("1600x900")
         self.root.configure(bg="#fdfdfd")
         
-        self.history = [] 
         self.root.bind("<Control-z>", self.undo)
         self.root.bind("<Control-Z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        self.root.bind("<Control-Shift-Z>", self.redo)
+        self.root.bind("<Delete>", self.delete_selected)
 
         style = ttk.Style()
         style.theme_use("clam")
         style.configure("Treeview", background="white", foreground="#333", rowheight=40, font=("Segoe UI", 14))
         style.configure("Treeview.Heading", font=("Segoe UI", 14, "bold"))
         
-        self.graph = Graph()
+        self.graph = Graph(); self.history = History(self.graph)
         self.sel_node = None; self.drag_node = None; self.is_drag = False
+        self.band = None; self.band_sel = []
+        self.worker = Worker(self.root); self.last_stop = (False, False)
+        self.anim = Animator(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
         
         self.base_r = 40
         self.zoom_scale = 1.0 
@@ -53,11 +68,13 @@ class GraphGUI:
 
         group_lbl("HỆ THỐNG")
         RoundedButton(sb, "Hoàn Tác (Ctrl+Z)", self.undo, bg_color="#e67e22", hover_color="#d35400", width=BTN_W, height=BTN_H).pack(pady=5)
+        RoundedButton(sb, "Làm Lại (Ctrl+Y)", self.redo, bg_color="#e67e22", hover_color="#d35400", width=BTN_W, height=BTN_H).pack(pady=5)
         RoundedButton(sb, "Xóa Tất Cả", self.clear, bg_color="#c0392b", hover_color="#e74c3c", width=BTN_W, height=BTN_H).pack(pady=5)
 
         group_lbl("DỮ LIỆU")
-        RoundedButton(sb, "Lưu File (.json)", self.save, bg_color="#16a085", hover_color="#1abc9c", width=BTN_W, height=BTN_H).pack(pady=5)
-        RoundedButton(sb, "Mở File (.json)", self.load, bg_color="#16a085", hover_color="#1abc9c", width=BTN_W, height=BTN_H).pack(pady=5)
+        RoundedButton(sb, "Lưu File (.tspg/.json)", self.save, bg_color="#16a085", hover_color="#1abc9c", width=BTN_W, height=BTN_H).pack(pady=5)
+        RoundedButton(sb, "Mở File (.tspg/.json)", self.load, bg_color="#16a085", hover_color="#1abc9c", width=BTN_W, height=BTN_H).pack(pady=5)
+        RoundedButton(sb, "Nhập TSPLIB / DIMACS / CSV", self.import_file, bg_color="#16a085", hover_color="#1abc9c", width=BTN_W, height=BTN_H).pack(pady=5)
         RoundedButton(sb, "Xem Bảng Dữ Liệu", self.show_data, bg_color="#8e44ad", hover_color="#9b59b6", width=BTN_W, height=BTN_H).pack(pady=5)
 
         group_lbl("THUẬT TOÁN")
@@ -65,6 +82,26 @@ class GraphGUI:
         RoundedButton(sb, "DFS (Sâu)", self.run_dfs, bg_color="#2980b9", hover_color="#3498db", width=BTN_W, height=BTN_H).pack(pady=5)
         RoundedButton(sb, "Thư Viện Thuật Toán", self.show_adv_menu, bg_color="#f39c12", hover_color="#f1c40f", width=BTN_W, height=BTN_H).pack(pady=5)
 
+        f_lim = tk.Frame(sb, bg=sb_bg); f_lim.pack(anchor="w", padx=25, pady=(10, 5))
+        tk.Label(f_lim, text="Giới hạn (giây, 0 = không):", bg=sb_bg, fg="#bdc3c7", font=("Segoe UI", 12)).pack(side=tk.LEFT)
+        self.time_limit = tk.StringVar(value="0")
+        tk.Spinbox(f_lim, from_=0, to=3600, increment=1, textvariable=self.time_limit, width=5, font=("Segoe UI", 12)).pack(side=tk.LEFT, padx=10)
+        self.profile = tk.BooleanVar(value=False)
+        tk.Checkbutton(sb, text="Hồ sơ cProfile (xem tab Thống Kê)", variable=self.profile, bg=sb_bg, fg="#bdc3c7", selectcolor="#34495e",
+                       activebackground=sb_bg, font=("Segoe UI", 12)).pack(anchor="w", padx=25)
+        self.status = tk.Label(sb, text="Sẵn sàng", bg=sb_bg, fg="#bdc3c7", font=("Segoe UI", 12)); self.status.pack(anchor="w", padx=25)
+        self.progress = ttk.Progressbar(sb, mode="indeterminate", length=BTN_W); self.progress.pack(pady=5)
+        RoundedButton(sb, "Dừng Thuật Toán", self.worker.cancel, bg_color="#c0392b", hover_color="#e74c3c", width=BTN_W, height=BTN_H).pack(pady=5)
+
+        # Điều khiển hoạt ảnh: tốc độ (bước/giây), tạm dừng / tiếp tục, bỏ qua tới cuối
+        f_anim = tk.Frame(sb, bg=sb_bg); f_anim.pack(anchor="w", padx=25, pady=(10, 0))
+        tk.Label(f_anim, text="Tốc độ:", bg=sb_bg, fg="#bdc3c7", font=("Segoe UI", 12)).pack(side=tk.LEFT)
+        tk.Scale(f_anim, from_=1, to=200, orient=tk.HORIZONTAL, length=220, bg=sb_bg, fg="white", highlightthickness=0, font=("Segoe UI", 10),
+                 command=lambda v: setattr(self.anim, "speed", float(v))).set(self.anim.speed)
+        f_ctl = tk.Frame(sb, bg=sb_bg); f_ctl.pack(pady=5)
+        tk.Button(f_ctl, text="Tạm Dừng / Tiếp", command=self.anim.toggle, bg="#7f8c8d", fg="white", font=("Segoe UI", 12, "bold"), relief="flat", padx=10, cursor="hand2").pack(side=tk.LEFT, padx=5)
+        tk.Button(f_ctl, text="Bỏ Qua", command=self.anim.skip, bg="#7f8c8d", fg="white", font=("Segoe UI", 12, "bold"), relief="flat", padx=10, cursor="hand2").pack(side=tk.LEFT, padx=5)
+
         main = tk.Frame(self.root, bg="#fdfdfd"); main.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=20, pady=20)
         cv_container = tk.Frame(main, bg="#bdc3c7", bd=1, relief="flat"); cv_container.pack(fill=tk.BOTH, expand=True)
         self.cv = tk.Canvas(cv_container, bg="white", highlightthickness=0, cursor="cross"); self.cv.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
@@ -72,124 +109,84 @@ class GraphGUI:
         self.cv.bind("<Button-1>", self.down)
         self.cv.bind("<B1-Motion>", self.drag)
         self.cv.bind("<ButtonRelease-1>", self.up)
+        self.cv.bind("<Shift-Button-1>", self.band_down)
+        self.cv.bind("<Shift-B1-Motion>", self.band_drag)
+        self.cv.bind("<Shift-ButtonRelease-1>", self.band_up)
         self.cv.bind("<MouseWheel>", self.zoom_event) 
         self.cv.bind("<Button-4>", self.zoom_event)
         self.cv.bind("<Button-5>", self.zoom_event)
         self.cv.bind("<Button-3>", self.on_right_click)
         self.cv.bind("<B3-Motion>", self.motion_pan)
+        self.cv.bind("<Configure>", lambda e: self.view.viewport_changed())
         
-        tk.Label(main, text="🖱️ Trái: Tạo/Kéo | Phải: Menu Xóa & Kéo Màn Hình | Lăn Chuột: Zoom", 
+        self.view = Renderer(self)
+
+        tk.Label(main, text="🖱️ Trái: Tạo/Kéo | Shift+Kéo: Chọn vùng | Phải: Menu Xóa & Kéo Màn Hình | Lăn Chuột: Zoom", 
                  bg="#fdfdfd", fg="black", font=("Segoe UI", 14, "bold")).pack(pady=10)
 
     # --- HÀM VẼ CHÍNH (CHỈ VẼ ĐƯỜNG THẲNG) ---
+    # Xóa tô màu và đồng bộ canvas với đồ thị; self.view chỉ dựng lại khi đồ thị đã đổi
     def draw(self):
-        self.cv.delete("all")
-        self.cv.create_rectangle(-10000, -10000, 10000, 10000, fill="white", outline="white")
-        current_r = self.base_r * self.zoom_scale
-        font_size_node = int(16 * self.zoom_scale); font_size_edge = int(14 * self.zoom_scale)
-        line_width_node = max(1, 3.0 * self.zoom_scale); line_width_edge = max(1, 3.0 * self.zoom_scale); line_width_sel = max(2, 6.0 * self.zoom_scale)
-        
-        # Vẽ Cạnh (Luôn là đường thẳng)
-        for e in self.graph.edges:
-            u, v = self.graph.nodes[e.u], self.graph.nodes[e.v]
-            sx, sy = int(self.to_screen_x(u.x)), int(self.to_screen_y(u.y))
-            ex, ey = int(self.to_screen_x(v.x)), int(self.to_screen_y(v.y))
-            
-            dx, dy = ex-sx, ey-sy; l = math.hypot(dx, dy)
-            if l == 0: continue 
-            
-            arr = tk.LAST if e.is_directed else tk.NONE
-            arrow_shape = (16*self.zoom_scale, 20*self.zoom_scale, 8*self.zoom_scale)
-            
-            # --- CHỈNH SỬA: LUÔN VẼ THẲNG ---
-            reduction = current_r + (5 * self.zoom_scale)
-            if e.is_directed: 
-                ex_arrow = ex - (dx/l) * reduction
-                ey_arrow = ey - (dy/l) * reduction
-            else: 
-                ex_arrow, ey_arrow = ex, ey 
-            
-            self.cv.create_line(sx, sy, ex_arrow, ey_arrow, fill="#34495e", width=line_width_edge, arrow=arr, arrowshape=arrow_shape, capstyle=tk.ROUND)
-            
-            # Vị trí text luôn ở giữa đường thẳng
-            lbl_x, lbl_y = (sx+ex)/2, (sy+ey)/2
-                
-            w_txt = str(int(e.weight)) if e.weight.is_integer() else str(e.weight)
-            # Thêm tag weight_lbl để quản lý lớp vẽ
-            txt_id = self.cv.create_text(lbl_x, lbl_y, text=w_txt, fill="#e74c3c", font=("Segoe UI", font_size_edge, "bold"), tags="weight_lbl")
-            bbox = self.cv.bbox(txt_id)
-            if bbox:
-                self.cv.create_rectangle(bbox[0]-4, bbox[1]-2, bbox[2]+4, bbox[3]+2, fill="white", outline="#bdc3c7", width=1, tags="weight_lbl")
-                self.cv.tag_raise(txt_id)
-        
-        # Vẽ Đỉnh
-        for n in self.graph.nodes:
-            sx, sy = int(self.to_screen_x(n.x)), int(self.to_screen_y(n.y))
-            fill = "#2ecc71"; width = line_width_node
-            if n.id == self.sel_node: fill = "#f1c40f"; width = line_width_sel
-            self.cv.create_oval(sx - current_r, sy - current_r, sx + current_r, sy + current_r, fill=fill, outline="#27ae60", width=width, tags="node")
-            self.cv.create_text(sx, sy, text=str(n.id), font=("Segoe UI", font_size_node, "bold"), fill="white", tags="node")
+        self.anim.stop()
+        self.view.sync()
 
     # --- [UPDATE] HIGHLIGHT PATH THẲNG ---
-    def hl_path_fill(self, p, col="#f1c40f", delay=500, draw_edges=True):
+    # Mỗi đỉnh / cạnh là một bước của self.anim (không chặn vòng lặp sự kiện)
+    def hl_path_fill(self, p, col="#f1c40f", draw_edges=True):
         self.draw() # Reset màu
         current_r = self.base_r * self.zoom_scale
         line_width_sel = max(2, 6.0 * self.zoom_scale)
         edge_width_sel = max(2, 5.0 * self.zoom_scale)
         font_size_node = int(16 * self.zoom_scale)
         
-        for i in range(len(p)):
+        def node_step(nid):
             # 1. Tô màu ĐỈNH (Node)
-            nid = p[i]
             n = self.graph.nodes[nid]
             sx, sy = self.to_screen_x(n.x), self.to_screen_y(n.y)
-            
             self.cv.create_oval(sx - current_r, sy - current_r, sx + current_r, sy + current_r, 
                                 fill=col, outline="#e67e22", width=line_width_sel, tags="highlight")
             self.cv.create_text(sx, sy, text=str(n.id), font=("Segoe UI", font_size_node, "bold"), fill="white", tags="highlight")
-            
-            self.root.update()
-            self.root.after(delay // 2)
 
+        def edge_step(nid, v_id):
             # 2. Tô màu CẠNH (Edge) - LUÔN THẲNG
+            n = self.graph.nodes[nid]; next_n = self.graph.nodes[v_id]
+            sx, sy = self.to_screen_x(n.x), self.to_screen_y(n.y)
+            ex, ey = self.to_screen_x(next_n.x), self.to_screen_y(next_n.y)
+            dx, dy = ex-sx, ey-sy; l = math.hypot(dx, dy)
+            edge = self.graph.edge_at(nid, v_id)
+            is_directed = edge is not None and edge.is_directed
+            
+            arr = tk.LAST if is_directed else tk.NONE
+            arrow_shape = (16*self.zoom_scale, 20*self.zoom_scale, 8*self.zoom_scale)
+
+            # Luôn vẽ thẳng
+            reduction = current_r + (5 * self.zoom_scale)
+            if is_directed: 
+                ex_arrow = ex - (dx/l) * reduction
+                ey_arrow = ey - (dy/l) * reduction
+            else: 
+                ex_arrow, ey_arrow = ex, ey 
+            
+            self.cv.create_line(sx, sy, ex_arrow, ey_arrow, 
+                                fill=col, width=edge_width_sel, arrow=arr, arrowshape=arrow_shape, capstyle=tk.ROUND, tags="highlight_edge")
+            
+            # Đẩy text trọng số và node lên trên cùng để không bị che
+            self.cv.tag_raise("weight_lbl")
+            self.cv.tag_raise("highlight") 
+
+        steps = []
+        for i, nid in enumerate(p):
+            steps.append(lambda nid=nid: node_step(nid))
             if draw_edges and i < len(p) - 1:
-                v_id = p[i+1]
-                next_n = self.graph.nodes[v_id]
-                ex, ey = self.to_screen_x(next_n.x), self.to_screen_y(next_n.y)
-                
-                dx, dy = ex-sx, ey-sy; l = math.hypot(dx, dy)
-                if l > 0:
-                    is_directed = False
-                    for edge in self.graph.edges:
-                        if edge.u == nid and edge.v == v_id and edge.is_directed:
-                            is_directed = True; break
-                    
-                    arr = tk.LAST if is_directed else tk.NONE
-                    arrow_shape = (16*self.zoom_scale, 20*self.zoom_scale, 8*self.zoom_scale)
-
-                    # Luôn vẽ thẳng
-                    reduction = current_r + (5 * self.zoom_scale)
-                    if is_directed: 
-                        ex_arrow = ex - (dx/l) * reduction
-                        ey_arrow = ey - (dy/l) * reduction
-                    else: 
-                        ex_arrow, ey_arrow = ex, ey 
-                    
-                    self.cv.create_line(sx, sy, ex_arrow, ey_arrow, 
-                                        fill=col, width=edge_width_sel, arrow=arr, arrowshape=arrow_shape, capstyle=tk.ROUND, tags="highlight_edge")
-                    
-                    # Đẩy text trọng số và node lên trên cùng để không bị che
-                    self.cv.tag_raise("weight_lbl")
-                    self.cv.tag_raise("highlight") 
-                    
-                    self.root.update()
-                    self.root.after(delay // 2)
+                a, b = self.graph.nodes[nid], self.graph.nodes[p[i+1]]
+                if a.x != b.x or a.y != b.y: steps.append(lambda u=nid, v=p[i+1]: edge_step(u, v))
+        self.anim.play(steps)
     
     # --- HIGHLIGHT MST ---
     def hl_edge(self, elist, col="#9b59b6"):
         self.draw()
         edge_width_sel = max(2, 6.0 * self.zoom_scale)
-        for e in elist:
+        def edge_step(e):
             u,v = self.graph.nodes[e.u], self.graph.nodes[e.v]; sx, sy = self.to_screen_x(u.x), self.to_screen_y(u.y); ex, ey = self.to_screen_x(v.x), self.to_screen_y(v.y)
             arr = tk.LAST if e.is_directed else tk.NONE
             dx, dy = ex-sx, ey-sy; l = math.hypot(dx,dy); current_r = self.base_r * self.zoom_scale
@@ -200,9 +197,11 @@ class GraphGUI:
             
             self.cv.tag_raise("weight_lbl")
             self.cv.tag_raise("node")
-            self.root.update(); self.root.after(300)
+        self.anim.play([lambda e=e: edge_step(e) for e in elist])
+
+    # Thông báo kết quả sau khi hoạt ảnh tô đường đi kết thúc
+    def notify(self, title, message, is_error=False): self.anim.then(lambda: CustomPopup(self.root, title, message, is_error=is_error))
 
-    # --- EVENT HANDLERS ---
     def on_right_click(self, event):
         wx = self.to_world_x(self.cv.canvasx(event.x)); wy = self.to_world_y(self.cv.canvasy(event.y))
         
@@ -228,17 +227,23 @@ class GraphGUI:
 
     def execute_deletion(self):
         if self.delete_mode == "node" and self.target_for_deletion is not None:
-            self.save_state(); self.graph.remove_node(self.target_for_deletion)
-            if self.sel_node == self.target_for_deletion: self.sel_node = None
+            # Id đỉnh giữ nguyên sau khi xóa, trừ khi đồ thị vừa được dồn chỉ số
+            with self.history:
+                self.graph.remove_node(self.target_for_deletion)
+                if self.graph.maybe_compact() is not None or self.sel_node == self.target_for_deletion: self.sel_node = None
             self.draw()
         elif self.delete_mode == "edge" and self.target_for_deletion is not None:
-            self.save_state(); u, v, is_directed = self.target_for_deletion
-            self.graph.remove_edge(u, v, is_directed); self.draw()
+            u, v, is_directed = self.target_for_deletion
+            with self.history: self.graph.remove_edge(u, v, is_directed)
+            self.draw()
         self.target_for_deletion = None; self.delete_mode = None
 
+    # Ứng viên lấy từ lưới không gian của đồ thị, sau đó kiểm tra khoảng cách trên màn hình
     def find_edge_at_pos(self, mx, my):
         threshold = 10.0
-        for e in self.graph.edges:
+        wx, wy = self.to_world_x(mx), self.to_world_y(my); tol = threshold / self.zoom_scale
+        for i in self.graph.grid().edges_in_rect(wx - tol, wy - tol, wx + tol, wy + tol):
+            e = self.graph.edges[i]
             u_node = self.graph.nodes[e.u]; v_node = self.graph.nodes[e.v]
             sx1, sy1 = self.to_screen_x(u_node.x), self.to_screen_y(u_node.y)
             sx2, sy2 = self.to_screen_x(v_node.x), self.to_screen_y(v_node.y)
@@ -254,14 +259,61 @@ class GraphGUI:
 
     def show_adv_menu(self):
         algo_structure = {
-            "Tìm Đường Ngắn Nhất": {"Dijkstra (Trọng số dương)": self.run_dijkstra, "Bellman-Ford (Xử lý âm)": self.run_bellman_ford},
+            "Tìm Đường Ngắn Nhất": {"Dijkstra (Trọng số dương)": lambda: self.run_shortest("Dijkstra", Graph.dijkstra),
+                                    "A* (Heuristic Euclid)": lambda: self.run_shortest("A*", Graph.astar),
+                                    "Dijkstra Hai Chiều": lambda: self.run_shortest("Dijkstra hai chiều", Graph.bidirectional_dijkstra),
+                                    "Bellman-Ford (Xử lý âm)": lambda: self.run_shortest("Bellman-Ford", Graph.bellman_ford, negative=True),
+                                    "SPFA (Xử lý âm, chỉ ra chu trình âm)": lambda: self.run_shortest("SPFA", Graph.spfa, negative=True),
+                                    "Cây Đường Đi Ngắn Nhất (một -> mọi đỉnh)": self.run_tree},
             "Cây Khung Nhỏ Nhất (MST)": {"Thuật toán Prim": self.run_prim, "Thuật toán Kruskal": self.run_kruskal},
             "Chu Trình Euler & Hamilton": {"Fleury (Euler)": self.run_fleury, "Hierholzer (Euler)": self.run_hierholzer, "Kiểm tra Hamilton": self.run_hamilton},
-            "Luồng & Phân Tích Khác": {"Luồng Cực Đại (Max Flow)": self.run_maxflow, "Kiểm tra Đồ thị 2 Phía": self.run_bi}
+            "Người Du Lịch (TSP)": {"Tự động (Held-Karp / Láng giềng gần + 2-opt)": lambda: self.run_tsp(tsp.NN),
+                                    "Tham lam + 2-opt/Or-opt": lambda: self.run_tsp(tsp.GREEDY),
+                                    "Christofides + 2-opt/Or-opt": lambda: self.run_tsp(tsp.CHRISTOFIDES),
+                                    "Bao đóng metric (đi qua đường ngắn nhất)": lambda: self.run_tsp(tsp.NN, tsp.CLOSURE)},
+            "Luồng & Phân Tích Khác": {"Luồng Cực Đại — Dinic (+ lát cắt)": self.run_maxflow,
+                                       "Luồng Cực Đại — Push-Relabel (+ lát cắt)": lambda: self.run_maxflow(flow.PUSH_RELABEL),
+                                       "Kiểm tra Đồ thị 2 Phía": self.run_bi}
         }
         d = AlgorithmSelectorDialog(self.root, algo_structure)
         if d.selected_func: d.selected_func()
 
+    # Chạy thuật toán trong worker (tiến trình con) trên bản chụp đồ thị. on_done(result) chạy
+    # lại trên luồng Tk; nếu đồ thị bị sửa trong lúc chạy thì kết quả cũ bị bỏ qua.
+    def run_algo(self, title, fn, *args, on_done, on_error=None, **kw):
+        if self.worker.busy: CustomPopup(self.root, "Đang Bận", f"Đang chạy {self.worker.job.name}...", is_error=True); return
+        try: limit = max(0.0, float(self.time_limit.get()))
+        except ValueError: limit = 0.0
+        version = self.graph.version
+        def done(res, timed_out, cancelled):
+            self.end_progress(); self.last_stop = (timed_out, cancelled)
+            if self.graph.version != version: CustomPopup(self.root, title, "Đồ thị đã thay đổi khi đang chạy — bỏ qua kết quả.", is_error=True); return
+            on_done(res)
+        def fail(e):
+            self.end_progress(); CustomPopup(self.root, "Lỗi", str(e), is_error=True)
+            if on_error: on_error(e)
+        self.worker.run(title, self.graph, fn, args, kw, limit or None, on_done=done, on_error=fail, profile=self.profile.get())
+        self.status.config(text=f"Đang chạy {title}..."); self.progress.start(15); self.root.after(200, self.tick_progress)
+
+    def tick_progress(self):
+        job = self.worker.job
+        if not job: return
+        pct = f" {self.worker.fraction:.0%}" if self.worker.fraction else ""
+        self.status.config(text=f"Đang chạy {job.name}...{pct} {job.elapsed:.1f}s"); self.root.after(200, self.tick_progress)
+
+    def end_progress(self): self.progress.stop(); self.status.config(text="Sẵn sàng")
+
+    @property
+    def stopped(self): return any(self.last_stop)
+
+    def stop_note(self):
+        timed_out, cancelled = self.last_stop
+        if cancelled: return "\n\n(ĐÃ DỪNG — kết quả dở dang)"
+        if timed_out: return "\n\n(HẾT THỜI GIAN — kết quả tốt nhất hiện có)"
+        return ""
+
+    def quit(self): self.worker.shutdown(); self.root.destroy()
+
     def ask_node(self, title, prompt, extra_opt=None):
         if not self.graph.nodes: CustomPopup(self.root, "Thông Báo", "Đồ thị chưa có đỉnh nào!", is_error=True); return None, False
         choices = [str(n.id) for n in self.graph.nodes]
@@ -272,45 +324,63 @@ class GraphGUI:
     def run_bfs(self):
         s, is_desc = self.ask_node("BFS", "Chọn Đỉnh Bắt Đầu:", extra_opt="Ưu tiên LỚN trước (Lớn->Nhỏ)")
         if s is not None:
-            p = self.graph.bfs(s, descending=is_desc)
             desc_text = "Lớn -> Nhỏ" if is_desc else "Nhỏ -> Lớn"
-            self.hl_path_fill(p, draw_edges=False) 
-            CustomPopup(self.root, "Kết Quả BFS", f"Thứ tự ({desc_text}):\n{p}")
+            def done(p):
+                self.hl_path_fill(p, draw_edges=False) 
+                self.notify("Kết Quả BFS", f"Thứ tự ({desc_text}):\n{p}{self.stop_note()}")
+            self.run_algo("BFS", Graph.bfs, s, descending=is_desc, on_done=done)
 
     def run_dfs(self):
         s, is_desc = self.ask_node("DFS", "Chọn Đỉnh Bắt Đầu:", extra_opt="Ưu tiên LỚN trước (Lớn->Nhỏ)")
         if s is not None:
-            p = self.graph.dfs(s, descending=is_desc)
             desc_text = "Lớn -> Nhỏ" if is_desc else "Nhỏ -> Lớn"
-            self.hl_path_fill(p, draw_edges=False)
-            CustomPopup(self.root, "Kết Quả DFS", f"Thứ tự ({desc_text}):\n{p}")
-
-    def run_dijkstra(self):
-        if any(e.weight < 0 for e in self.graph.edges): CustomPopup(self.root, "Lỗi Thuật Toán", "Dijkstra KHÔNG hoạt động với trọng số ÂM!", is_error=True); return
-        s, _ = self.ask_node("Dijkstra", "Chọn Điểm Đi (Start):")
+            def done(p):
+                self.hl_path_fill(p, draw_edges=False)
+                self.notify("Kết Quả DFS", f"Thứ tự ({desc_text}):\n{p}{self.stop_note()}")
+            self.run_algo("DFS", Graph.dfs, s, descending=is_desc, on_done=done)
+
+    # Nhóm đường đi ngắn nhất: fn(graph, s, e) -> (đường đi, chi phí); chi phí -inf = chu trình âm
+    # (SPFA trả về luôn chu trình, được tô màu; Bellman-Ford chỉ báo có)
+    def run_shortest(self, title, fn, negative=False):
+        if not negative and any(e.weight < 0 for e in self.graph.edges): CustomPopup(self.root, "Lỗi Thuật Toán", f"{title} KHÔNG hoạt động với trọng số ÂM!", is_error=True); return
+        s, _ = self.ask_node(title, "Chọn Điểm Đi (Start):")
         if s is None: return
-        e, _ = self.ask_node("Dijkstra", "Chọn Điểm Đến (End):")
+        e, _ = self.ask_node(title, "Chọn Điểm Đến (End):")
         if e is None: return
-        p, w = self.graph.dijkstra(s,e)
-        if p: self.hl_path_fill(p, "#e74c3c"); CustomPopup(self.root, "Kết Quả", f"Tổng Quãng Đường: {w}\nLộ Trình: {p}")
-        else: CustomPopup(self.root, "Lỗi", "Không tìm thấy đường đi!", is_error=True)
-
-    def run_bellman_ford(self):
-        s, _ = self.ask_node("Bellman-Ford", "Chọn Điểm Đi (Start):")
+        def done(res):
+            path, cost = res
+            if self.stopped: CustomPopup(self.root, "Đã Dừng", f"Chưa tìm xong đường đi.{self.stop_note()}", is_error=True)
+            elif cost == float('-inf') and path: self.hl_path_fill(path, "#c0392b"); self.notify("Cảnh Báo", f"Phát hiện CHU TRÌNH ÂM!\nChu trình: {path}", is_error=True)
+            elif cost == float('-inf'): CustomPopup(self.root, "Cảnh Báo", "Phát hiện CHU TRÌNH ÂM!\nKhông thể tính đường đi ngắn nhất.", is_error=True)
+            elif path: self.hl_path_fill(path, "#e74c3c"); self.notify("Kết Quả", f"Tổng Quãng Đường: {cost}\nLộ Trình: {path}")
+            else: CustomPopup(self.root, "Lỗi", "Không tìm thấy đường đi!", is_error=True)
+        self.run_algo(title, fn, s, e, on_done=done)
+
+    # Tô cây đường đi ngắn nhất từ s (cạnh pred[v] -> v) và liệt kê khoảng cách tới các đỉnh
+    def run_tree(self):
+        s, _ = self.ask_node("Cây Đường Đi", "Chọn Đỉnh Nguồn:")
         if s is None: return
-        e, _ = self.ask_node("Bellman-Ford", "Chọn Điểm Đến (End):")
-        if e is None: return
-        path, cost = self.graph.bellman_ford(s, e)
-        if cost == float('-inf'): CustomPopup(self.root, "Cảnh Báo", "Phát hiện CHU TRÌNH ÂM!\nKhông thể tính đường đi ngắn nhất.", is_error=True)
-        elif path: self.hl_path_fill(path, "#e74c3c"); CustomPopup(self.root, "Kết Quả", f"Tổng Quãng Đường: {cost}\nLộ Trình: {path}")
-        else: CustomPopup(self.root, "Lỗi", "Không tìm thấy đường đi!", is_error=True)
-
-    def run_maxflow(self):
+        def done(tr):
+            E = [e for v, p in enumerate(tr.pred) if p >= 0 for e in (self.graph.edge_at(p, v) or self.graph.edge_at(v, p),) if e]
+            rows = [f"{v}: {tr.dist[v]:g}" for v in self.graph.nodes.live() if tr.dist[v] != float('inf')]
+            more = f"\n... (+{len(rows) - 30} đỉnh)" if len(rows) > 30 else ""
+            self.hl_edge(E, "#16a085"); self.notify("Cây Đường Đi Ngắn Nhất", f"Từ đỉnh {s} tới được {len(rows)} đỉnh:\n" + "\n".join(rows[:30]) + more + self.stop_note())
+        self.run_algo("Cây đường đi", sssp.shortest_tree, s, on_done=done)
+
+    # Tô các cạnh của lát cắt nhỏ nhất; luồng theo cạnh liệt kê cho các cạnh có luồng khác 0
+    def run_maxflow(self, method=flow.DINIC):
         s, _ = self.ask_node("Flow", "Chọn Nguồn (Source):"); 
         if s is None: return
         t, _ = self.ask_node("Flow", "Chọn Đích (Sink):")
         if t is None: return
-        f = self.graph.ford_fulkerson(s,t); CustomPopup(self.root, "Max Flow", f"Luồng Cực Đại: {f}")
+        def done(res):
+            f, flows, side, cut = res; E = self.graph.edges
+            used = [f"{E.u[i]}->{E.v[i]}: {x:g}" if x > 0 else f"{E.v[i]}->{E.u[i]}: {-x:g}" for i, x in enumerate(flows) if x]
+            more = f"\n... (+{len(used) - 30} cạnh)" if len(used) > 30 else ""
+            self.hl_edge([E[i] for i in cut], "#e74c3c")
+            self.notify("Max Flow", f"Luồng Cực Đại: {f:g}\nLát cắt nhỏ nhất ({len(cut)} cạnh, tô đỏ), phía nguồn: {side}\n"
+                                    f"Luồng trên cạnh:\n" + "\n".join(used[:30]) + more + self.stop_note())
+        self.run_algo("Max Flow", flow.max_flow, s, t, method=method, on_done=done)
 
     def run_fleury(self):
         status, msg, auto = self.graph.get_euler_status()
@@ -320,8 +390,8 @@ class GraphGUI:
         if status == 2:
             u, _ = self.ask_node("Fleury", f"Chọn Đỉnh Bắt Đầu:\n(Mặc định: {auto})")
             if u is not None: start = u
-        try: p = self.graph.fleury_algo(start); self.hl_path_fill(p, "#f1c40f"); CustomPopup(self.root, "Kết Quả Fleury", f"Lộ trình: {p}")
-        except Exception as e: CustomPopup(self.root, "Lỗi", str(e), is_error=True)
+        def done(p): self.hl_path_fill(p, "#f1c40f"); self.notify("Kết Quả Fleury", f"Lộ trình: {p}{self.stop_note()}")
+        self.run_algo("Fleury", Graph.fleury_algo, start, on_done=done)
 
     def run_hierholzer(self):
         status, msg, auto = self.graph.get_euler_status()
@@ -331,51 +401,83 @@ class GraphGUI:
         if status == 2:
             u, _ = self.ask_node("Hierholzer", f"Chọn Đỉnh Bắt Đầu:\n(Mặc định: {auto})")
             if u is not None: start = u
-        try: p = self.graph.hierholzer_algo(start); self.hl_path_fill(p, "#e67e22"); CustomPopup(self.root, "Kết Quả Hierholzer", f"Lộ trình: {p}")
-        except Exception as e: CustomPopup(self.root, "Lỗi", str(e), is_error=True)
+        def done(p): self.hl_path_fill(p, "#e67e22"); self.notify("Kết Quả Hierholzer", f"Lộ trình: {p}{self.stop_note()}")
+        self.run_algo("Hierholzer", Graph.hierholzer_algo, start, on_done=done)
 
     def run_hamilton(self):
-        if len(self.graph.nodes) < 2: CustomPopup(self.root, "Lỗi", "Đồ thị cần ít nhất 2 đỉnh.", is_error=True); return
-        hc, cp = self.graph.check_hamilton()
-        if hc:
+        if self.graph.nodes.count < 2: CustomPopup(self.root, "Lỗi", "Đồ thị cần ít nhất 2 đỉnh.", is_error=True); return
+        def partial(p): self.hl_path_fill(p, "#fd79a8"); self.notify("Đã Dừng", f"Đường đi dài nhất đã thử: {p}{self.stop_note()}", is_error=True)
+        def path_done(res):
+            hp, pp = res
+            if self.stopped: partial(pp)
+            elif hp: CustomPopup(self.root, "Thông Báo", "Có ĐƯỜNG ĐI Hamilton."); self.hl_path_fill(pp, "#fd79a8"); self.notify("Kết Quả", f"Đường đi: {pp}")
+            else: CustomPopup(self.root, "Thất Bại", "Không có Hamilton.", is_error=True)
+        def cycle_done(res):
+            hc, cp = res
+            if self.stopped: partial(cp); return
+            if not hc: self.run_algo("Hamilton", Graph.check_hamilton_path, on_done=path_done); return
             CustomPopup(self.root, "Thành Công", "Tìm thấy CHU TRÌNH Hamilton!\nBấm 'Đã Hiểu' để chọn đỉnh xuất phát.")
             u, _ = self.ask_node("Hamilton", "Chọn Đỉnh Bắt Đầu:")
             fp = cp
             if u is not None and u in cp[:-1]:
                 idx = cp[:-1].index(u); fp = cp[:-1][idx:] + cp[:-1][:idx]; fp.append(u)
-            self.hl_path_fill(fp, "#e84393"); CustomPopup(self.root, "Kết Quả", f"Chu trình: {fp}"); return
-        hp, pp = self.graph.check_hamilton_path()
-        if hp: CustomPopup(self.root, "Thông Báo", "Có ĐƯỜNG ĐI Hamilton."); self.hl_path_fill(pp, "#fd79a8"); CustomPopup(self.root, "Kết Quả", f"Đường đi: {pp}")
-        else: CustomPopup(self.root, "Thất Bại", "Không có Hamilton.", is_error=True)
+            self.hl_path_fill(fp, "#e84393"); self.notify("Kết Quả", f"Chu trình: {fp}")
+        self.run_algo("Hamilton", Graph.check_hamilton, on_done=cycle_done)
 
+    def run_tsp(self, construct, metric=None):
+        if self.graph.nodes.count < 2: CustomPopup(self.root, "Lỗi", "Đồ thị cần ít nhất 2 đỉnh.", is_error=True); return
+        s, _ = self.ask_node("TSP", "Chọn Đỉnh Xuất Phát:")
+        if s is None: return
+        # Chưa vẽ cạnh nào thì dùng khoảng cách Euclid giữa các đỉnh
+        if metric is None: metric = tsp.GRAPH if len(self.graph.edges) else tsp.EUCLID
+        def done(res):
+            tour, cost = res
+            if not tour: CustomPopup(self.root, "Thất Bại", f"Không có chu trình đi qua mọi đỉnh!{self.stop_note()}", is_error=True); return
+            kind = "Tối ưu (Held-Karp)" if self.graph.nodes.count <= tsp.EXACT_LIMIT and not self.stopped else "Heuristic"
+            cost_txt = str(int(cost)) if float(cost).is_integer() else f"{cost:.2f}"
+            self.hl_path_fill(tour, "#00b894"); self.notify("Kết Quả TSP", f"{kind}\nTổng Chi Phí: {cost_txt}\nChu trình: {tour}{self.stop_note()}")
+        self.run_algo("TSP", tsp.solve, start=s, metric=metric, construct=construct, on_done=done)
+
+    # Cạnh trả về là view trên bản chụp của worker: ánh xạ lại sang cạnh của self.graph theo chỉ số
     def run_prim(self): 
         if any(e.is_directed for e in self.graph.edges): CustomPopup(self.root, "Lỗi", "MST chỉ áp dụng cho VÔ HƯỚNG!", is_error=True); return
-        e,w=self.graph.prim(); self.hl_edge(e, "#3498db"); CustomPopup(self.root, "Prim MST", f"Tổng Trọng Số: {w}")
+        def done(res): e, w = res; self.hl_edge([self.graph.edges[x.id] for x in e], "#3498db"); self.notify("Prim MST", f"Tổng Trọng Số: {w}{self.stop_note()}")
+        self.run_algo("Prim", Graph.prim, on_done=done)
 
     def run_kruskal(self):
         if any(e.is_directed for e in self.graph.edges): CustomPopup(self.root, "Lỗi", "MST chỉ áp dụng cho VÔ HƯỚNG!", is_error=True); return
-        e,w=self.graph.kruskal(); self.hl_edge(e, "#9b59b6"); CustomPopup(self.root, "Kruskal MST", f"Tổng Trọng Số: {w}")
+        def done(res): e, w = res; self.hl_edge([self.graph.edges[x.id] for x in e], "#9b59b6"); self.notify("Kruskal MST", f"Tổng Trọng Số: {w}{self.stop_note()}")
+        self.run_algo("Kruskal", Graph.kruskal, on_done=done)
 
     def run_bi(self):
-        r,c=self.graph.check_bipartite()
-        if r: 
-            self.draw(); 
-            for nid,v in c.items():
-                n=self.graph.nodes[nid]; col="#e74c3c" if v else "#3498db"
-                sx, sy = int(self.to_screen_x(n.x)), int(self.to_screen_y(n.y))
-                current_r = self.base_r * self.zoom_scale
-                self.cv.create_oval(sx-current_r+5,sy-current_r+5,sx+current_r-5,sy+current_r-5,fill=col) 
-                self.cv.create_text(sx,sy,text=str(n.id),font=("Segoe UI",int(16*self.zoom_scale),"bold"), fill="white")
-            CustomPopup(self.root, "Kết Quả", "Là Đồ Thị 2 Phía")
-        else: CustomPopup(self.root, "Kết Quả", "KHÔNG Phải Đồ Thị 2 Phía", is_error=True)
-
-    def save_state(self):
-        state = self.graph.to_dict(); self.history.append(state)
-        if len(self.history) > 20: self.history.pop(0)
-
+        def done(res):
+            r, c = res
+            if self.stopped: CustomPopup(self.root, "Đã Dừng", f"Chưa kiểm tra xong.{self.stop_note()}", is_error=True); return
+            if r: 
+                self.draw(); 
+                for nid,v in c.items():
+                    n=self.graph.nodes[nid]; col="#e74c3c" if v else "#3498db"
+                    sx, sy = int(self.to_screen_x(n.x)), int(self.to_screen_y(n.y))
+                    current_r = self.base_r * self.zoom_scale
+                    self.cv.create_oval(sx-current_r+5,sy-current_r+5,sx+current_r-5,sy+current_r-5,fill=col,tags="highlight") 
+                    self.cv.create_text(sx,sy,text=str(n.id),font=("Segoe UI",int(16*self.zoom_scale),"bold"), fill="white",tags="highlight")
+                CustomPopup(self.root, "Kết Quả", "Là Đồ Thị 2 Phía")
+            else: CustomPopup(self.root, "Kết Quả", "KHÔNG Phải Đồ Thị 2 Phía", is_error=True)
+        self.run_algo("Kiểm tra 2 phía", Graph.check_bipartite, on_done=done)
+
+    # Hoàn tác / làm lại: dời đỉnh không tăng version nên luôn dựng lại canvas
     def undo(self, event=None):
-        if not self.history: CustomPopup(self.root, "Thông báo", "Không có gì để Undo!"); return
-        last_state = self.history.pop(); self.graph.from_dict(last_state); self.sel_node = None; self.draw()
+        if not self.history.undo(): CustomPopup(self.root, "Thông báo", "Không có gì để Undo!"); return
+        self.after_history()
+
+    def redo(self, event=None):
+        if not self.history.redo(): CustomPopup(self.root, "Thông báo", "Không có gì để Redo!"); return
+        self.after_history()
+
+    def after_history(self):
+        self.sel_node = None; self.band_sel = []; self.status.config(text="Sẵn sàng"); self.anim.stop()
+        # Hoàn tác dời đỉnh không tăng version nên luôn đồng bộ lại (từng phần) thay vì sync()
+        self.view.clear_highlights(); self.view.refresh()
 
     def zoom_event(self, event):
         scale_factor = 0.9 if (event.num == 5 or event.delta < 0) else 1.1
@@ -385,53 +487,96 @@ class GraphGUI:
         wx = (mx / self.zoom_scale) - self.offset_x; wy = (my / self.zoom_scale) - self.offset_y
         self.zoom_scale = new_zoom
         self.offset_x = (mx / self.zoom_scale) - wx; self.offset_y = (my / self.zoom_scale) - wy
-        self.draw()
+        self.view.zoom(mx, my, scale_factor)
 
     def start_pan(self, event): self.last_mouse_x = event.x; self.last_mouse_y = event.y
     def motion_pan(self, event):
         dx = event.x - self.last_mouse_x; dy = event.y - self.last_mouse_y
         self.offset_x += dx / self.zoom_scale; self.offset_y += dy / self.zoom_scale
-        self.last_mouse_x = event.x; self.last_mouse_y = event.y; self.draw()
+        self.last_mouse_x = event.x; self.last_mouse_y = event.y; self.view.pan(dx, dy)
 
     def down(self, e):
         wx = self.to_world_x(self.cv.canvasx(e.x)); wy = self.to_world_y(self.cv.canvasy(e.y))
         nid = self.find_node(wx, wy)
         if nid is not None: self.drag_node = nid; self.is_drag = False
-        else: self.save_state(); self.graph.add_node(wx, wy); self.draw(); self.sel_node=None
+        else: self.sel_node=None; self.draw(); self.graph.add_node(wx, wy); self.view.node_added(len(self.graph.nodes) - 1)
             
     def drag(self, e):
         if self.drag_node is not None: 
-            self.is_drag=True; n=self.graph.nodes[self.drag_node]
-            n.x = self.to_world_x(self.cv.canvasx(e.x)); n.y = self.to_world_y(self.cv.canvasy(e.y)); self.draw()
+            if not self.is_drag: self.draw(); self.history.begin()
+            self.is_drag=True
+            self.graph.move_node(self.drag_node, self.to_world_x(self.cv.canvasx(e.x)), self.to_world_y(self.cv.canvasy(e.y))); self.view.moved(self.drag_node)
             
     def up(self, e):
-        if self.is_drag: self.drag_node=None; self.is_drag=False; return
+        if self.is_drag: self.history.end_all(); self.drag_node=None; self.is_drag=False; return
         wx = self.to_world_x(self.cv.canvasx(e.x)); wy = self.to_world_y(self.cv.canvasy(e.y))
         nid = self.find_node(wx, wy)
         if nid is not None:
             if self.sel_node is None: self.sel_node=nid; self.draw()
             elif self.sel_node!=nid:
-                d=EdgeDialog(self.root, self.sel_node, nid)
-                if d.result: self.save_state(); self.graph.add_edge(self.sel_node, nid, d.result[0], d.result[1])
+                d=EdgeDialog(self.root, self.sel_node, nid); u=self.sel_node
                 self.sel_node=None; self.draw()
+                if d.result: self.view.edge(self.graph.add_edge(u, nid, d.result[0], d.result[1]))
         else: self.sel_node=None; self.draw()
         self.drag_node=None; self.is_drag=False
 
     def find_node(self, wx, wy):
-        for n in self.graph.nodes:
-            if math.hypot(n.x - wx, n.y - wy) < self.base_r + 5: return n.id
-        return None
-
+        hits = self.graph.grid().nodes_near(wx, wy, self.base_r + 5)
+        return hits[0] if hits else None
+
+    # --- CHỌN VÙNG (Shift + kéo chuột trái), phím Delete xóa các đỉnh đã chọn ---
+    def band_down(self, e):
+        self.band_sel = []; self.draw()
+        self.band = (self.cv.canvasx(e.x), self.cv.canvasy(e.y))
+        self.cv.create_rectangle(*self.band, *self.band, outline="#2980b9", dash=(4, 2), width=2, tags="band")
+
+    def band_drag(self, e):
+        if self.band: self.cv.coords("band", *self.band, self.cv.canvasx(e.x), self.cv.canvasy(e.y))
+
+    def band_up(self, e):
+        if not self.band: return
+        (x0, y0), x1, y1 = self.band, self.cv.canvasx(e.x), self.cv.canvasy(e.y)
+        self.cv.delete("band"); self.band = None
+        wx0, wx1 = sorted((self.to_world_x(x0), self.to_world_x(x1))); wy0, wy1 = sorted((self.to_world_y(y0), self.to_world_y(y1)))
+        self.band_sel = self.graph.grid().nodes_in_rect(wx0, wy0, wx1, wy1)
+        r = self.base_r * self.zoom_scale
+        for nid in self.band_sel:
+            n = self.graph.nodes[nid]; sx, sy = self.to_screen_x(n.x), self.to_screen_y(n.y)
+            self.cv.create_oval(sx - r, sy - r, sx + r, sy + r, outline="#2980b9", width=max(2, 6.0 * self.zoom_scale), tags="highlight")
+        self.status.config(text=f"Đã chọn {len(self.band_sel)} đỉnh (Delete: xóa)" if self.band_sel else "Sẵn sàng")
+
+    def delete_selected(self, event=None):
+        if not self.band_sel: return
+        with self.history:
+            for nid in self.band_sel: self.graph.remove_node(nid)
+            self.graph.maybe_compact()
+        self.band_sel = []; self.sel_node = None; self.status.config(text="Sẵn sàng"); self.draw()
+
+    # Đọc / ghi file trong luồng I/O của worker; chỉ áp dụng kết quả trên luồng Tk.
+    # Lưu theo phần mở rộng (.tspg nhị phân / .json); khi mở, định dạng được tự nhận dạng.
+    FILE_TYPES = [("Đồ thị nhị phân", "*" + graphio.BINARY_EXT), ("JSON", "*.json")]
     def save(self):
-        f=filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON","*.json")]); 
-        if f: 
-            with open(f,"w") as file: json.dump(self.graph.to_dict(), file)
-            CustomPopup(self.root, "OK", "Đã lưu thành công.")
+        f=filedialog.asksaveasfilename(defaultextension=graphio.BINARY_EXT, filetypes=self.FILE_TYPES); 
+        if f: self.worker.io("Lưu", graphio.save, f, *graphio.snapshot(self.graph), on_done=lambda _: CustomPopup(self.root, "OK", "Đã lưu thành công."), on_error=self.io_error)
     def load(self):
-        f=filedialog.askopenfilename(filetypes=[("JSON","*.json")])
-        if f: 
-            with open(f,"r") as file: self.graph.from_dict(json.load(file)); self.draw(); self.history = [] 
-    def clear(self): self.save_state(); self.graph.clear(); self.sel_node=None; self.draw()
+        f=filedialog.askopenfilename(filetypes=[("Đồ thị", "*" + graphio.BINARY_EXT + " *.json")] + self.FILE_TYPES + [("Tất cả", "*.*")])
+        if f: self.worker.io("Mở", graphio.load, f, on_done=self.loaded, on_error=self.io_error)
+    def loaded(self, cols): self.graph.restore(*cols); self.sel_node=None; self.draw(); self.history.reset()
+
+    # Nhập file chuẩn trong worker (có tiến độ, dừng được); dừng giữa chừng thì giữ phần đã đọc
+    def import_file(self):
+        if self.worker.busy: CustomPopup(self.root, "Đang Bận", f"Đang chạy {self.worker.job.name}...", is_error=True); return
+        f=filedialog.askopenfilename(filetypes=[("TSPLIB","*.tsp *.atsp"), ("DIMACS","*.gr"), ("CSV / danh sách cạnh","*.csv *.txt *.edges"), ("Tất cả","*.*")])
+        if not f: return
+        def done(cols, timed_out, cancelled):
+            self.end_progress(); self.last_stop = (timed_out, cancelled); self.loaded(cols)
+            if self.stopped: CustomPopup(self.root, "Đã Dừng", f"Chỉ nhập được một phần file.{self.stop_note()}", is_error=True)
+        def fail(e): self.end_progress(); self.io_error(e)
+        self.worker.run("Nhập file", Graph(), importers.import_file, (f,), on_done=done, on_error=fail)
+        self.status.config(text="Đang nhập file..."); self.progress.start(15); self.root.after(200, self.tick_progress)
+
+    def io_error(self, e): CustomPopup(self.root, "Lỗi", str(e), is_error=True)
+    def clear(self): self.graph.clear(); self.sel_node=None; self.draw()
 
     def show_data(self):
         top = tk.Toplevel(self.root); top.title("Dữ Liệu Chi Tiết"); top.geometry("1100x600")
@@ -446,16 +591,51 @@ class GraphGUI:
         node_ids = [str(n.id) for n in self.graph.nodes]; mat_cols = [""] + node_ids
         tv_mat = ttk.Treeview(f_mat, columns=mat_cols, show="headings")
         for c in mat_cols: tv_mat.heading(c, text=c); tv_mat.column(c, width=60, anchor="center")
-        matrix = self.graph.get_matrix()
-        for i, row in enumerate(matrix):
-            row_vals = []; row_vals.append(str(self.graph.nodes[i].id))
-            for x in row:
-                if x == 0: row_vals.append(".")
-                else: row_vals.append(str(int(x)) if isinstance(x, float) and x.is_integer() else str(x))
-            tv_mat.insert("", "end", values=row_vals)
+        live = self.graph.nodes.live(); mode = tk.StringVar(value="w"); note = tk.Label(f_mat, text="", font=("Segoe UI", 11))
+        def num(x): return str(int(x)) if isinstance(x, float) and x.is_integer() else str(x)
+        def draw(cell):
+            for i in live: tv_mat.insert("", "end", values=[str(i)] + [cell(i, j) for j in live])
+        def show_dist(D):
+            note.config(text=f"Phương pháp: {D.method}"); draw(lambda i, j: "∞" if D.d(i, j) == float('inf') else num(D.d(i, j)))
+        # Kết quả từ worker: bỏ qua nếu cửa sổ đã đóng hoặc đã chuyển về chế độ trọng số
+        def got(D):
+            if not tv_mat.winfo_exists(): return
+            if self.stopped or not D.complete: note.config(text="Chưa tính xong khoảng cách." + self.stop_note().replace("\n", " ")); return
+            apsp.store(self.graph, D)
+            if mode.get() == "d": show_dist(D)
+        # "w": trọng số cạnh; "d": khoảng cách ngắn nhất mọi cặp — dùng lại kết quả khi đồ thị chưa
+        # đổi, chưa có thì tính trong worker (O(V (V + E) log V) / O(V^3), không chạy trên luồng Tk)
+        def fill():
+            tv_mat.delete(*tv_mat.get_children()); note.config(text="")
+            if mode.get() == "w":
+                matrix = self.graph.get_matrix(); draw(lambda i, j: "." if matrix[i][j] == 0 else num(matrix[i][j])); return
+            D = apsp.lookup(self.graph)
+            if D is not None: show_dist(D); return
+            note.config(text="Đang tính khoảng cách..."); self.run_algo("Khoảng cách mọi cặp", apsp.all_pairs, on_done=got,
+                                                                         on_error=lambda e: tv_mat.winfo_exists() and note.config(text=str(e)))
+        f_mode = tk.Frame(f_mat); f_mode.pack(side=tk.TOP, fill=tk.X)
+        for text, val in (("Trọng số cạnh", "w"), ("Khoảng cách ngắn nhất (mọi cặp)", "d")):
+            tk.Radiobutton(f_mode, text=text, variable=mode, value=val, command=fill, font=("Segoe UI", 11)).pack(side=tk.LEFT, padx=5)
+        note.pack(in_=f_mode, side=tk.LEFT, padx=15)
+        fill()
         sb_mat_x = ttk.Scrollbar(f_mat, orient="horizontal", command=tv_mat.xview); sb_mat_y = ttk.Scrollbar(f_mat, orient="vertical", command=tv_mat.yview)
         tv_mat.configure(xscrollcommand=sb_mat_x.set, yscrollcommand=sb_mat_y.set); sb_mat_x.pack(side=tk.BOTTOM, fill=tk.X); sb_mat_y.pack(side=tk.RIGHT, fill=tk.Y); tv_mat.pack(fill=tk.BOTH, expand=True)
         f_adj = tk.Frame(nb); nb.add(f_adj, text="Danh Sách Kề")
         t = tk.Text(f_adj, font=("Consolas", 16), padx=10, pady=10); t.pack(fill=tk.BOTH, expand=True)
         adj = self.graph.get_adj(directed=False) 
-        for k,v in adj.items(): t.insert(tk.END, f"Node {k} -> {v}\n")
\ No newline at end of file
+        for k,v in adj.items(): t.insert(tk.END, f"Node {k} -> {v}\n")
+        # Thống kê các lần chạy gần nhất (mới nhất ở trên); chọn một dòng để xem bảng cProfile
+        f_st = tk.Frame(nb); nb.add(f_st, text="Thống Kê")
+        st_cols = ("Thuật toán", "Thời gian (ms)", "Đỉnh", "Cạnh", "Bộ đếm", "Trạng thái")
+        tv_st = ttk.Treeview(f_st, columns=st_cols, show="headings", height=10)
+        for c, w in zip(st_cols, (140, 110, 70, 70, 560, 90)): tv_st.heading(c, text=c); tv_st.column(c, width=w, anchor="center" if c != "Bộ đếm" else "w")
+        tv_st.pack(fill=tk.X)
+        t_prof = tk.Text(f_st, font=("Consolas", 11), padx=10, pady=10, wrap="none"); t_prof.pack(fill=tk.BOTH, expand=True)
+        runs = list(reversed(self.worker.stats))
+        for i, s in enumerate(runs):
+            counts = ", ".join(f"{k}={v}" for k, v in sorted(s.counters.items()))
+            tv_st.insert("", "end", iid=str(i), values=(s.name, f"{s.seconds * 1000:.2f}", s.n, s.m, counts, s.status))
+        def show_profile(_):
+            sel = tv_st.selection(); t_prof.delete("1.0", tk.END)
+            if sel: t_prof.insert(tk.END, runs[int(sel[0])].profile or "(Chạy lại với 'Hồ sơ cProfile' để có bảng hồ sơ)")
+        tv_st.bind("<<TreeviewSelect>>", show_profile)
\ No newline at end of file
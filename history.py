@@ -0,0 +1,87 @@
+from collections import deque
+
+# =======================================================================================
+# LỊCH SỬ HOÀN TÁC / LÀM LẠI BẰNG THAO TÁC NGƯỢC
+# Graph ghi (tên phương thức, tham số) của thao tác ngược vào journal mỗi khi bị sửa; một
+# bước hoàn tác là một nhóm các thao tác đó. Hoàn tác = gọi lại nhóm theo thứ tự ngược, và
+# trong lúc gọi Graph lại ghi ra thao tác ngược của chúng — đó chính là bước làm lại.
+# Giới hạn theo số bước và theo ước lượng bộ nhớ; bước cũ nhất bị bỏ trước.
+# =======================================================================================
+DEFAULT_STEPS = 200
+DEFAULT_BYTES = 16 << 20
+
+# Ước lượng bộ nhớ (byte) của một thao tác ngược
+def _cost(name, args):
+    if name == "restore": return 96 + 16 * len(args[0]) + 25 * len(args[1])
+    return 96
+
+class History:
+    def __init__(self, graph, steps=DEFAULT_STEPS, max_bytes=DEFAULT_BYTES):
+        self.graph = graph; self.steps = steps; self.max_bytes = max_bytes
+        self.undo_stack = deque(); self.redo_stack = []; self.bytes = 0
+        self.group = None; self.depth = 0; self.capture = None
+        graph.journal = self
+
+    @property
+    def can_undo(self): return bool(self.undo_stack)
+    @property
+    def can_redo(self): return bool(self.redo_stack)
+
+    # Gom các thao tác giữa begin() / end() (hoặc trong `with history:`) thành một bước
+    def begin(self):
+        if self.depth == 0: self.group = []
+        self.depth += 1
+
+    def end(self):
+        if self.depth == 0: return
+        self.depth -= 1
+        if self.depth == 0:
+            g, self.group = self.group, None
+            if g: self._push(g)
+
+    def __enter__(self): self.begin(); return self
+    def __exit__(self, *exc): self.end()
+
+    # Graph gọi: `name(*args)` đưa đồ thị về trạng thái ngay trước thao tác vừa làm
+    def record(self, name, args):
+        if self.capture is not None: self.capture.append((name, args)); return
+        if self.group is None: self._push([(name, args)]); return
+        g = self.group
+        # Kéo đỉnh: chỉ cần vị trí trước lần dời đầu tiên trong bước
+        if name == "move_node" and g and g[-1][0] == "move_node" and g[-1][1][0] == args[0]: return
+        g.append((name, args))
+
+    def _push(self, g, keep_redo=False):
+        size = sum(_cost(n, a) for n, a in g)
+        self.undo_stack.append((g, size)); self.bytes += size
+        if not keep_redo: self.redo_stack = []
+        while self.undo_stack and (len(self.undo_stack) > self.steps or self.bytes > self.max_bytes):
+            self.bytes -= self.undo_stack.popleft()[1]
+
+    def _replay(self, g):
+        self.capture = []
+        try:
+            for name, args in reversed(g): getattr(self.graph, name)(*args)
+            return self.capture
+        finally: self.capture = None
+
+    def undo(self):
+        self.end_all()
+        if not self.undo_stack: return False
+        g, size = self.undo_stack.pop(); self.bytes -= size
+        self.redo_stack.append(self._replay(g))
+        return True
+
+    def redo(self):
+        self.end_all()
+        if not self.redo_stack: return False
+        self._push(self._replay(self.redo_stack.pop()), keep_redo=True)
+        return True
+
+    # Đóng nhóm đang mở (vd. kéo chuột bị ngắt giữa chừng)
+    def end_all(self):
+        while self.depth: self.end()
+
+    def reset(self):
+        self.undo_stack.clear(); self.redo_stack = []; self.bytes = 0
+        self.group = None; self.depth = 0
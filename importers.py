@@ -0,0 +1,175 @@
+import math
+import os
+
+# =======================================================================================
+# NHẬP ĐỒ THỊ TỪ FILE CHUẨN (đọc dòng theo luồng, không nạp cả file vào bộ nhớ)
+# - TSPLIB (.tsp / .atsp): EUC_2D / CEIL_2D / ATT -> chỉ tọa độ (TSP dùng khoảng cách Euclid);
+#   GEO -> tọa độ chiếu (km) và, khi n <= GEO_EDGE_LIMIT, đồ thị đầy đủ với khoảng cách GEO;
+#   EXPLICIT -> cạnh từ ma trận trọng số (mọi EDGE_WEIGHT_FORMAT dạng ma trận / tam giác).
+# - DIMACS (.gr): "p sp n m", "a u v w" (cung có hướng, đỉnh đánh số từ 1); tọa độ lấy từ file
+#   .co cùng tên nếu có.
+# - CSV / danh sách cạnh: "u,v[,w[,d]]" (phân cách , ; tab hoặc khoảng trắng), nhãn đỉnh tùy ý.
+# Cạnh được gom theo lô CHUNK rồi thêm bằng Graph.add_edges. budget (model.Budget) dùng để
+# báo tiến độ theo số byte đã đọc và để hủy; khi dừng, phần đã đọc được giữ lại.
+# Đỉnh không có tọa độ được xếp theo hình hoa hướng dương (không cần biết trước số đỉnh).
+# =======================================================================================
+TSPLIB, DIMACS, CSV = "tsplib", "dimacs", "csv"
+CHUNK = 1 << 16
+GEO_EDGE_LIMIT = 500
+SPACING = 60.0
+GOLDEN = math.pi * (3 - math.sqrt(5))
+RRR = 6378.388
+
+def layout(i):
+    r = SPACING * math.sqrt(i + 0.5); t = i * GOLDEN
+    return r * math.cos(t), r * math.sin(t)
+
+def detect(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".tsp", ".atsp"): return TSPLIB
+    if ext == ".gr": return DIMACS
+    return CSV
+
+# Dòng đã giải mã và bỏ khoảng trắng; báo tiến độ mỗi CHUNK dòng, dừng khi budget hết hạn
+def _lines(path, budget=None):
+    total = os.path.getsize(path) or 1; done = 0; k = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            done += len(raw); k += 1
+            if budget:
+                if budget.expired(): return
+                if k % CHUNK == 0: budget.report(done / total)
+            line = raw.decode("utf-8", "replace").strip()
+            if line: yield line
+    if budget: budget.report(1.0)
+
+class _Batch:
+    def __init__(self, graph): self.graph = graph; self.rows = []
+    def add(self, u, v, w, d):
+        self.rows.append((u, v, w, d))
+        if len(self.rows) >= CHUNK: self.flush()
+    def flush(self):
+        if self.rows: self.graph.add_edges(self.rows); self.rows = []
+
+# --- TSPLIB ---
+def _geo(x):
+    deg = int(x); return math.pi * (deg + 5.0 * (x - deg) / 3.0) / 180.0
+
+def geo_distance(a, b):
+    (la, lo), (lb, lob) = a, b
+    q1 = math.cos(lo - lob); q2 = math.cos(la - lb); q3 = math.cos(la + lb)
+    return float(int(RRR * math.acos(max(-1.0, min(1.0, 0.5 * ((1 + q1) * q2 - (1 - q1) * q3)))) + 1))
+
+# Thứ tự các ô (i, j) của EDGE_WEIGHT_SECTION; *_COL của tam giác trên = *_ROW của tam giác dưới
+def _cells(fmt, n):
+    if fmt == "FULL_MATRIX": return ((i, j) for i in range(n) for j in range(n))
+    if fmt in ("UPPER_ROW", "LOWER_COL"): return ((i, j) for i in range(n) for j in range(i + 1, n))
+    if fmt in ("LOWER_ROW", "UPPER_COL"): return ((i, j) for i in range(n) for j in range(i))
+    if fmt in ("UPPER_DIAG_ROW", "LOWER_DIAG_COL"): return ((i, j) for i in range(n) for j in range(i, n))
+    if fmt in ("LOWER_DIAG_ROW", "UPPER_DIAG_COL"): return ((i, j) for i in range(n) for j in range(i + 1))
+    raise ValueError(f"Không hỗ trợ EDGE_WEIGHT_FORMAT {fmt}")
+
+def read_tsplib(graph, path, budget=None):
+    spec = {}; section = None; n = 0; batch = _Batch(graph); cells = None; geo = []
+    directed = False; wtype = "EUC_2D"
+    for line in _lines(path, budget):
+        head = line.split(":", 1)[0].strip().upper()
+        if head == "EOF": break
+        if head.endswith("_SECTION"):
+            section = head
+            if section == "EDGE_WEIGHT_SECTION":
+                fmt = spec.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper()
+                cells = _cells(fmt, n); directed = fmt == "FULL_MATRIX" and spec.get("TYPE", "TSP").upper() == "ATSP"
+                full = fmt == "FULL_MATRIX"
+            elif section not in ("NODE_COORD_SECTION", "DISPLAY_DATA_SECTION"): section = "SKIP"
+            continue
+        if ":" in line and head[:1].isalpha():
+            # Dòng đặc tả "KEY : VALUE"
+            val = line.split(":", 1)[1].strip(); spec[head] = val; section = None
+            if head == "DIMENSION":
+                n = int(val)
+                for i in range(len(graph.nodes), n): graph.add_node(*layout(i))
+            elif head == "EDGE_WEIGHT_TYPE": wtype = val.upper()
+            continue
+        if section in ("NODE_COORD_SECTION", "DISPLAY_DATA_SECTION"):
+            parts = line.split(); i = int(parts[0]) - 1; x, y = float(parts[1]), float(parts[2])
+            while len(graph.nodes) <= i: graph.add_node(*layout(len(graph.nodes)))
+            if section == "NODE_COORD_SECTION" and wtype == "GEO":
+                la, lo = _geo(x), _geo(y); geo.append((i, la, lo)); x, y = RRR * lo, -RRR * la
+            graph.nodes.x[i] = x; graph.nodes.y[i] = y
+        elif section == "EDGE_WEIGHT_SECTION":
+            for tok in line.split():
+                i, j = next(cells); w = float(tok)
+                if i == j or (full and not directed and j < i): continue
+                batch.add(i, j, w, directed)
+    if wtype == "GEO" and len(geo) <= GEO_EDGE_LIMIT:
+        for a in range(len(geo)):
+            if budget and budget.expired(): break
+            for b in range(a + 1, len(geo)):
+                batch.add(geo[a][0], geo[b][0], geo_distance(geo[a][1:], geo[b][1:]), False)
+    batch.flush()
+    return graph
+
+# --- DIMACS ---
+def _dimacs_coords(path, budget=None):
+    out = {}
+    for line in _lines(path, budget):
+        if line[0] == "v":
+            _, i, x, y = line.split()[:4]; out[int(i) - 1] = (float(x), float(y))
+    return out
+
+def read_dimacs(graph, path, budget=None, coords=None):
+    if coords is None:
+        co = os.path.splitext(path)[0] + ".co"
+        coords = _dimacs_coords(co) if os.path.exists(co) else {}
+    batch = _Batch(graph)
+    for line in _lines(path, budget):
+        c = line[0]
+        if c == "a":
+            _, u, v, w = line.split()[:4]; batch.add(int(u) - 1, int(v) - 1, float(w), True)
+        elif c == "p":
+            n = int(line.split()[2])
+            for i in range(len(graph.nodes), n): graph.add_node(*coords.get(i, layout(i)))
+    batch.flush()
+    return graph
+
+# --- CSV / DANH SÁCH CẠNH ---
+HEADER_NAMES = {"u", "v", "source", "target", "from", "to", "src", "dst", "node1", "node2"}
+
+def _split(line):
+    for sep in (",", ";", "\t"):
+        if sep in line: return [p.strip() for p in line.split(sep)]
+    return line.split()
+
+def _number(s):
+    try: return float(s)
+    except ValueError: return None
+
+def read_csv(graph, path, budget=None, directed=False):
+    ids = {}; batch = _Batch(graph); first = True
+    def node(label):
+        i = ids.get(label)
+        if i is None: i = ids[label] = len(graph.nodes); graph.add_node(*layout(i))
+        return i
+    for line in _lines(path, budget):
+        if line[0] == "#": continue
+        parts = _split(line)
+        if len(parts) < 2: continue
+        if first:
+            first = False
+            if parts[0].lower() in HEADER_NAMES or (len(parts) > 2 and _number(parts[2]) is None): continue
+        w = _number(parts[2]) if len(parts) > 2 else None
+        d = parts[3].lower() in ("1", "true", "yes", "d") if len(parts) > 3 else directed
+        batch.add(node(parts[0]), node(parts[1]), 1.0 if w is None else w, d)
+    batch.flush()
+    return graph
+
+READERS = {TSPLIB: read_tsplib, DIMACS: read_dimacs, CSV: read_csv}
+
+def read(graph, path, fmt=None, budget=None):
+    return READERS[fmt or detect(path)](graph, path, budget=budget)
+
+# Dùng với Worker.run trên một Graph rỗng: trả về các cột để bên gọi Graph.restore()
+def import_file(graph, path, fmt=None, budget=None):
+    read(graph, path, fmt, budget)
+    return graph.nodes, graph.edges
@@ -0,0 +1,59 @@
+import cProfile
+import io
+import pstats
+import time
+
+from model import Budget
+
+# =======================================================================================
+# ĐO ĐẠC THUẬT TOÁN
+# Mỗi thuật toán tự đếm các thao tác chính bằng biến cục bộ rồi cộng một lần vào
+# Budget.counters khi kết thúc (Budget.tally) — không tốn gì thêm trong vòng lặp nóng.
+#   bfs / dfs            expanded, pushes, pops
+#   dijkstra / prim      pushes, pops, expanded, relaxations
+#   bellman_ford         rounds, relaxations, edge_scans
+#   kruskal              edge_scans, unions
+#   hamilton             dp_states | expanded, backtracks, restarts
+#   fleury               bridge_checks, bridges_found, expanded
+#   hierholzer           steps, expanded
+#   bipartite            expanded, components
+#   dinic                phases, augmentations (luồng cực đại, cả ford_fulkerson)
+#   push_relabel         pushes, relabels, gaps, global_relabels
+# run() gói một lần chạy: thời gian tường, bộ đếm, cờ dừng và (tùy chọn) bảng cProfile.
+# =======================================================================================
+PROFILE_LINES = 25
+
+class Stats:
+    __slots__ = ("name", "seconds", "counters", "timed_out", "cancelled", "profile", "n", "m")
+
+    def __init__(self, name, seconds=0.0, counters=None, timed_out=False, cancelled=False, profile=None, n=0, m=0):
+        self.name = name; self.seconds = seconds; self.counters = counters or {}
+        self.timed_out = timed_out; self.cancelled = cancelled; self.profile = profile; self.n = n; self.m = m
+
+    @property
+    def status(self): return "hủy" if self.cancelled else "hết giờ" if self.timed_out else "xong"
+
+    def as_dict(self):
+        return {"algorithm": self.name, "seconds": self.seconds, "nodes": self.n, "edges": self.m,
+                "counters": dict(self.counters), "timed_out": self.timed_out, "cancelled": self.cancelled,
+                "profile": self.profile}
+
+def _name(fn): return getattr(fn, "__qualname__", None) or getattr(fn, "__name__", None) or repr(fn)
+
+def format_profile(prof, lines=PROFILE_LINES):
+    out = io.StringIO(); pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(lines)
+    return out.getvalue()
+
+# fn(graph, *args, budget=..., **kw) -> (kết quả, Stats); budget mặc định là Budget() không giới hạn
+def run(fn, graph, *args, budget=None, profile=False, name=None, **kw):
+    b = budget if budget is not None else Budget()
+    prof = cProfile.Profile() if profile else None
+    t = time.perf_counter()
+    if prof: prof.enable()
+    try: res = fn(graph, *args, budget=b, **kw)
+    finally:
+        if prof: prof.disable()
+        dt = time.perf_counter() - t
+    st = Stats(name or _name(fn), dt, dict(b.counters), b.timed_out, b.cancelled,
+               format_profile(prof) if prof else None, graph.nodes.count, len(graph.edges))
+    return res, st
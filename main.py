@@ -1,5 +1,12 @@
-import tkinter as tk
+import sys
 import platform
+
+# Có tham số dòng lệnh: chạy không giao diện (cli.py), không import tkinter
+if __name__ == "__main__" and len(sys.argv) > 1:
+    from cli import main
+    sys.exit(main())
+
+import tkinter as tk
 from gui import GraphGUI
 
 # =======================================================================================
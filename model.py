@@ -1,155 +1,619 @@
 import heapq
+from array import array
 from collections import deque, defaultdict
 import math
+import random
+import threading
+import time
 
+from spatial import Grid
+import flow
+
+# --- LƯU TRỮ DẠNG CỘT ---
+# Graph.nodes / Graph.edges là các cột array song song; Node / Edge chỉ là "khung nhìn"
+# (__slots__) vào một hàng, được tạo khi truy cập nên không tốn bộ nhớ lưu trữ.
 class Node:
-    def __init__(self, node_id, x, y):
-        self.id, self.x, self.y = node_id, x, y
+    __slots__ = ("_c", "_i")
+    def __init__(self, cols, i): self._c, self._i = cols, i
+    @property
+    def id(self): return self._i
+    @property
+    def x(self): return self._c.x[self._i]
+    @x.setter
+    def x(self, val): self._c.x[self._i] = val
+    @property
+    def y(self): return self._c.y[self._i]
+    @y.setter
+    def y(self, val): self._c.y[self._i] = val
 
 class Edge:
-    def __init__(self, u, v, w=1.0, d=False):
-        self.u, self.v, self.weight, self.is_directed = u, v, w, d
+    __slots__ = ("_c", "_i")
+    def __init__(self, cols, i): self._c, self._i = cols, i
+    @property
+    def id(self): return self._i
+    @property
+    def u(self): return self._c.u[self._i]
+    @property
+    def v(self): return self._c.v[self._i]
+    @property
+    def weight(self): return self._c.w[self._i]
+    @property
+    def is_directed(self): return bool(self._c.d[self._i])
+
+# Đỉnh bị xóa chỉ được đánh dấu (alive[i] = 0) nên chỉ số đỉnh là id ổn định: len() là số ô,
+# count là số đỉnh còn sống, duyệt `for n in nodes` bỏ qua ô đã xóa.
+class NodeColumns:
+    __slots__ = ("x", "y", "alive", "dead")
+    def __init__(self): self.x = array('d'); self.y = array('d'); self.alive = bytearray(); self.dead = 0
+    def __len__(self): return len(self.x)
+    def __bool__(self): return len(self.x) > self.dead
+    @property
+    def count(self): return len(self.x) - self.dead
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.x): raise IndexError(i)
+        return Node(self, i)
+    def __iter__(self): return (Node(self, i) for i in range(len(self.x)) if self.alive[i])
+    def live(self): return [i for i in range(len(self.x)) if self.alive[i]] if self.dead else list(range(len(self.x)))
+    def append(self, x, y): self.x.append(x); self.y.append(y); self.alive.append(1)
+    def pop(self):
+        if not self.alive.pop(): self.dead -= 1
+        self.x.pop(); self.y.pop()
+    def kill(self, i): self.alive[i] = 0; self.dead += 1
+    def revive(self, i): self.alive[i] = 1; self.dead -= 1
+    def clear(self): self.__init__()
+    def copy(self):
+        c = NodeColumns(); c.x = self.x[:]; c.y = self.y[:]; c.alive = bytearray(self.alive); c.dead = self.dead
+        return c
+
+class EdgeColumns:
+    __slots__ = ("u", "v", "w", "d")
+    def __init__(self): self.u = array('q'); self.v = array('q'); self.w = array('d'); self.d = bytearray()
+    def __len__(self): return len(self.u)
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.u): raise IndexError(i)
+        return Edge(self, i)
+    def __iter__(self): return (Edge(self, i) for i in range(len(self.u)))
+    def append(self, u, v, w, d): self.u.append(u); self.v.append(v); self.w.append(w); self.d.append(1 if d else 0)
+    def any_directed(self): return 1 in self.d
+    def clear(self): self.__init__()
+    def copy(self):
+        c = EdgeColumns(); c.u = self.u[:]; c.v = self.v[:]; c.w = self.w[:]; c.d = bytearray(self.d)
+        return c
+
+    # Xóa hàng i bằng cách đưa hàng cuối vào chỗ trống (O(1))
+    def swap_pop(self, i):
+        last = len(self.u) - 1
+        if i != last:
+            self.u[i] = self.u[last]; self.v[i] = self.v[last]; self.w[i] = self.w[last]; self.d[i] = self.d[last]
+        self.u.pop(); self.v.pop(); self.w.pop(); self.d.pop()
+
+class _Restart(Exception): pass
+class _Stop(Exception): pass
+
+# --- NGÂN SÁCH THỜI GIAN & HỦY HỢP TÁC ---
+# Thuật toán gọi budget.expired() trong vòng lặp trong; đồng hồ / cờ hủy chỉ được kiểm tra
+# mỗi `every` lần gọi. Khi dừng, thuật toán trả về kết quả tốt nhất đang có và đặt
+# timed_out / cancelled để bên gọi biết kết quả chưa hoàn chỉnh. on_tick (nếu có) được gọi
+# ở mỗi lần kiểm tra — GUI dùng nó để bơm sự kiện Tk khi đang chạy. Việc biết trước khối
+# lượng (vd. nhập file) báo tiến độ 0..1 qua report(); progress(fraction) nhận giá trị đó.
+class Budget:
+    def __init__(self, seconds=None, event=None, on_tick=None, every=1024, progress=None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.event = event if event is not None else threading.Event()
+        self.on_tick = on_tick; self.every = every; self._n = 0
+        self.progress = progress; self.counters = {}
+        self.timed_out = False; self.cancelled = False
+
+    def cancel(self): self.event.set()
+
+    def report(self, fraction):
+        if self.progress: self.progress(fraction)
+
+    # Bộ đếm thao tác (heap push/pop, nới lỏng, đỉnh đã mở, quay lui...): thuật toán đếm bằng
+    # biến cục bộ và cộng dồn vào đây một lần khi kết thúc (xem instrument.py)
+    def tally(self, **counts):
+        c = self.counters
+        for k, v in counts.items(): c[k] = c.get(k, 0) + v
+
+    @property
+    def stopped(self): return self.timed_out or self.cancelled
+
+    def expired(self):
+        if self.stopped: return True
+        self._n += 1
+        if self._n < self.every: return False
+        self._n = 0
+        return self.check()
+
+    # Kiểm tra ngay, không chờ đủ `every` lần gọi (vòng lặp thưa, vd. chờ tiến trình con)
+    def check(self):
+        if self.on_tick: self.on_tick()
+        if self.event.is_set(): self.cancelled = True
+        elif self.deadline is not None and time.monotonic() > self.deadline: self.timed_out = True
+        return self.stopped
+
+# --- DANH SÁCH KỀ NÉN (CSR) ---
+# Hàng u chiếm nbr/wt/eid[off[u]:off[u+1]]; eid là chỉ số cạnh gốc trong Graph.edges.
+# Ba kiểu nhìn: MIXED = như get_adj() (cạnh vô hướng đi 2 chiều), DIRECTED = chỉ u->v,
+# UNDIRECTED = bỏ qua hướng (dùng cho Prim, 2 phía, kiểm tra liên thông).
+# REVERSE = MIXED đảo chiều (chiều lùi của Dijkstra hai chiều).
+MIXED, DIRECTED, UNDIRECTED, REVERSE = "mixed", "directed", "undirected", "reverse"
+
+class CSR:
+    __slots__ = ("n", "off", "nbr", "wt", "eid")
+
+    def __init__(self, n, off, nbr, wt, eid):
+        self.n, self.off, self.nbr, self.wt, self.eid = n, off, nbr, wt, eid
+
+    @classmethod
+    def build(cls, n, src, dst, wt, eid):
+        m = len(src); off = array('q', bytes(8 * (n + 1)))
+        for s in src: off[s + 1] += 1
+        for i in range(n): off[i + 1] += off[i]
+        pos = off[:-1]
+        nbr = array('q', bytes(8 * m)); w = array('d', bytes(8 * m)); ids = array('q', bytes(8 * m))
+        for k in range(m):
+            s = src[k]; p = pos[s]; pos[s] = p + 1
+            nbr[p] = dst[k]; w[p] = wt[k]; ids[p] = eid[k]
+        return cls(n, off, nbr, w, ids)
+
+    def degree(self, u): return self.off[u + 1] - self.off[u]
+    def neighbors(self, u): return self.nbr[self.off[u]:self.off[u + 1]]
+    def row(self, u):
+        a, b = self.off[u], self.off[u + 1]
+        return zip(self.nbr[a:b], self.wt[a:b])
+
+    # Vá tại chỗ thay vì dựng lại: thêm đỉnh cô lập / đổi trọng số một cạnh
+    def add_row(self): self.off.append(self.off[-1]); self.n += 1
+    def set_weight(self, u, edge_id, w):
+        for k in range(self.off[u], self.off[u + 1]):
+            if self.eid[k] == edge_id: self.wt[k] = w
+
+# --- CHUYỂN ĐỔI CỘT <-> DICT (định dạng JSON); id đỉnh là chỉ số ô, ô đã xóa không được ghi ---
+def columns_to_dict(N, E):
+    return {"nodes": [{"id":i,"x":N.x[i],"y":N.y[i]} for i in N.live()],
+            "edges": [{"u":u,"v":v,"w":w,"d":bool(d)} for u, v, w, d in zip(E.u, E.v, E.w, E.d)]}
+
+def columns_from_dict(data):
+    N, E = NodeColumns(), EdgeColumns()
+    at = {n['id']: n for n in data["nodes"]}
+    for i in range(max(at) + 1 if at else 0):
+        n = at.get(i)
+        if n: N.append(n['x'], n['y'])
+        else: N.append(0.0, 0.0); N.kill(i)
+    for e in data["edges"]: E.append(e['u'], e['v'], e['w'], e.get('d',False))
+    return N, E
+
+# Sai số khi so sánh tổng trọng số thực: chỉ nới lỏng khi giảm quá TOL * (1 + |giá trị mới|), để
+# chu trình tổng 0 bị làm tròn thành -1e-16 không bị báo là chu trình âm (SPFA, Bellman-Ford)
+TOL = 1e-9
+
+def _better(a, b): return a < b and b - a > TOL * (1 + abs(a))
 
 class Graph:
     def __init__(self):
-        self.nodes = []
-        self.edges = []
-    
+        self.nodes = NodeColumns()
+        self.edges = EdgeColumns()
+        self._eidx = {}
+        self.version = 0
+        self._csr = {}
+        self._grid = None
+        self._inc = None
+        self._hscale = None
+        self.journal = None
+
+    def _touch(self, structural=True):
+        self.version += 1; self._hscale = None
+        if structural: self.invalidate_csr()
+
+    # Bỏ mọi CSR đã dựng (lần gọi csr() sau dựng lại từ cột cạnh)
+    def invalidate_csr(self): self._csr.clear()
+
+    # Ghi thao tác ngược cho history.History (nếu có): gọi self.name(*args) sẽ hoàn tác
+    def _log(self, name, *args):
+        if self.journal is not None: self.journal.record(name, args)
+
+    def csr(self, view=MIXED):
+        c = self._csr.get(view)
+        if c is None:
+            E = self.edges
+            if view == DIRECTED: src, dst, wt, eid = E.u, E.v, E.w, range(len(E))
+            else:
+                src = array('q'); dst = array('q'); wt = array('d'); eid = array('q')
+                both = view == UNDIRECTED; rev = view == REVERSE
+                for i, (u, v, w, d) in enumerate(zip(E.u, E.v, E.w, E.d)):
+                    if rev: u, v = v, u
+                    src.append(u); dst.append(v); wt.append(w); eid.append(i)
+                    if both or not d: src.append(v); dst.append(u); wt.append(w); eid.append(i)
+            c = self._csr[view] = CSR.build(len(self.nodes), src, dst, wt, eid)
+        return c
+
+    # Lưới không gian (spatial.Grid) dựng khi cần, được vá tại chỗ khi thêm / kéo đỉnh và
+    # thêm / xóa cạnh; bỏ đi khi đánh số lại đỉnh.
+    def grid(self):
+        if self._grid is None: self._grid = Grid(self.nodes, self.edges)
+        return self._grid
+
     def add_node(self, x, y):
-        self.nodes.append(Node(len(self.nodes), x, y))
+        self.nodes.append(x, y)
+        self.version += 1
+        for c in self._csr.values(): c.add_row()
+        if self._grid: self._grid.add_node(len(self.nodes) - 1)
+        self._log("pop_node")
+
+    # Ngược của add_node: bỏ ô cuối (không còn cạnh kề)
+    def pop_node(self):
+        N = self.nodes; i = len(N) - 1; x, y = N.x[i], N.y[i]
+        if self._grid and N.alive[i]: self._grid.remove_node(i)
+        N.pop(); self._touch()
+        self._log("add_node", x, y)
+
+    # --- CẠNH KỀ TỪNG ĐỈNH: đỉnh -> tập chỉ số cạnh, dựng khi cần rồi vá tại chỗ như lưới ---
+    def incident(self, i):
+        if self._inc is None:
+            inc = self._inc = defaultdict(set)
+            for k, (u, v) in enumerate(zip(self.edges.u, self.edges.v)): inc[u].add(k); inc[v].add(k)
+        return self._inc.get(i, ())
+
+    def _inc_add(self, k):
+        if self._inc is not None: E = self.edges; self._inc[E.u[k]].add(k); self._inc[E.v[k]].add(k)
+
+    def _inc_remove(self, k):
+        if self._inc is not None: E = self.edges; self._inc[E.u[k]].discard(k); self._inc[E.v[k]].discard(k)
+
+    # Dời đỉnh (kéo chuột): không đổi cấu trúc nên không tăng version
+    def move_node(self, i, x, y):
+        self._log("move_node", i, self.nodes.x[i], self.nodes.y[i]); g = self._grid
+        if g:
+            es = list(self.incident(i))
+            for e in es: g.remove_edge(e)
+            g.remove_node(i)
+        self.nodes.x[i] = x; self.nodes.y[i] = y; self._hscale = None
+        if g:
+            g.add_node(i)
+            for e in es: g.add_edge(e)
     
+    def _set_weight(self, i, w):
+        E = self.edges; E.w[i] = w; self.version += 1
+        self._hscale = None
+        for view, c in self._csr.items():
+            c.set_weight(E.u[i], i, w)
+            if view in (UNDIRECTED, REVERSE) or (view == MIXED and not E.d[i]): c.set_weight(E.v[i], i, w)
+
+    # Đổi trọng số / hướng của cạnh i
+    def set_edge(self, i, w, d):
+        E = self.edges; self._log("set_edge", i, E.w[i], bool(E.d[i]))
+        if bool(E.d[i]) != d: E.d[i] = 1 if d else 0; self._touch()
+        self._set_weight(i, w)
+
+    # --- CHỈ MỤC CẠNH: (u, v) -> vị trí trong self.edges ---
+    def edge_at(self, u, v):
+        i = self._eidx.get((u, v))
+        return None if i is None else self.edges[i]
+
+    def _pop_edge(self, i):
+        E = self.edges; key = (E.u[i], E.v[i]); last = len(E) - 1; g = self._grid
+        self._log("insert_edge", i, E.u[i], E.v[i], E.w[i], bool(E.d[i]))
+        if g:
+            g.remove_edge(i)
+            if i != last: g.remove_edge(last)
+        self._inc_remove(i)
+        if i != last: self._inc_remove(last); self._eidx[(E.u[last], E.v[last])] = i
+        E.swap_pop(i); del self._eidx[key]
+        if i != last:
+            self._inc_add(i)
+            if g: g.add_edge(i)
+
+    # Ngược của _pop_edge: đặt cạnh vào vị trí i, hàng đang ở i chuyển xuống cuối
+    def insert_edge(self, i, u, v, w, d):
+        E = self.edges; last = len(E); g = self._grid
+        if i == last: E.append(u, v, w, d)
+        else:
+            if g: g.remove_edge(i)
+            self._inc_remove(i)
+            E.append(E.u[i], E.v[i], E.w[i], E.d[i]); self._eidx[(E.u[i], E.v[i])] = last
+            E.u[i] = u; E.v[i] = v; E.w[i] = w; E.d[i] = 1 if d else 0
+            self._inc_add(last)
+            if g: g.add_edge(last)
+        self._eidx[(u, v)] = i; self._touch(); self._inc_add(i)
+        if g: g.add_edge(i)
+        self._log("remove_edge_at", i)
+
+    def remove_edge_at(self, i): self._pop_edge(i); self._touch()
+
+    def _reindex(self): self._eidx = {k: i for i, k in enumerate(zip(self.edges.u, self.edges.v))}
+
     def add_edge(self, u, v, w, d):
-        for e in self.edges:
-            if e.u == u and e.v == v: 
-                e.weight = w; e.is_directed = d; return
-            if not d and not e.is_directed and e.u == v and e.v == u:
-                e.weight = w; return
-        self.edges.append(Edge(u, v, w, d))
+        # Cạnh đúng khóa (u, v) được ưu tiên; cạnh vô hướng (v, u) chỉ được cập nhật khi không có
+        # (u, v) — không phụ thuộc vị trí cạnh (xóa bằng swap-pop làm đổi thứ tự)
+        E = self.edges; i = self._eidx.get((u, v))
+        if i is not None: self.set_edge(i, w, d); return i
+        if not d:
+            j = self._eidx.get((v, u))
+            if j is not None and not E.d[j]: self.set_edge(j, w, False); return j
+        i = self._eidx[(u, v)] = len(E); E.append(u, v, w, d); self._touch(); self._inc_add(i)
+        if self._grid: self._grid.add_edge(i)
+        self._log("remove_edge_at", i)
+        return i
     
+    # Thêm hàng loạt (nhập file): cạnh mới được ghi thẳng vào cột và chỉ mục, version / bộ đệm
+    # CSR chỉ chạm một lần; cạnh trùng đi qua add_edge như bình thường.
+    def add_edges(self, rows):
+        E = self.edges; idx = self._eidx; g = self._grid
+        for u, v, w, d in rows:
+            if (u, v) in idx or (not d and (v, u) in idx): self.add_edge(u, v, w, d); continue
+            i = idx[(u, v)] = len(E); E.append(u, v, w, d); self._inc_add(i)
+            if g: g.add_edge(i)
+            self._log("remove_edge_at", i)
+        self._touch()
+
     def remove_edge(self, u, v, is_directed):
-        new_edges = []
-        for e in self.edges:
-            if is_directed:
-                if e.u == u and e.v == v and e.is_directed: continue
-            else:
-                if (e.u == u and e.v == v) or (e.u == v and e.v == u): continue
-            new_edges.append(e)
-        self.edges = new_edges
+        if is_directed:
+            i = self._eidx.get((u, v))
+            if i is None or not self.edges.d[i]: return
+            self._pop_edge(i)
+        else:
+            keys = [k for k in {(u, v), (v, u)} if k in self._eidx]
+            if not keys: return
+            for k in keys: self._pop_edge(self._eidx[k])
+        self._touch()
 
+    # Xóa đỉnh: gỡ các cạnh kề (O(bậc)) rồi đánh dấu ô là đã xóa — id các đỉnh khác giữ nguyên
     def remove_node(self, node_id):
-        self.edges = [e for e in self.edges if e.u != node_id and e.v != node_id]
-        self.nodes = [n for n in self.nodes if n.id != node_id]
-        old_to_new = {}
-        for i, n in enumerate(self.nodes):
-            old_id = n.id; n.id = i; old_to_new[old_id] = i
-        for e in self.edges:
-            if e.u in old_to_new: e.u = old_to_new[e.u]
-            if e.v in old_to_new: e.v = old_to_new[e.v]
-
-    def clear(self): self.nodes=[]; self.edges=[]
-    
-    def to_dict(self):
-        return {"nodes": [{"id":n.id,"x":n.x,"y":n.y} for n in self.nodes],
-                "edges": [{"u":e.u,"v":e.v,"w":e.weight,"d":e.is_directed} for e in self.edges]}
+        for k in sorted(self.incident(node_id), reverse=True): self._pop_edge(k)
+        if self._grid: self._grid.remove_node(node_id)
+        self.nodes.kill(node_id); self._touch()
+        self._log("revive_node", node_id)
+
+    def revive_node(self, node_id):
+        self.nodes.revive(node_id)
+        if self._grid: self._grid.add_node(node_id)
+        self._touch(False)
+        self._log("remove_node", node_id)
+
+    # --- DỒN CHỈ SỐ: bỏ các ô đã xóa, đánh số lại đỉnh liên tục ---
+    def _dense(self):
+        N, E = self.nodes, self.edges; keep = N.live(); remap = array('q', [-1]) * len(N)
+        nodes = NodeColumns(); edges = EdgeColumns()
+        for new, old in enumerate(keep): remap[old] = new; nodes.append(N.x[old], N.y[old])
+        for u, v, w, d in zip(E.u, E.v, E.w, E.d): edges.append(remap[u], remap[v], w, d)
+        return nodes, edges, keep
+
+    # Bản sao đã dồn chỉ số và danh sách id gốc (keep[i] = id của đỉnh i trong bản sao)
+    def dense(self):
+        g = Graph(); nodes, edges, keep = self._dense(); g.restore(nodes, edges)
+        return g, keep
+
+    # Trả về id cũ theo thứ tự mới (None nếu không có ô nào đã xóa)
+    def compact(self):
+        if not self.nodes.dead: return None
+        nodes, edges, keep = self._dense(); self.restore(nodes, edges)
+        return keep
+
+    # Dồn khi số ô đã xóa vượt số đỉnh còn sống (và COMPACT_MIN): id đổi nên bên gọi chọn thời điểm
+    COMPACT_MIN = 256
+    def maybe_compact(self):
+        N = self.nodes
+        return self.compact() if N.dead > max(self.COMPACT_MIN, N.count) else None
+
+    # Thay toàn bộ dữ liệu cột; cột cũ được giữ nguyên vẹn cho thao tác ngược
+    def restore(self, nodes, edges):
+        self._log("restore", self.nodes, self.edges)
+        self.nodes, self.edges = nodes, edges
+        self._reindex(); self._touch(); self._grid = None; self._inc = None
+
+    def clear(self): self.restore(NodeColumns(), EdgeColumns())
     
-    def from_dict(self, data):
-        self.clear()
-        nodes = sorted(data["nodes"], key=lambda k: k['id'])
-        for n in nodes: self.nodes.append(Node(n['id'], n['x'], n['y']))
-        for e in data["edges"]: self.edges.append(Edge(e['u'], e['v'], e['w'], e.get('d',False)))
+    def to_dict(self): return columns_to_dict(self.nodes, self.edges)
+    def from_dict(self, data): self.restore(*columns_from_dict(data))
 
     def get_adj(self, directed=False):
-        adj = {n.id: [] for n in self.nodes}
-        for e in self.edges:
-            adj[e.u].append((e.v, e.weight))
-            if not directed and not e.is_directed: adj[e.v].append((e.u, e.weight))
-        return adj
+        c = self.csr(DIRECTED if directed else MIXED)
+        return {n.id: list(c.row(n.id)) for n in self.nodes}
     
     def get_matrix(self):
-        n = len(self.nodes); mat = [[0]*n for _ in range(n)]
-        for e in self.edges:
-            mat[e.u][e.v] = e.weight
-            if not e.is_directed: mat[e.v][e.u] = e.weight
+        n = len(self.nodes); mat = [[0]*n for _ in range(n)]; E = self.edges
+        for u, v, w, d in zip(E.u, E.v, E.w, E.d):
+            mat[u][v] = w
+            if not d: mat[v][u] = w
         return mat
 
     # --- ALGORITHMS ---
-    def bfs(self, s, descending=False):
+    def bfs(self, s, descending=False, budget=None):
         if s is None or s >= len(self.nodes): return []
-        adj = self.get_adj() 
-        vis = set(); q = deque([s]); vis.add(s); p = []
+        c = self.csr(); off, nbr = c.off, c.nbr
+        vis = bytearray(c.n); q = deque([s]); vis[s] = 1; p = []; pushes = 1
         while q:
+            if budget and budget.expired(): break
             u = q.popleft(); p.append(u)
-            neighbors = [item for item in adj[u] if item[0] not in vis]
-            neighbors.sort(key=lambda x: x[0], reverse=descending)
-            for v, w in neighbors:
-                if v not in vis: vis.add(v); q.append(v)
+            neighbors = [v for v in nbr[off[u]:off[u+1]] if not vis[v]]
+            neighbors.sort(reverse=descending)
+            for v in neighbors:
+                if not vis[v]: vis[v] = 1; q.append(v); pushes += 1
+        if budget: budget.tally(expanded=len(p), pushes=pushes)
         return p
     
-    def dfs(self, s, descending=False):
+    def dfs(self, s, descending=False, budget=None):
         if s is None or s >= len(self.nodes): return []
-        adj = self.get_adj(); vis = set(); stack = [s]; p = []
+        c = self.csr(); off, nbr = c.off, c.nbr
+        vis = bytearray(c.n); stack = [s]; p = []; pushes = 1; pops = 0
         while stack:
-            u = stack.pop()
-            if u not in vis:
-                vis.add(u); p.append(u)
-                neighbors = [item for item in adj[u] if item[0] not in vis]
+            if budget and budget.expired(): break
+            u = stack.pop(); pops += 1
+            if not vis[u]:
+                vis[u] = 1; p.append(u)
+                neighbors = [v for v in nbr[off[u]:off[u+1]] if not vis[v]]
                 sort_order_for_stack = not descending 
-                neighbors.sort(key=lambda x: x[0], reverse=sort_order_for_stack)
-                for v, w in neighbors: stack.append(v)
+                neighbors.sort(reverse=sort_order_for_stack)
+                stack.extend(neighbors); pushes += len(neighbors)
+        if budget: budget.tally(expanded=len(p), pushes=pushes, pops=pops)
         return p
 
-    def dijkstra(self, s, e):
-        adj=self.get_adj(); pq=[(0,s)]
-        dist={i:float('inf') for i in range(len(self.nodes))}; dist[s]=0
-        par={i:None for i in range(len(self.nodes))}
-        while pq:
-            d,u = heapq.heappop(pq)
-            if d>dist[u]: continue
-            if u==e: break
-            for v,w in adj[u]:
-                if dist[u]+w < dist[v]:
-                    dist[v]=dist[u]+w; par[v]=u; heapq.heappush(pq,(dist[v],v))
-        if dist[e]==float('inf'): return None, float('inf')
+    # dist / par là dict chỉ chứa đỉnh đã chạm tới: truy vấn dừng sớm không phải khởi tạo O(V)
+    def dijkstra(self, s, e, budget=None):
+        c=self.csr(); off, nbr, wt = c.off, c.nbr, c.wt; pq=[(0,s)]; INF=float('inf')
+        dist={s:0}; par={s:None}; pushes=1; pops=0; expanded=0; relax=0
+        try:
+            while pq:
+                if budget and budget.expired(): return None, INF
+                d,u = heapq.heappop(pq); pops+=1
+                if d>dist[u]: continue
+                if u==e: break
+                expanded+=1
+                for k in range(off[u], off[u+1]):
+                    v = nbr[k]; nd = d + wt[k]
+                    if nd < dist.get(v, INF):
+                        dist[v]=nd; par[v]=u; heapq.heappush(pq,(nd,v)); relax+=1
+        finally:
+            if budget: budget.tally(pushes=pushes+relax, pops=pops, expanded=expanded, relaxations=relax)
+        if e not in dist: return None, INF
+        return self._trace(par, e), dist[e]
+
+    @staticmethod
+    def _trace(par, e):
         p=[]; c=e
         while c is not None: p.append(c); c=par[c]
+        return p[::-1]
+
+    # Hệ số của heuristic A*: h(v) = k * |v - đích| với k = min(w / độ dài) trên các cạnh có độ
+    # dài > 0, nên h không vượt quá chi phí thật và nhất quán. Có trọng số âm thì k = 0 (Dijkstra).
+    def _heuristic_scale(self):
+        if self._hscale is None:
+            X, Y = self.nodes.x, self.nodes.y; k = float('inf'); E = self.edges
+            for u, v, w in zip(E.u, E.v, E.w):
+                if w < 0: k = 0.0; break
+                l = math.hypot(X[u] - X[v], Y[u] - Y[v])
+                if l > 0 and w < k * l: k = w / l
+            self._hscale = 0.0 if k == float('inf') else k
+        return self._hscale
+
+    def astar(self, s, e, budget=None):
+        c=self.csr(); off, nbr, wt = c.off, c.nbr, c.wt; INF=float('inf')
+        X, Y = self.nodes.x, self.nodes.y; ex, ey = X[e], Y[e]; hk = self._heuristic_scale()
+        def h(v): return hk * math.hypot(X[v] - ex, Y[v] - ey)
+        pq=[(h(s),0,s)]; dist={s:0}; par={s:None}; pops=0; expanded=0; relax=0
+        try:
+            while pq:
+                if budget and budget.expired(): return None, INF
+                _,d,u = heapq.heappop(pq); pops+=1
+                if d>dist[u]: continue
+                if u==e: break
+                expanded+=1
+                for k in range(off[u], off[u+1]):
+                    v = nbr[k]; nd = d + wt[k]
+                    if nd < dist.get(v, INF):
+                        dist[v]=nd; par[v]=u; heapq.heappush(pq,(nd+h(v),nd,v)); relax+=1
+        finally:
+            if budget: budget.tally(pushes=1+relax, pops=pops, expanded=expanded, relaxations=relax)
+        if e not in dist: return None, INF
+        return self._trace(par, e), dist[e]
+
+    # Dijkstra hai chiều: tiến từ s trên MIXED, lùi từ e trên REVERSE, luôn mở rộng phía có đỉnh
+    # heap nhỏ hơn; dừng khi tổng hai đỉnh heap >= đường tốt nhất đã nối được (mu).
+    def bidirectional_dijkstra(self, s, e, budget=None):
+        INF=float('inf')
+        if s == e: return [s], 0
+        cs = (self.csr(), self.csr(REVERSE)); dist = ({s:0}, {e:0}); par = ({s:None}, {e:None})
+        pq = ([(0,s)], [(0,e)]); mu = INF; meet = None; pops=0; expanded=0; relax=0
+        try:
+            while pq[0] and pq[1]:
+                if budget and budget.expired(): return None, INF
+                if pq[0][0][0] + pq[1][0][0] >= mu: break
+                side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+                d,u = heapq.heappop(pq[side]); pops+=1; D = dist[side]; other = dist[1-side]
+                if d>D[u]: continue
+                expanded+=1; c = cs[side]; off, nbr, wt = c.off, c.nbr, c.wt
+                for k in range(off[u], off[u+1]):
+                    v = nbr[k]; nd = d + wt[k]
+                    if nd < D.get(v, INF): D[v]=nd; par[side][v]=u; heapq.heappush(pq[side],(nd,v)); relax+=1
+                    if v in other and D[v] + other[v] < mu: mu = D[v] + other[v]; meet = v
+        finally:
+            if budget: budget.tally(pushes=2+relax, pops=pops, expanded=expanded, relaxations=relax)
+        if meet is None: return None, INF
+        back = self._trace(par[1], meet)
+        return self._trace(par[0], meet) + back[-2::-1], mu
+
+    # SPFA: Bellman-Ford theo hàng đợi (chỉ nới lỏng từ đỉnh vừa đổi). Chu trình âm: khi đường
+    # tới một đỉnh dài >= n cạnh, hoặc định kỳ sau mỗi n lần nới lỏng, tìm chu trình trong đồ
+    # thị cha; có thì trả về (chu trình, -inf).
+    def spfa(self, s, e, budget=None):
+        c=self.csr(); off, nbr, wt, n = c.off, c.nbr, c.wt, c.n; INF=float('inf')
+        dist=[INF]*n; par=[-1]*n; hops=[0]*n; inq=bytearray(n); dist[s]=0; inq[s]=1; q=deque([s])
+        pops=0; relax=0; checks=0
+        try:
+            while q:
+                if budget and budget.expired(): return None, INF
+                u=q.popleft(); inq[u]=0; du=dist[u]; pops+=1
+                for k in range(off[u], off[u+1]):
+                    v=nbr[k]; nd=du+wt[k]
+                    if nd<dist[v] and dist[v]-nd > TOL*(1+abs(nd)):
+                        dist[v]=nd; par[v]=u; hops[v]=hops[u]+1; relax+=1
+                        if hops[v] >= n or relax % n == 0:
+                            checks+=1; cyc=self._par_cycle(par)
+                            if cyc: return cyc, float('-inf')
+                        if not inq[v]: inq[v]=1; q.append(v)
+        finally:
+            if budget: budget.tally(pops=pops, relaxations=relax, cycle_checks=checks)
+        if dist[e]==INF: return None, INF
+        p=[e]
+        while p[-1]!=s: p.append(par[p[-1]])
         return p[::-1], dist[e]
 
-    def bellman_ford(self, s, e):
-        n = len(self.nodes); dist = {i: float('inf') for i in range(n)}; dist[s] = 0; par = {i: None for i in range(n)}
-        for _ in range(n - 1):
-            changed = False
-            for edge in self.edges:
-                if dist[edge.u] != float('inf') and dist[edge.u] + edge.weight < dist[edge.v]:
-                    dist[edge.v] = dist[edge.u] + edge.weight; par[edge.v] = edge.u; changed = True
-                if not edge.is_directed:
-                    if dist[edge.v] != float('inf') and dist[edge.v] + edge.weight < dist[edge.u]:
-                        dist[edge.u] = dist[edge.v] + edge.weight; par[edge.u] = edge.v; changed = True
-            if not changed: break
-        for edge in self.edges:
-            if dist[edge.u] != float('inf') and dist[edge.u] + edge.weight < dist[edge.v]: return None, float('-inf')
-            if not edge.is_directed and dist[edge.v] != float('inf') and dist[edge.v] + edge.weight < dist[edge.u]: return None, float('-inf')
+    # Chu trình trong đồ thị cha (mỗi đỉnh một con trỏ), theo chiều cạnh, đỉnh đầu lặp ở cuối
+    @staticmethod
+    def _par_cycle(par):
+        state = bytearray(len(par))
+        for r in range(len(par)):
+            if state[r]: continue
+            x = r; trail = []
+            while x >= 0 and not state[x]: state[x] = 1; trail.append(x); x = par[x]
+            if x >= 0 and state[x] == 1:
+                cyc = trail[trail.index(x):][::-1]; return cyc + [cyc[0]]
+            for y in trail: state[y] = 2
+        return None
+
+    def bellman_ford(self, s, e, budget=None):
+        n = len(self.nodes); dist = [float('inf')] * n; dist[s] = 0; par = [None] * n
+        E = self.edges; rows = list(zip(E.u, E.v, E.w, E.d)); rounds = 0; relax = 0
+        try:
+            for _ in range(n - 1):
+                if budget and budget.expired(): return None, float('inf')
+                changed = False; rounds += 1
+                for u, v, w, d in rows:
+                    if _better(dist[u] + w, dist[v]):
+                        dist[v] = dist[u] + w; par[v] = u; changed = True; relax += 1
+                    if not d:
+                        if _better(dist[v] + w, dist[u]):
+                            dist[u] = dist[v] + w; par[u] = v; changed = True; relax += 1
+                if not changed: break
+        finally:
+            if budget: budget.tally(rounds=rounds, relaxations=relax, edge_scans=rounds * len(rows))
+        for u, v, w, d in rows:
+            if _better(dist[u] + w, dist[v]): return None, float('-inf')
+            if not d and _better(dist[v] + w, dist[u]): return None, float('-inf')
         if dist[e] == float('inf'): return None, float('inf')
         p = []; curr = e
         while curr is not None: p.append(curr); curr = par[curr]
         return p[::-1], dist[e]
 
-    def prim(self):
+    def prim(self, budget=None):
         if not self.nodes: return [],0
-        adj={n.id:[] for n in self.nodes}
-        for e in self.edges: 
-            adj[e.u].append((e.v,e.weight)); adj[e.v].append((e.u,e.weight)) 
-        vis={0}; pq=[]; me=[]; mw=0
-        for v,w in adj[0]: heapq.heappush(pq,(w,0,v))
-        while pq and len(vis)<len(self.nodes):
-            w,u,v=heapq.heappop(pq)
-            if v in vis: continue
-            vis.add(v); me.append(Edge(u,v,w)); mw+=w
-            for nv,nw in adj[v]: 
-                if nv not in vis: heapq.heappush(pq,(nw,v,nv))
+        c=self.csr(UNDIRECTED); off, nbr, wt, eid = c.off, c.nbr, c.wt, c.eid
+        s=self.nodes.alive.index(1); vis=bytearray(c.n); vis[s]=1; nvis=1; pq=[]; me=[]; mw=0
+        for k in range(off[s], off[s+1]): heapq.heappush(pq,(wt[k],s,nbr[k],eid[k]))
+        pushes=len(pq); pops=0
+        while pq and nvis<self.nodes.count:
+            if budget and budget.expired(): break
+            w,u,v,i=heapq.heappop(pq); pops+=1
+            if vis[v]: continue
+            vis[v]=1; nvis+=1; me.append(self.edges[i]); mw+=w
+            for k in range(off[v], off[v+1]): 
+                if not vis[nbr[k]]: heapq.heappush(pq,(wt[k],v,nbr[k],eid[k])); pushes+=1
+        if budget: budget.tally(pushes=pushes, pops=pops, expanded=nvis)
         return me, mw
 
-    def kruskal(self):
-        se=sorted(self.edges, key=lambda x:x.weight); par=list(range(len(self.nodes))); me=[]; mw=0
+    def kruskal(self, budget=None):
+        E=self.edges; se=sorted(range(len(E)), key=E.w.__getitem__); par=list(range(len(self.nodes))); me=[]; mw=0
         def find(i): 
             if par[i]==i: return i
             par[i]=find(par[i]); return par[i]
@@ -157,87 +621,370 @@ class Graph:
             ri,rj=find(i),find(j)
             if ri!=rj: par[ri]=rj; return True
             return False
-        for e in se:
-            if union(e.u,e.v): me.append(Edge(e.u,e.v,e.weight)); mw+=e.weight
+        scanned=0
+        for i in se:
+            if budget and budget.expired(): break
+            scanned+=1
+            if union(E.u[i],E.v[i]): me.append(E[i]); mw+=E.w[i]
+        if budget: budget.tally(edge_scans=scanned, unions=len(me))
         return me, mw
 
-    def check_hamilton(self):
+    # --- HAMILTON: kề dạng bitset, cắt tỉa theo bậc/cạnh bị ép/đỉnh khớp/liên thông, DP bitmask khi n nhỏ ---
+    # Đường Hamilton: tách theo khối 2-liên thông, trong mỗi khối quy về chu trình qua một đỉnh
+    # ảo z (cuối -> z -> đầu), nên cả hai bài dùng chung một bộ tìm chu trình và mọi phép cắt tỉa.
+    HAM_DP_LIMIT = 18
+    HAM_SEARCH_CAP = 64000
+
+    def _ham_masks(self):
+        c = self.csr(); n = c.n; out = [0] * n; inn = [0] * n
+        for u in range(n):
+            for v in c.neighbors(u):
+                if v != u: out[u] |= 1 << v; inn[v] |= 1 << u
+        return out, inn
+
+    @staticmethod
+    def _bits(mask):
+        while mask:
+            b = mask & -mask; yield b.bit_length() - 1; mask ^= b
+
+    def _ham_reach(self, masks, front, R):
+        seen = 0; bits = self._bits
+        while front:
+            seen |= front; nxt = 0
+            for v in bits(front): nxt |= masks[v]
+            front = nxt & R & ~seen
+        return seen
+
+    def _ham_cut(self, und, H, a, b):
+        # Chu trình qua H phải đi hết đường a .. b đang dựng rồi quay lại: H cùng cạnh ảo a - b phải
+        # 2-liên thông (Tarjan trên đồ thị vô hướng nền und, DFS từ a) — có đỉnh khớp thì vô nghiệm
+        disc = {}; low = {}; bits = self._bits
+        def dfs(v, p):
+            disc[v] = low[v] = len(disc); kids = 0; m = und[v] & H
+            if a != b: m |= (1 << b if v == a else 1 << a if v == b else 0)
+            for w in bits(m):
+                if w == p: continue
+                if w in disc: low[v] = min(low[v], disc[w]); continue
+                kids += 1
+                if dfs(w, v): return True
+                low[v] = min(low[v], low[w])
+                if p >= 0 and low[w] >= disc[v]: return True
+            return p < 0 and kids > 1
+        return dfs(a, -1) or len(disc) != bin(H).count("1")
+
+    def _ham_force(self, und, H, a, b):
+        # Vô hướng: lan truyền cạnh bị ép trên H. Đỉnh chưa thăm cần 2 cạnh, hai đầu a, b của đường
+        # đang dựng mỗi đỉnh cần 1 (a == b: gốc, cần 2). Đỉnh chỉ còn đúng số láng giềng cần thì mọi
+        # cạnh của nó bị ép, đỉnh đã đủ cạnh bị ép thì bỏ các cạnh còn lại; lặp tới khi ổn định.
+        # Trả về kề đã rút gọn, None nếu mâu thuẫn (thiếu cạnh, thừa cạnh bị ép, chu trình con).
+        bits = self._bits; adj = {v: und[v] & H for v in bits(H)}; need = dict.fromkeys(adj, 2)
+        if a != b: adj[a] &= ~(1 << b); adj[b] &= ~(1 << a); need[a] = need[b] = 1
+        forced = dict.fromkeys(adj, 0); pairs = set(); todo = list(adj)
+        while todo:
+            v = todo.pop(); av = adj[v]; k = bin(av).count("1")
+            if k < need[v]: return None
+            if k == need[v] and forced[v] != av:
+                for w in bits(av & ~forced[v]):
+                    forced[v] |= 1 << w; forced[w] |= 1 << v; pairs.add((v, w) if v < w else (w, v))
+                    if bin(forced[w]).count("1") > need[w]: return None
+                    todo.append(w)
+            fv = forced[v]
+            if av != fv and bin(fv).count("1") == need[v]:
+                for w in bits(av & ~fv): adj[w] &= ~(1 << v); todo.append(w)
+                adj[v] = fv
+        if pairs and self._ham_closed(pairs, a, b, bin(H).count("1")): return None
+        return adj
+
+    @staticmethod
+    def _ham_closed(pairs, a, b, size):
+        # Các cạnh bị ép cùng cạnh ảo a - b (đường đang dựng) khép thành chu trình ít hơn size đỉnh?
+        par = {}; cnt = {}
+        def find(x):
+            while par.get(x, x) != x: x = par[x]
+            return x
+        if a != b: par[a] = b; cnt[b] = 2
+        for x, y in pairs:
+            rx, ry = find(x), find(y)
+            if rx == ry: return cnt.get(rx, 1) < size
+            par[rx] = ry; cnt[ry] = cnt.get(ry, 1) + cnt.get(rx, 1)
+        return False
+
+    def _ham_blocks(self, und):
+        # Khối 2-liên thông (Tarjan) của đồ thị vô hướng nền. Đường Hamilton đi qua các khối theo
+        # một chuỗi nên cây khối - khớp phải là một đường: mỗi khớp thuộc đúng 2 khối, mỗi khối chứa
+        # tối đa 2 khớp. Trả về các khối (bitset) theo thứ tự chuỗi, None nếu không thỏa.
+        n = len(und); disc = {}; low = {}; stack = []; blocks = []; bits = self._bits
+        def dfs(v, p):
+            disc[v] = low[v] = len(disc); stack.append(v)
+            for w in bits(und[v]):
+                if w == p: continue
+                if w in disc: low[v] = min(low[v], disc[w]); continue
+                dfs(w, v); low[v] = min(low[v], low[w])
+                if low[w] >= disc[v]:
+                    blk = 1 << v
+                    while True:
+                        x = stack.pop(); blk |= 1 << x
+                        if x == w: break
+                    blocks.append(blk)
+        dfs(0, -1)
+        if len(disc) != n: return None
+        once = cuts = 0
+        for blk in blocks:
+            if blk & cuts: return None  # khớp thuộc 3 khối trở lên
+            cuts |= once & blk; once |= blk
+        if any(bin(blk & cuts).count("1") > 2 for blk in blocks): return None
+        if len(blocks) < 2: return blocks
+        order = [next(blk for blk in blocks if bin(blk & cuts).count("1") == 1)]
+        rest = [blk for blk in blocks if blk != order[0]]
+        while rest:
+            nxt = next(blk for blk in rest if blk & order[-1]); order.append(nxt); rest.remove(nxt)
+        return order
+
+    def _ham_chain(self, out, inn):
+        # Tách thành phần liên thông mạnh; đường Hamilton phải đi qua chúng theo đúng một thứ tự
+        # tô-pô duy nhất (đồ thị rút gọn là một "chuỗi"). Trả về danh sách thành phần theo thứ tự.
+        n = len(out); rem = (1 << n) - 1; comps = []
+        while rem:
+            b = rem & -rem
+            c = (self._ham_reach(out, b, rem) & self._ham_reach(inn, b, rem)) | b
+            comps.append(c); rem &= ~c
+        into = []
+        for c in comps:
+            m = 0
+            for v in self._bits(c): m |= inn[v]
+            into.append(m & ~c)
+        order = []; left = list(range(len(comps))); placed = 0
+        while left:
+            src = [i for i in left if not into[i] & ~placed]
+            if len(src) != 1: return None
+            order.append(comps[src[0]]); placed |= comps[src[0]]; left.remove(src[0])
+        return order
+
+    def _ham_matching(self, out, lefts, rights, owner, need):
+        # Ghép cặp giữa bản sao "ra" (lefts) và "vào" (rights) của các đỉnh (Kuhn trên bitset).
+        # Chu trình Hamilton cần ghép hết, đường đi Hamilton thiếu tối đa 1 cặp. owner (vào -> ra)
+        # của bước trước được giữ lại nên mỗi bước chỉ phải vá vài đường tăng. None = không đủ need.
+        owner = {r: l for r, l in owner.items() if rights >> r & 1 and lefts >> l & 1}
+        def augment(u, seen):
+            m = out[u] & rights & ~seen[0]
+            while m:
+                b = m & -m; m ^= b; seen[0] |= b; v = b.bit_length() - 1
+                if v not in owner or augment(owner[v], seen): owner[v] = u; return True
+            return False
+        if len(owner) < need:
+            free = lefts
+            for l in owner.values(): free &= ~(1 << l)
+            for l in self._bits(free):
+                if augment(l, [0]) and len(owner) >= need: break
+        return owner if len(owner) >= need else None
+
+    def _ham_dp(self, out, inn, budget=None):
+        # dp[mask] = tập (bitset) các đỉnh cuối của đường Hamilton từ đỉnh 0 phủ đúng mask
+        n = len(out); full = (1 << n) - 1; bits = self._bits
+        dp = [0] * (full + 1); dp[1] = 1
+        states = 0
+        try:
+            for mask in range(1, full + 1, 2):
+                ends = dp[mask]
+                if not ends: continue
+                if budget and budget.expired(): raise _Stop
+                states += 1
+                for j in bits(ends):
+                    for v in bits(out[j] & ~mask): dp[mask | 1 << v] |= 1 << v
+        finally:
+            if budget: budget.tally(dp_states=states)
+        ends = dp[full] & inn[0]
+        if not ends: return None
+        v = (ends & -ends).bit_length() - 1; mask = full; path = [v]
+        while mask & (mask - 1):
+            prev = mask ^ (1 << v); u = (dp[prev] & inn[v]); u = (u & -u).bit_length() - 1
+            path.append(u); mask = prev; v = u
+        return path[::-1]
+
+    def _ham_search(self, out, inn, starts, max_budget=None, budget=None, best=None):
+        # Khởi động lại với thứ tự ngẫu nhiên, lần lượt từ các đỉnh trong starts (chu trình đi qua
+        # mọi đỉnh nên xuất phát từ đâu cũng được, nhưng cỡ cây tìm kiếm chênh nhau rất nhiều) và
+        # ngân sách gấp đôi mỗi vòng (vẫn đầy đủ vì ngân sách tăng không giới hạn) để không kẹt lâu
+        # trong một nhánh vô nghiệm. Vượt max_budget -> ném _Restart để bên gọi chuyển sang DP bitmask.
+        stop = budget; rng = random.Random(len(out)); budget = 2000; k = 0
+        while True:
+            try: return self._ham_extend(out, inn, starts[k % len(starts)], budget, rng, stop, best)
+            except _Restart:
+                if stop: stop.tally(restarts=1)
+            k += 1; budget *= 2
+            if max_budget and budget > max_budget: raise _Restart
+
+    def _ham_extend(self, out, inn, start, budget, rng, stop=None, best=None):
+        # best: danh sách giữ đường đi dài nhất đã gặp, trả về khi hết ngân sách thời gian
+        n = len(out); bits = self._bits; bs = 1 << start
+        sym = out == inn; path = [start]; left = [budget]; back = [0]
+        und = out if sym else [o | i for o, i in zip(out, inn)]
+        def extend(u, R, owner):
+            if not R: return out[u] >> start & 1
+            if best is not None and len(path) > len(best): best[:] = path
+            if stop and stop.expired(): raise _Stop
+            left[0] -= 1
+            if left[0] < 0: raise _Restart
+            bu = 1 << u; cand = out[u] & R; forced = 0; preds = succs = 0
+            if not cand or not inn[start] & (R | bu): return False
+            # Cắt tỉa theo bậc: mỗi đỉnh chưa thăm phải còn đường vào và đường ra
+            for r in bits(R):
+                ins = inn[r] & (R | bu); outs = out[r] & (R | bs)
+                if not ins or not outs: return False
+                nb = ins | outs
+                if sym and not nb & (nb - 1) and R != 1 << r: return False
+                # Đỉnh chỉ còn đường vào từ u, hoặc (vô hướng) chỉ còn 2 láng giềng mà một là u, bị ép đi ngay
+                if ins == bu or (sym and u != start and nb & bu and bin(nb).count("1") == 2):
+                    if forced: return False
+                    forced = 1 << r
+                # Hai đỉnh cùng bị ép vào chung một đỉnh kề duy nhất -> mâu thuẫn
+                if not sym:
+                    if not ins & (ins - 1):
+                        if ins & preds: return False
+                        preds |= ins
+                    if not outs & (outs - 1):
+                        if outs & succs: return False
+                        succs |= outs
+            if forced: cand = forced
+            # Vô hướng: lan truyền cạnh bị ép, rồi xét liên thông / đỉnh khớp trên kề đã rút gọn
+            adj = und
+            if sym and R & (R - 1):
+                adj = self._ham_force(und, R | bu | bs, u, start)
+                if adj is None: return False
+                cand &= adj[u]
+                if not cand: return False
+            # Liên thông: mọi đỉnh chưa thăm phải đến được từ u trong R và quay về được điểm
+            # xuất phát; phần còn lại cùng hai đầu u, start không được có đỉnh khớp
+            if self._ham_reach(out, cand, R) != R: return False
+            if self._ham_reach(inn, inn[start] & R, R) != R: return False
+            if self._ham_cut(adj, R | bu | bs, u, start): return False
+            # Ghép cặp: u và R cần cung ra vào R + start, R + start cần cung vào từ u và R
+            owner = self._ham_matching(out, R | bu, R | bs, owner, bin(R).count("1") + 1)
+            if owner is None: return False
+            for v in sorted(bits(cand), key=lambda v: (bin(out[v] & R).count("1"), rng.random())):
+                path.append(v)
+                if extend(v, R & ~(1 << v), owner): return True
+                path.pop(); back[0] += 1
+            return False
+        try: return path if extend(start, ((1 << n) - 1) & ~bs, {}) else None
+        finally:
+            if stop: stop.tally(expanded=budget - max(left[0], 0), backtracks=back[0])
+
+    def _ham_cycle(self, out, inn, budget=None, best=None):
+        # Chu trình Hamilton trên kề bitset (danh sách đỉnh, không lặp đỉnh đầu), None nếu không có
+        n = len(out); full = (1 << n) - 1
+        if not all(out) or not all(inn): return None
+        chain = self._ham_chain(out, inn)
+        if chain is None or len(chain) != 1 or self._ham_matching(out, full, full, {}, n) is None: return None
+        # Mọi đỉnh đều nằm trên chu trình: xuất phát từ các đỉnh bậc nhỏ trước
+        starts = sorted(range(n), key=lambda v: bin(out[v] | inn[v]).count("1"))
+        try: return self._ham_search(out, inn, starts, self.HAM_SEARCH_CAP if n <= self.HAM_DP_LIMIT else None, budget, best)
+        except _Restart: return self._ham_dp(out, inn, budget)
+
+    # Có ô đã xóa: giải trên bản sao dồn chỉ số rồi đổi kết quả về id gốc
+    def _on_dense(self, name, budget):
+        g, keep = self.dense(); ok, p = getattr(g, name)(budget)
+        return ok, [keep[v] for v in p]
+
+    def check_hamilton(self, budget=None):
+        if self.nodes.dead: return self._on_dense("check_hamilton", budget)
         n = len(self.nodes)
         if n == 0: return False, []
-        adj = self.get_adj()
-        path = []; visited = [False] * n
-        def is_safe(v, pos, path):
-            u = path[pos-1]; is_adjacent = False
-            for neighbor, _ in adj[u]:
-                if neighbor == v: is_adjacent = True; break
-            if not is_adjacent: return False
-            if visited[v]: return False
-            return True
-        def ham_cycle_util(pos):
-            if pos == n:
-                start, last = path[0], path[-1]
-                for v, _ in adj[last]:
-                    if v == start: return True
-                return False
-            for v in range(n):
-                if is_safe(v, pos, path):
-                    path.append(v); visited[v] = True
-                    if ham_cycle_util(pos + 1): return True
-                    visited[v] = False; path.pop()
-            return False
-        for start_node in range(n):
-            path = [start_node]; visited = [False] * n; visited[start_node] = True
-            if ham_cycle_util(1):
-                path.append(path[0])
-                return True, path
-        return False, []
+        if n == 1: return (True, [0, 0]) if self.edge_at(0, 0) else (False, [])
+        out, inn = self._ham_masks(); best = []
+        try: path = self._ham_cycle(out, inn, budget, best)
+        except _Stop: return False, best
+        if path is None: return False, []
+        return True, path + [path[0]]
+
+    def _ham_span(self, out, inn, B, entry, exit, budget=None, best=None, prefix=()):
+        # Đường Hamilton trong tập đỉnh B, đi từ một đỉnh thuộc entry tới một đỉnh thuộc exit: chu
+        # trình trên B (đánh lại chỉ số 0..m-1) cùng đỉnh ảo. Có hướng: z = m với exit -> z -> entry.
+        # Vô hướng giữ đối xứng để dùng được cắt tỉa cạnh bị ép: entry == exit thì một đỉnh z kề
+        # cả tập, khác nhau thì hai đỉnh m - m+1 kề nhau, m kề entry, m+1 kề exit (một phía luôn là
+        # một khớp duy nhất nên cạnh m - m+1 bị ép).
+        ids = list(self._bits(B)); m = len(ids); loc = {v: i for i, v in enumerate(ids)}
+        def local(mask):
+            r = 0
+            for v in self._bits(mask & B): r |= 1 << loc[v]
+            return r
+        za = 1 << m; zb = 1 << m + 1
+        if out == inn and entry != exit:
+            o = [local(out[v]) | (za if entry >> v & 1 else 0) | (zb if exit >> v & 1 else 0) for v in ids]
+            o += [local(entry) | zb, local(exit) | za]; i = o
+        else:
+            o = [local(out[v]) | (za if exit >> v & 1 else 0) for v in ids] + [local(entry)]
+            i = [local(inn[v]) | (za if entry >> v & 1 else 0) for v in ids] + [local(exit)]
+        part = []
+        try: cyc = self._ham_cycle(o, i, budget, part)
+        except _Stop:
+            if best is not None:
+                pieces = [[]]
+                for v in part:
+                    if v < m: pieces[-1].append(ids[v])
+                    else: pieces.append([])
+                best[:] = max([list(prefix)] + pieces, key=len)
+            raise
+        if cyc is None: return None
+        k = cyc.index(m); cyc = cyc[k:] + cyc[:k]
+        if len(o) == m + 1: body = cyc[1:]
+        else: body = cyc[2:][::-1] if cyc[1] == m + 1 else cyc[1:-1]
+        return [ids[v] for v in body]
 
-    def check_hamilton_path(self):
+    def _ham_through(self, out, inn, order, starts, stops, budget=None, best=None):
+        # Đi qua các khối theo thứ tự order: vào mỗi khối ở khớp chung với khối trước (khối đầu:
+        # ở một điểm đầu hợp lệ), ra ở khớp chung với khối sau; từng khối giải độc lập rồi nối lại
+        k = len(order); path = []
+        for j, B in enumerate(order):
+            entry = order[j - 1] & B if j else starts & B & ~(order[1] if k > 1 else 0)
+            exit = order[j + 1] & B if j < k - 1 else stops & B & ~(order[j - 1] if k > 1 else 0)
+            if not entry or not exit: return None
+            sub = self._ham_span(out, inn, B, entry, exit, budget, best, path)
+            if sub is None: return None
+            path += sub[1:] if j else sub
+        return path
+
+    def check_hamilton_path(self, budget=None):
+        if self.nodes.dead: return self._on_dense("check_hamilton_path", budget)
         n = len(self.nodes)
         if n == 0: return False, []
-        adj = self.get_adj()
-        visited = [False] * n
-        path = []
-        def is_safe(v, pos, path):
-            u = path[pos-1]; is_adjacent = False
-            for neighbor, _ in adj[u]:
-                if neighbor == v: is_adjacent = True; break
-            if not is_adjacent: return False
-            if visited[v]: return False
-            return True
-        def ham_path_util(pos):
-            if pos == n: return True
-            for v in range(n):
-                if is_safe(v, pos, path):
-                    path.append(v); visited[v] = True
-                    if ham_path_util(pos + 1): return True
-                    visited[v] = False; path.pop()
-            return False
-        for start_node in range(n):
-            path = [start_node]; visited = [False] * n; visited[start_node] = True
-            if ham_path_util(1): return True, path
+        if n == 1: return True, [0]
+        out, inn = self._ham_masks()
+        # Đỉnh không có cung vào phải là điểm đầu; không có cung ra phải là điểm cuối
+        no_in = [v for v in range(n) if not inn[v]]; no_out = [v for v in range(n) if not out[v]]
+        if len(no_in) > 1 or len(no_out) > 1: return False, []
+        chain = self._ham_chain(out, inn)
+        if chain is None: return False, []
+        sym = out == inn; blocks = self._ham_blocks(out if sym else [o | i for o, i in zip(out, inn)])
+        if blocks is None: return False, []
+        # Điểm đầu ở thành phần mạnh đầu chuỗi, điểm cuối ở thành phần cuối; có hướng thì thử cả
+        # hai chiều đi qua chuỗi khối (vô hướng: một chiều là đủ)
+        starts = 1 << no_in[0] if no_in else chain[0]; stops = 1 << no_out[0] if no_out else chain[-1]
+        best = []
+        try:
+            for order in (blocks,) if sym or len(blocks) < 2 else (blocks, blocks[::-1]):
+                path = self._ham_through(out, inn, order, starts, stops, budget, best)
+                if path is not None: return True, path
+        except _Stop: return False, best
         return False, []
 
     def get_euler_status(self):
         if not self.nodes: return 0, "Đồ thị trống", None
-        is_directed_graph = any(e.is_directed for e in self.edges)
-        adj_undirected = defaultdict(list); degrees_check = defaultdict(int) 
-        for e in self.edges:
-            adj_undirected[e.u].append(e.v); adj_undirected[e.v].append(e.u)
-            degrees_check[e.u] += 1; degrees_check[e.v] += 1
-        non_zero_degree = [n.id for n in self.nodes if degrees_check[n.id] > 0]
+        is_directed_graph = self.edges.any_directed()
+        c = self.csr(UNDIRECTED); off, nbr = c.off, c.nbr
+        non_zero_degree = [n.id for n in self.nodes if c.degree(n.id) > 0]
         if not non_zero_degree: return 0, "Không có cạnh nào", None
-        start_node_bfs = non_zero_degree[0]; q = deque([start_node_bfs]); vis = {start_node_bfs}; count = 0
+        start_node_bfs = non_zero_degree[0]; q = deque([start_node_bfs]); vis = bytearray(c.n); vis[start_node_bfs] = 1; count = 0
         while q:
             u = q.popleft(); count += 1
-            for v in adj_undirected[u]:
-                if v not in vis: vis.add(v); q.append(v)
+            for v in nbr[off[u]:off[u+1]]:
+                if not vis[v]: vis[v] = 1; q.append(v)
         if count != len(non_zero_degree): return 0, "Đồ thị không liên thông", None
         if is_directed_graph:
-            in_degree = defaultdict(int); out_degree = defaultdict(int)
-            for e in self.edges:
-                if e.is_directed: out_degree[e.u] += 1; in_degree[e.v] += 1
-                else: out_degree[e.u] += 1; in_degree[e.v] += 1; out_degree[e.v] += 1; in_degree[e.u] += 1
+            in_degree = defaultdict(int); out_degree = defaultdict(int); E = self.edges
+            for u, v, d in zip(E.u, E.v, E.d):
+                if d: out_degree[u] += 1; in_degree[v] += 1
+                else: out_degree[u] += 1; in_degree[v] += 1; out_degree[v] += 1; in_degree[u] += 1
             is_cycle = True
             for n in self.nodes:
                 if in_degree[n.id] != out_degree[n.id]: is_cycle = False; break
@@ -254,103 +1001,149 @@ class Graph:
             return 0, "Đồ thị CÓ HƯỚNG: Không Euler", None
         else:
             degree = defaultdict(int)
-            for e in self.edges: degree[e.u] += 1; degree[e.v] += 1
+            for u, v in zip(self.edges.u, self.edges.v): degree[u] += 1; degree[v] += 1
             odd_nodes = [n.id for n in self.nodes if degree[n.id] % 2 != 0]
             if len(odd_nodes) == 0: return 2, "Đồ thị VÔ HƯỚNG: Chu trình Euler", non_zero_degree[0]
             elif len(odd_nodes) == 2: return 1, "Đồ thị VÔ HƯỚNG: Đường đi Euler", odd_nodes[0]
             else: return 0, f"Đồ thị VÔ HƯỚNG: Không Euler ({len(odd_nodes)} lẻ)", None
 
-    def fleury_algo(self, start_node):
-        is_directed_graph = any(e.is_directed for e in self.edges)
-        adj = defaultdict(list)
-        for e in self.edges:
-            adj[e.u].append(e.v)
-            if not is_directed_graph and not e.is_directed: adj[e.v].append(e.u)
-            elif is_directed_graph and not e.is_directed: adj[e.v].append(e.u)
-        def count_reachable(start, current_adj):
-            if start not in current_adj and not any(start in vals for vals in current_adj.values()): return 0
-            vis = set([start]); q = deque([start]); count = 0
-            while q:
-                u = q.popleft(); count += 1
-                if u in current_adj:
-                    for v in current_adj[u]:
-                        if v not in vis: vis.add(v); q.append(v)
-            return count
-        path = [start_node]; curr = start_node
-        while adj[curr]:
-            candidates = adj[curr]
-            if len(candidates) == 1: chosen_v = candidates[0]
-            else:
-                best_v = -1; max_reach = -1
-                for v in list(candidates):
-                    adj[curr].remove(v)
-                    if not is_directed_graph: adj[v].remove(curr)
-                    c = count_reachable(v, adj)
-                    adj[curr].append(v)
-                    if not is_directed_graph: adj[v].append(curr)
-                    if c > max_reach: max_reach = c; best_v = v
-                chosen_v = best_v if best_v != -1 else candidates[0]
-            adj[curr].remove(chosen_v)
-            if not is_directed_graph:
-                try: adj[chosen_v].remove(curr)
-                except ValueError: pass
-            path.append(chosen_v); curr = chosen_v
+    # --- EULER: duyệt theo chỉ số cạnh với bitmap cạnh đã dùng, con trỏ từng đỉnh chỉ tiến ---
+    # Hàng kề xếp theo đỉnh kề tăng dần bằng hai lượt CSR.build (sắp xếp đếm ổn định, O(V+E)).
+    # Vô hướng: hai đầu của một cạnh cùng khóa eid. Có hướng (có ít nhất một cung): cạnh vô
+    # hướng là hai cung, mỗi ô của CSR là một khóa riêng (như get_euler_status).
+    def _euler_csr(self):
+        directed = self.edges.any_directed()
+        c = self.csr(MIXED if directed else UNDIRECTED); off, n = c.off, c.n
+        src = array('q')
+        for u in range(n): src.extend([u] * (off[u + 1] - off[u]))
+        by_dst = CSR.build(n, c.nbr, src, c.wt, c.eid)
+        dst = array('q')
+        for v in range(n): dst.extend([v] * (by_dst.off[v + 1] - by_dst.off[v]))
+        s = CSR.build(n, by_dst.nbr, dst, by_dst.wt, by_dst.eid)
+        return directed, s, (range(len(s.nbr)) if directed else s.eid)
+
+    # Cầu của đồ thị vô hướng (Tarjan lặp, bỏ qua đúng cạnh cha nên xử lý được cạnh song song)
+    @staticmethod
+    def _bridges(c, ids, m):
+        off, to, n = c.off, c.nbr, c.n; bridge = bytearray(m); tin = [-1] * n; low = [0] * n; t = 0
+        for r in range(n):
+            if tin[r] >= 0 or off[r] == off[r + 1]: continue
+            tin[r] = low[r] = t; t += 1; stack = [[r, -1, off[r]]]
+            while stack:
+                top = stack[-1]; x, pe, p = top
+                if p < off[x + 1]:
+                    top[2] = p + 1; i = ids[p]; y = to[p]
+                    if i == pe: continue
+                    if tin[y] < 0: tin[y] = low[y] = t; t += 1; stack.append([y, i, off[y]])
+                    elif tin[y] < low[x]: low[x] = tin[y]
+                else:
+                    stack.pop()
+                    if stack:
+                        px = stack[-1][0]
+                        if low[x] < low[px]: low[px] = low[x]
+                        if low[x] > tin[px]: bridge[pe] = 1
+        return bridge
+
+    # Fleury: không đi qua cầu khi còn lựa chọn khác. Tại đỉnh có >= 2 cạnh còn lại thì nhiều
+    # nhất một cạnh là cầu, nên mỗi bước kiểm tra tối đa một cạnh. Cầu chỉ tăng khi xóa cạnh:
+    # cầu ban đầu lấy bằng Tarjan, cầu phát hiện sau được nhớ lại; cạnh chưa biết thì tìm kiếm
+    # hai phía (mở rộng phía có biên nhỏ hơn, dừng khi gặp nhau hoặc một phía cạn).
+    # Có hướng: quy tắc "lối ra cuối" — cây BFS ngược về đỉnh kết thúc, cung cây của mỗi đỉnh
+    # chỉ được dùng khi hết cung khác.
+    def fleury_algo(self, start_node, budget=None):
+        directed, c, ids = self._euler_csr(); off, to, n = c.off, c.nbr, c.n
+        used = bytearray(len(to) if directed else len(self.edges)); ptr = list(off[:n])
+        path = [start_node]; u = start_node; checks = 0; found = 0
+        try:
+            if directed: return self._fleury_directed(c, used, ptr, path, budget)
+            bridge = self._bridges(c, ids, len(used))
+            def joined(a, b, skip):
+                side = {a: 0, b: 1}; qs = ([a], [b]); head = [0, 0]
+                while True:
+                    s = 0 if len(qs[0]) - head[0] <= len(qs[1]) - head[1] else 1; q = qs[s]
+                    if head[s] == len(q): return False
+                    x = q[head[s]]; head[s] += 1
+                    for p in range(ptr[x], off[x + 1]):
+                        i = ids[p]
+                        if used[i] or i == skip: continue
+                        y = to[p]; o = side.get(y)
+                        if o is None: side[y] = s; q.append(y)
+                        elif o != s: return True
+            while True:
+                if budget and budget.expired(): break
+                end = off[u + 1]; p = ptr[u]
+                while p < end and used[ids[p]]: p += 1
+                ptr[u] = p
+                if p == end: break
+                q = p + 1
+                while q < end and used[ids[q]]: q += 1
+                pick = p; i = ids[p]
+                if q < end and to[p] != u:
+                    if not bridge[i]:
+                        checks += 1
+                        if not joined(u, to[p], i): bridge[i] = 1; found += 1
+                    if bridge[i]: pick = q
+                used[ids[pick]] = 1; u = to[pick]; path.append(u)
+            return path
+        finally:
+            if budget: budget.tally(bridge_checks=checks, bridges_found=found, expanded=len(path))
+
+    @staticmethod
+    def _fleury_directed(c, used, ptr, path, budget):
+        off, to, n = c.off, c.nbr, c.n; bal = [0] * n; inc = [[] for _ in range(n)]; tail = [0] * len(to)
+        for x in range(n):
+            for p in range(off[x], off[x + 1]): bal[x] += 1; bal[to[p]] -= 1; inc[to[p]].append(p); tail[p] = x
+        end = next((v for v in range(n) if bal[v] == -1), path[0])
+        tree = [-1] * n; seen = bytearray(n); seen[end] = 1; q = [end]
+        for x in q:
+            for p in inc[x]:
+                w = tail[p]
+                if not seen[w]: seen[w] = 1; tree[w] = p; q.append(w)
+        u = path[0]
+        while True:
+            if budget and budget.expired(): break
+            end = off[u + 1]; p = ptr[u]; t = tree[u]
+            while p < end and (used[p] or p == t): p += 1
+            ptr[u] = p
+            if p < end: pick = p
+            elif t >= 0 and not used[t]: pick = t
+            else: break
+            used[pick] = 1; u = to[pick]; path.append(u)
         return path
 
-    def hierholzer_algo(self, start_node):
-        is_directed = any(e.is_directed for e in self.edges)
-        adj = defaultdict(list)
-        for e in self.edges: 
-            adj[e.u].append(e.v)
-            if not is_directed and not e.is_directed: adj[e.v].append(e.u) 
-            elif is_directed and not e.is_directed: adj[e.v].append(e.u)
-        for u in adj: adj[u].sort(reverse=True)
-        stack=[start_node]; path=[]
-        while stack:
-            v = stack[-1]
-            if adj[v]:
-                u = adj[v].pop()
-                if not is_directed and u in adj:
-                    try: adj[u].remove(v)
-                    except ValueError: pass
-                stack.append(u)
-            else: path.append(stack.pop())
-        return path[::-1]
+    def hierholzer_algo(self, start_node, budget=None):
+        directed, c, ids = self._euler_csr(); off, to = c.off, c.nbr
+        used = bytearray(len(to) if directed else len(self.edges)); ptr = list(off[:c.n])
+        stack = [start_node]; path = []; steps = 0
+        try:
+            while stack:
+                if budget and budget.expired(): return stack
+                v = stack[-1]; end = off[v + 1]; p = ptr[v]; steps += 1
+                while p < end and used[ids[p]]: p += 1
+                if p < end: used[ids[p]] = 1; ptr[v] = p + 1; stack.append(to[p])
+                else: ptr[v] = p; path.append(stack.pop())
+            return path[::-1]
+        finally:
+            if budget: budget.tally(steps=steps, expanded=len(path))
 
-    def check_bipartite(self):
+    def check_bipartite(self, budget=None):
         if not self.nodes: return False,{}
-        adj={n.id:[] for n in self.nodes}
-        for e in self.edges: adj[e.u].append(e.v); adj[e.v].append(e.u)
-        col={}; valid=True
-        for i in range(len(self.nodes)):
-            if i not in col:
-                col[i]=0; q=deque([i])
-                while q:
-                    u=q.popleft()
-                    for v in adj[u]:
-                        if v not in col: col[v]=1-col[u]; q.append(v)
-                        elif col[v]==col[u]: return False, {}
-        return True, col
-
-    def ford_fulkerson(self, s, t):
-        n = len(self.nodes)
-        cap = [[0.0]*n for _ in range(n)]
-        for e in self.edges:
-            cap[e.u][e.v] = e.weight
-            if not e.is_directed: cap[e.v][e.u] = e.weight
-        max_f = 0.0
-        while True:
-            par = [-1]*n; q = deque([(s, float('inf'))]); par[s] = -2; path_f = 0.0
-            while q:
-                u, flow = q.popleft()
-                for v in range(n):
-                    if par[v]==-1 and cap[u][v] > 0:
-                        par[v] = u; new_f = min(flow, cap[u][v])
-                        if v==t: path_f=new_f; break
-                        q.append((v, new_f))
-                if path_f > 0: break
-            if path_f == 0: break
-            max_f += path_f; curr = t
-            while curr!=s:
-                p = par[curr]; cap[p][curr] -= path_f; cap[curr][p] += path_f; curr = p
-        return max_f
\ No newline at end of file
+        c=self.csr(UNDIRECTED); off, nbr = c.off, c.nbr
+        col={}; valid=True; comps=0
+        try:
+            for i in self.nodes.live():
+                if i not in col:
+                    col[i]=0; q=deque([i]); comps+=1
+                    while q:
+                        if budget and budget.expired(): return False, {}
+                        u=q.popleft()
+                        for v in nbr[off[u]:off[u+1]]:
+                            if v not in col: col[v]=1-col[u]; q.append(v)
+                            elif col[v]==col[u]: return False, {}
+            return True, col
+        finally:
+            if budget: budget.tally(expanded=len(col), components=comps)
+
+    # Giá trị luồng cực đại (Dinic trên đồ thị thặng dư thưa); luồng theo cạnh và lát cắt: flow.max_flow
+    def ford_fulkerson(self, s, t, budget=None):
+        return flow.max_flow(self, s, t, budget=budget)[0]
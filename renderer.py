@@ -0,0 +1,283 @@
+import math
+import tkinter as tk
+
+from model import UNDIRECTED
+
+# =======================================================================================
+# VẼ CANVAS KIỂU GIỮ LẠI (RETAINED MODE)
+# Mỗi đỉnh / cạnh giữ id các item canvas của nó; thay đổi chỉ cập nhật đúng item liên quan
+# bằng coords / itemconfig. Kéo màn hình dùng cv.move, zoom dùng cv.scale quanh con trỏ.
+# Xóa đỉnh / cạnh, hoàn tác / làm lại, mở file: refresh() đồng bộ từng phần — id đỉnh ổn định
+# (đỉnh xóa chỉ bị đánh dấu) nên chỉ bỏ item của ô đã xóa và đặt lại vị trí các đỉnh đang vẽ;
+# cạnh được nhận lại theo khóa (u, v) vì xóa cạnh bằng swap-pop làm đổi chỉ số cạnh. Chỉ đổi
+# mức chi tiết khi zoom mới dựng lại toàn bộ phần đồ thị.
+#
+# LỌC THEO KHUNG NHÌN & MỨC CHI TIẾT
+# - Chỉ tạo item cho phần tử nằm trong "vùng đã dựng" = khung nhìn nới rộng MARGIN mỗi phía;
+#   kéo / zoom ra khỏi vùng này thì dựng lại vùng mới (thêm item thiếu, xóa item thừa).
+# - zoom < LABEL_ZOOM: bỏ nhãn trọng số và số hiệu đỉnh; zoom < THIN_ZOOM: cạnh nét mảnh,
+#   không mũi tên; zoom < CLUSTER_ZOOM hoặc quá DETAIL_LIMIT đỉnh trong vùng: gộp các đỉnh
+#   theo ô CLUSTER_PX điểm ảnh thành cụm, cạnh giữa hai ô chỉ vẽ một lần.
+# =======================================================================================
+NODE_FILL, NODE_SEL, NODE_OUT = "#2ecc71", "#f1c40f", "#27ae60"
+EDGE_COL, WEIGHT_COL = "#34495e", "#e74c3c"
+HIGHLIGHT_TAGS = ("highlight", "highlight_edge")
+
+LABEL_ZOOM = 0.5
+THIN_ZOOM = 0.35
+CLUSTER_ZOOM = 0.25
+DETAIL_LIMIT = 4000
+CLUSTER_PX = 24
+MARGIN = 0.5
+
+def weight_text(w): return str(int(w)) if w.is_integer() else str(w)
+
+class Renderer:
+    def __init__(self, app):
+        self.app = app; self.cv = app.cv
+        self.nodes = {}; self.edges = {}   # chỉ số -> (oval, text) / (line, text, box); text/box = None khi ẩn nhãn
+        self.ekey = {}                     # chỉ số cạnh -> (u, v) lúc tạo item
+        self.hidden = set()                # cạnh có hai đầu trùng nhau (không vẽ được)
+        self.sel = None; self.version = None
+        self.region = None; self.level = 0; self.clustered = False
+
+    @property
+    def graph(self): return self.app.graph
+    @property
+    def z(self): return self.app.zoom_scale
+    def radius(self): return self.app.base_r * self.z
+
+    def screen(self, i):
+        n = self.graph.nodes[i]; return self.app.to_screen_x(n.x), self.app.to_screen_y(n.y)
+
+    # --- KHUNG NHÌN (tọa độ thế giới) ---
+    def viewport(self):
+        a = self.app; w = max(self.cv.winfo_width(), 1); h = max(self.cv.winfo_height(), 1)
+        return a.to_world_x(0), a.to_world_y(0), a.to_world_x(w), a.to_world_y(h)
+
+    def _expand(self, rect):
+        x0, y0, x1, y1 = rect; mx = (x1 - x0) * MARGIN; my = (y1 - y0) * MARGIN
+        return x0 - mx, y0 - my, x1 + mx, y1 + my
+
+    def _inside(self, rect):
+        if self.region is None: return False
+        x0, y0, x1, y1 = rect; r0, s0, r1, s1 = self.region
+        return r0 <= x0 and s0 <= y0 and x1 <= r1 and y1 <= s1
+
+    def level_for(self, z): return 0 if z >= LABEL_ZOOM else 1 if z >= THIN_ZOOM else 2
+
+    # Đỉnh / cạnh giao với hình chữ nhật (lưới không gian của đồ thị)
+    def query(self, rect):
+        x0, y0, x1, y1 = rect; r = self.app.base_r; G = self.graph.grid()
+        return G.nodes_in_rect(x0 - r, y0 - r, x1 + r, y1 + r), G.edges_in_rect(x0, y0, x1, y1)
+
+    def node_in_region(self, i):
+        n = self.graph.nodes[i]; x0, y0, x1, y1 = self.region; r = self.app.base_r
+        return x0 - r <= n.x <= x1 + r and y0 - r <= n.y <= y1 + r
+
+    def edge_in_region(self, i):
+        X, Y = self.graph.nodes.x, self.graph.nodes.y; E = self.graph.edges; x0, y0, x1, y1 = self.region
+        u, v = E.u[i], E.v[i]
+        return not (max(X[u], X[v]) < x0 or min(X[u], X[v]) > x1 or max(Y[u], Y[v]) < y0 or min(Y[u], Y[v]) > y1)
+
+    # Đoạn thẳng (đã lùi đầu mũi tên), trung điểm cho nhãn trọng số, và có vẽ được không
+    def edge_geom(self, i):
+        E = self.graph.edges
+        sx, sy = self.screen(E.u[i]); ex, ey = self.screen(E.v[i])
+        mid = ((sx + ex) / 2, (sy + ey) / 2)
+        dx, dy = ex - sx, ey - sy; l = math.hypot(dx, dy)
+        if l and E.d[i]:
+            red = self.radius() + 5 * self.z; ex -= dx / l * red; ey -= dy / l * red
+        return (sx, sy, ex, ey), mid, l > 0
+
+    def _box(self, tid, bid):
+        b = self.cv.bbox(tid)
+        if b: self.cv.coords(bid, b[0] - 4, b[1] - 2, b[2] + 4, b[3] + 2)
+
+    def _arrow(self, i): return tk.LAST if self.graph.edges.d[i] and self.level < 2 else tk.NONE
+    def _edge_width(self): return 1 if self.level >= 2 else max(1, 3.0 * self.z)
+
+    def _new_edge(self, i):
+        cv = self.cv; E = self.graph.edges; z = self.z; self.ekey[i] = (E.u[i], E.v[i])
+        line, mid, ok = self.edge_geom(i)
+        lid = cv.create_line(*line, fill=EDGE_COL, width=self._edge_width(), arrow=self._arrow(i),
+                             arrowshape=(16 * z, 20 * z, 8 * z), capstyle=tk.ROUND, tags="edge")
+        tid = bid = None
+        if self.level == 0:
+            tid = cv.create_text(*mid, text=weight_text(E.w[i]), fill=WEIGHT_COL, font=("Segoe UI", int(14 * z), "bold"), tags=("weight_lbl", "wtxt"))
+            bid = cv.create_rectangle(*mid, *mid, fill="white", outline="#bdc3c7", width=1, tags=("weight_lbl", "wbox"))
+            self._box(tid, bid); cv.tag_raise(tid, bid)
+        if not ok:
+            self.hidden.add(i)
+            for it in (lid, tid, bid):
+                if it: cv.itemconfig(it, state=tk.HIDDEN)
+        return lid, tid, bid
+
+    def _new_node(self, i):
+        sx, sy = self.screen(i); r = self.radius(); z = self.z; sel = i == self.sel
+        oid = self.cv.create_oval(sx - r, sy - r, sx + r, sy + r, fill=NODE_SEL if sel else NODE_FILL, outline=NODE_OUT,
+                                  width=max(2, 6.0 * z) if sel else max(1, 3.0 * z), tags=("node", "noval"))
+        tid = None
+        if self.level == 0: tid = self.cv.create_text(sx, sy, text=str(i), font=("Segoe UI", int(16 * z), "bold"), fill="white", tags=("node", "ntxt"))
+        return oid, tid
+
+    def _drop(self, items):
+        for it in items:
+            if it: self.cv.delete(it)
+
+    def _drop_all(self):
+        for items in self.nodes.values(): self._drop(items)
+        for items in self.edges.values(): self._drop(items)
+        self.nodes = {}; self.edges = {}; self.hidden = set(); self.ekey = {}
+
+    # Giữ thứ tự lớp: cạnh < nhãn trọng số < đỉnh < tô màu
+    def _restack(self):
+        self.cv.tag_lower("weight_lbl"); self.cv.tag_lower("edge")
+
+    def full(self):
+        self.cv.delete("all"); self.nodes = {}; self.edges = {}; self.hidden = set(); self.ekey = {}
+        self.sel = self.app.sel_node; self.level = self.level_for(self.z); self.region = None
+        self.version = self.graph.version
+        self.realize()
+
+    # Dựng vùng quanh khung nhìn hiện tại: thêm item còn thiếu, xóa item ra ngoài vùng
+    def realize(self):
+        self.region = self._expand(self.viewport())
+        nodes, edges = self.query(self.region)
+        if self.clustered: self.cv.delete("cluster"); self.cv.delete("cluster_edge")
+        self.clustered = self.z < CLUSTER_ZOOM or len(nodes) > DETAIL_LIMIT
+        if self.clustered: self._drop_all(); self._clusters(nodes, edges); return
+        keep_n = set(nodes); keep_e = set(edges)
+        for i in [i for i in self.nodes if i not in keep_n]: self._drop(self.nodes.pop(i))
+        for i in [i for i in self.edges if i not in keep_e]: self._drop(self.edges.pop(i)); self.hidden.discard(i)
+        for i in edges:
+            if i not in self.edges: self.edges[i] = self._new_edge(i)
+        for i in nodes:
+            if i not in self.nodes: self.nodes[i] = self._new_node(i)
+        self._restack()
+
+    # Gộp cụm: một vòng tròn cho mỗi ô lưới trên màn hình, cạnh giữa hai ô vẽ một lần
+    def _clusters(self, nodes, edges):
+        cv = self.cv; X, Y = self.graph.nodes.x, self.graph.nodes.y; E = self.graph.edges
+        a = self.app; z = self.z; cell = CLUSTER_PX
+        def key(i): return int((X[i] + a.offset_x) * z // cell), int((Y[i] + a.offset_y) * z // cell)
+        cells = {}
+        for i in nodes:
+            k = key(i); c = cells.get(k)
+            if c is None: cells[k] = [1, X[i], Y[i]]
+            else: c[0] += 1; c[1] += X[i]; c[2] += Y[i]
+        pairs = set()
+        for i in edges:
+            p, q = key(E.u[i]), key(E.v[i])
+            if p != q: pairs.add((p, q) if p < q else (q, p))
+        def centre(k):
+            c = cells.get(k)
+            if c: return a.to_screen_x(c[1] / c[0]), a.to_screen_y(c[2] / c[0])
+            return (k[0] + 0.5) * cell, (k[1] + 0.5) * cell
+        for p, q in pairs: cv.create_line(*centre(p), *centre(q), fill="#95a5a6", width=1, tags="cluster_edge")
+        for k, (cnt, _, _) in cells.items():
+            x, y = centre(k); r = max(3.0, min(cell / 2, self.radius()) * (1 + math.log10(cnt)) / 2)
+            cv.create_oval(x - r, y - r, x + r, y + r, fill=NODE_FILL, outline=NODE_OUT, tags="cluster")
+            if cnt > 1 and r >= 8: cv.create_text(x, y, text=str(cnt), font=("Segoe UI", 9, "bold"), fill="white", tags="cluster")
+
+    def clear_highlights(self):
+        for t in HIGHLIGHT_TAGS: self.cv.delete(t)
+
+    # Đưa canvas về trạng thái thường; đồng bộ lại nếu đồ thị đổi mà chưa được báo
+    def sync(self):
+        self.clear_highlights()
+        if self.version != self.graph.version: self.refresh()
+        else: self.select(self.app.sel_node)
+
+    def refresh(self):
+        self.version = self.graph.version
+        if self.clustered: self.realize(); self.sel = self.app.sel_node; return
+        N = self.graph.nodes; n = len(N)
+        for i in [i for i in self.nodes if i >= n or not N.alive[i]]: self._drop(self.nodes.pop(i))
+        for i in self.nodes: self._place_node(i)
+        old, hidden, keys = self.edges, self.hidden, self.ekey
+        self.edges = {}; self.hidden = set(); self.ekey = {}
+        for i, items in old.items():
+            k = keys[i]; e = self.graph.edge_at(*k)
+            if e is None or e.id in self.edges: self._drop(items); continue
+            self.edges[e.id] = items; self.ekey[e.id] = k
+            if i in hidden: self.hidden.add(e.id)
+        for i in list(self.edges): self.edge(i)
+        self.realize(); self.select(self.app.sel_node)
+
+    # Khung nhìn đổi kích thước hoặc đã ra khỏi vùng đã dựng
+    def viewport_changed(self):
+        if not self._inside(self.viewport()): self.realize()
+
+    # --- CẬP NHẬT TỪNG PHẦN ---
+    def node_added(self, i):
+        self.version = self.graph.version
+        if self.clustered: self.realize()
+        else: self.nodes[i] = self._new_node(i)
+
+    def edge(self, i):
+        self.version = self.graph.version
+        if self.clustered: self.realize(); return
+        if i in self.edges:
+            lid, tid, bid = self.edges[i]; E = self.graph.edges
+            self.cv.itemconfig(lid, arrow=self._arrow(i))
+            if tid: self.cv.itemconfig(tid, text=weight_text(E.w[i])); self._box(tid, bid)
+            self._place_edge(i)
+        elif self.edge_in_region(i):
+            lid, tid, bid = self.edges[i] = self._new_edge(i)
+            if self.nodes:
+                if tid: self.cv.tag_lower(tid, "node"); self.cv.tag_lower(bid, tid); self.cv.tag_lower(lid, bid)
+                else: self.cv.tag_lower(lid, "node")
+
+    def _place_edge(self, i):
+        cv = self.cv; lid, tid, bid = self.edges[i]
+        line, mid, ok = self.edge_geom(i)
+        cv.coords(lid, *line)
+        if tid:
+            x, y = cv.coords(tid); dx, dy = mid[0] - x, mid[1] - y
+            cv.move(tid, dx, dy); cv.move(bid, dx, dy)
+        if ok == (i in self.hidden):
+            state = tk.NORMAL if ok else tk.HIDDEN
+            for it in (lid, tid, bid):
+                if it: cv.itemconfig(it, state=state)
+            if ok:
+                self.hidden.discard(i)
+                if tid: self._box(tid, bid)
+            else: self.hidden.add(i)
+
+    def moved(self, i):
+        if self.clustered: return
+        if i in self.nodes: self._place_node(i)
+        elif self.node_in_region(i): self.nodes[i] = self._new_node(i)
+        c = self.graph.csr(UNDIRECTED)
+        for e in set(c.eid[c.off[i]:c.off[i + 1]]):
+            if e in self.edges: self._place_edge(e)
+            else: self.edge(e)
+
+    def _place_node(self, i):
+        sx, sy = self.screen(i); r = self.radius(); oid, tid = self.nodes[i]
+        self.cv.coords(oid, sx - r, sy - r, sx + r, sy + r)
+        if tid: self.cv.coords(tid, sx, sy)
+
+    def select(self, i):
+        z = self.z
+        if self.sel in self.nodes: self.cv.itemconfig(self.nodes[self.sel][0], fill=NODE_FILL, width=max(1, 3.0 * z))
+        self.sel = i
+        if i in self.nodes: self.cv.itemconfig(self.nodes[i][0], fill=NODE_SEL, width=max(2, 6.0 * z))
+
+    # --- KÉO / ZOOM: biến đổi toàn bộ item, chỉ cấu hình lại độ dày nét và cỡ chữ ---
+    def pan(self, dx, dy):
+        self.cv.move("all", dx, dy); self.viewport_changed()
+
+    def zoom(self, mx, my, f):
+        cv = self.cv; z = self.z
+        cv.scale("all", mx, my, f, f)
+        # Đổi mức chi tiết / đang gộp cụm: dựng lại phần đồ thị, item tô màu vẫn giữ (đã scale)
+        if self.level_for(z) != self.level or self.clustered or z < CLUSTER_ZOOM:
+            self.level = self.level_for(z); self._drop_all(); self.realize(); return
+        cv.itemconfig("edge", width=self._edge_width(), arrowshape=(16 * z, 20 * z, 8 * z))
+        cv.itemconfig("noval", width=max(1, 3.0 * z))
+        cv.itemconfig("ntxt", font=("Segoe UI", int(16 * z), "bold"))
+        cv.itemconfig("wtxt", font=("Segoe UI", int(14 * z), "bold"))
+        if self.sel in self.nodes: cv.itemconfig(self.nodes[self.sel][0], width=max(2, 6.0 * z))
+        self.viewport_changed()
@@ -0,0 +1,127 @@
+import math
+
+# =======================================================================================
+# CHỈ MỤC KHÔNG GIAN: LƯỚI ĐỀU (HASH GRID)
+# - Đỉnh nằm trong ô chứa tọa độ của nó.
+# - Cạnh được ghi vào mọi ô mà hộp bao của nó phủ; cạnh quá dài (phủ hơn LONG_CELLS ô) để
+#   riêng trong `long` và luôn là ứng viên.
+# Kích thước ô chọn khi dựng theo mật độ đỉnh. Graph giữ lưới cập nhật khi thêm / kéo đỉnh,
+# thêm / xóa cạnh; thao tác đánh số lại (xóa đỉnh, mở file) thì dựng lại khi cần.
+# =======================================================================================
+LONG_CELLS = 64
+DEFAULT_CELL = 100.0
+
+class Grid:
+    def __init__(self, nodes, edges, cell=None):
+        self.N, self.E = nodes, edges
+        self.cell = cell or self._pick_cell()
+        self.nodes = {}; self.edges = {}; self.long = set()
+        for i in nodes.live(): self.add_node(i)
+        for i in range(len(edges)): self.add_edge(i)
+
+    def _pick_cell(self):
+        X, Y = self.N.x, self.N.y; n = len(X)
+        if n < 2: return DEFAULT_CELL
+        if self.N.dead:
+            live = self.N.live(); X = [X[i] for i in live]; Y = [Y[i] for i in live]; n = len(live)
+            if n < 2: return DEFAULT_CELL
+        area = (max(X) - min(X)) * (max(Y) - min(Y))
+        return 2 * math.sqrt(area / n) if area > 0 else DEFAULT_CELL
+
+    def key(self, x, y): c = self.cell; return math.floor(x / c), math.floor(y / c)
+
+    def _span(self, x0, y0, x1, y1):
+        a, b = self.key(x0, y0); c, d = self.key(x1, y1)
+        return a, b, c, d
+
+    # --- CẬP NHẬT ---
+    def add_node(self, i):
+        k = self.key(self.N.x[i], self.N.y[i]); b = self.nodes.get(k)
+        if b is None: self.nodes[k] = {i}
+        else: b.add(i)
+
+    def remove_node(self, i):
+        k = self.key(self.N.x[i], self.N.y[i]); b = self.nodes[k]; b.discard(i)
+        if not b: del self.nodes[k]
+
+    def _edge_cells(self, i):
+        X, Y = self.N.x, self.N.y; u, v = self.E.u[i], self.E.v[i]
+        a, b, c, d = self._span(min(X[u], X[v]), min(Y[u], Y[v]), max(X[u], X[v]), max(Y[u], Y[v]))
+        if (c - a + 1) * (d - b + 1) > LONG_CELLS: return None
+        return [(p, q) for p in range(a, c + 1) for q in range(b, d + 1)]
+
+    def add_edge(self, i):
+        cells = self._edge_cells(i)
+        if cells is None: self.long.add(i); return
+        for k in cells:
+            b = self.edges.get(k)
+            if b is None: self.edges[k] = {i}
+            else: b.add(i)
+
+    def remove_edge(self, i):
+        cells = self._edge_cells(i)
+        if cells is None: self.long.discard(i); return
+        for k in cells:
+            b = self.edges.get(k)
+            if b is not None:
+                b.discard(i)
+                if not b: del self.edges[k]
+
+    # --- TRUY VẤN ---
+    def _cells(self, buckets, x0, y0, x1, y1):
+        a, b, c, d = self._span(x0, y0, x1, y1)
+        if (c - a + 1) * (d - b + 1) > len(buckets):
+            for (p, q), s in buckets.items():
+                if a <= p <= c and b <= q <= d: yield s
+        else:
+            for p in range(a, c + 1):
+                for q in range(b, d + 1):
+                    s = buckets.get((p, q))
+                    if s: yield s
+
+    def nodes_in_rect(self, x0, y0, x1, y1):
+        X, Y = self.N.x, self.N.y
+        return sorted(i for s in self._cells(self.nodes, x0, y0, x1, y1) for i in s if x0 <= X[i] <= x1 and y0 <= Y[i] <= y1)
+
+    # Cạnh có hộp bao giao với hình chữ nhật
+    def edges_in_rect(self, x0, y0, x1, y1):
+        X, Y = self.N.x, self.N.y; U, V = self.E.u, self.E.v
+        cand = set(self.long)
+        for s in self._cells(self.edges, x0, y0, x1, y1): cand |= s
+        out = []
+        for i in cand:
+            u, v = U[i], V[i]
+            if max(X[u], X[v]) < x0 or min(X[u], X[v]) > x1 or max(Y[u], Y[v]) < y0 or min(Y[u], Y[v]) > y1: continue
+            out.append(i)
+        out.sort(); return out
+
+    def nodes_near(self, x, y, r):
+        X, Y = self.N.x, self.N.y
+        return [i for i in self.nodes_in_rect(x - r, y - r, x + r, y + r) if math.hypot(X[i] - x, Y[i] - y) < r]
+
+    @staticmethod
+    def _ring(cx, cy, r):
+        if r == 0: return [(cx, cy)]
+        return ([(cx + p, cy - r) for p in range(-r, r + 1)] + [(cx + p, cy + r) for p in range(-r, r + 1)] +
+                [(cx - r, cy + q) for q in range(1 - r, r)] + [(cx + r, cy + q) for q in range(1 - r, r)])
+
+    # k đỉnh gần (x, y) nhất, tăng dần theo khoảng cách. Quét từng vòng ô quanh ô chứa điểm:
+    # sau vòng r đã thấy mọi đỉnh cách điểm <= r * cell.
+    def nearest(self, x, y, k, exclude=None):
+        X, Y = self.N.x, self.N.y; cx, cy = self.key(x, y)
+        A = self.N.alive; want = min(k, self.N.count - (exclude is not None and 0 <= exclude < len(X) and A[exclude]))
+        if want <= 0: return []
+        found = []; ring = 0
+        while True:
+            if (2 * ring + 1) ** 2 > 4 * len(self.nodes):
+                # Vòng quét đã rộng hơn số ô có đỉnh: xét thẳng mọi đỉnh
+                found = sorted((math.hypot(X[i] - x, Y[i] - y), i) for s in self.nodes.values() for i in s if i != exclude)
+                break
+            for key in self._ring(cx, cy, ring):
+                for i in self.nodes.get(key, ()):
+                    if i != exclude: found.append((math.hypot(X[i] - x, Y[i] - y), i))
+            if len(found) >= want:
+                found.sort()
+                if found[want - 1][0] <= ring * self.cell: break
+            ring += 1
+        return [i for _, i in found[:k]]
@@ -0,0 +1,109 @@
+import heapq
+import weakref
+from array import array
+from collections import OrderedDict, deque
+
+from model import MIXED, TOL
+
+# =======================================================================================
+# CÂY ĐƯỜNG ĐI NGẮN NHẤT TỪ MỘT NGUỒN (một-tới-nhiều)
+# shortest_tree(graph, s) chạy Dijkstra tới hết (trọng số âm: SPFA) và trả về Tree gồm dist
+# (array 'd', vô cực = không tới được) và pred (array 'q', -1 = gốc / không tới được); đường
+# tới bất kỳ đích nào dựng lại trong O(độ dài đường).
+# TreeCache giữ các cây gần đây theo khóa (nguồn, Graph.version), loại cây ít dùng nhất khi
+# tổng bộ nhớ vượt max_bytes; đồ thị đổi version thì mọi cây cũ bị bỏ. cache_for(graph) trả
+# về bộ đệm riêng của từng đồ thị; path() / paths() dùng bộ đệm đó.
+# =======================================================================================
+MAX_BYTES = 64 << 20
+INF = float("inf")
+
+class Tree:
+    __slots__ = ("source", "dist", "pred", "version", "complete")
+
+    def __init__(self, source, dist, pred, version, complete=True):
+        self.source = source; self.dist = dist; self.pred = pred; self.version = version; self.complete = complete
+
+    @property
+    def nbytes(self): return self.dist.itemsize * len(self.dist) + self.pred.itemsize * len(self.pred)
+
+    def d(self, t): return self.dist[t]
+
+    def path(self, t):
+        if self.dist[t] == INF: return None
+        pred = self.pred; p = [t]
+        while t != self.source: t = pred[t]; p.append(t)
+        return p[::-1]
+
+def shortest_tree(graph, s, budget=None):
+    c = graph.csr(MIXED); off, nbr, wt, n = c.off, c.nbr, c.wt, c.n
+    dist = array('d', [INF]) * n; pred = array('q', [-1]) * n; dist[s] = 0.0; pops = 0; relax = 0
+    complete = True
+    try:
+        if any(w < 0 for w in graph.edges.w):
+            # SPFA; đường tới một đỉnh vượt quá n cạnh = có chu trình âm tới được từ s
+            hops = [0] * n; inq = bytearray(n); inq[s] = 1; q = deque([s])
+            while q:
+                if budget and budget.expired(): complete = False; break
+                u = q.popleft(); inq[u] = 0; du = dist[u]; pops += 1
+                for k in range(off[u], off[u + 1]):
+                    v = nbr[k]; nd = du + wt[k]
+                    if nd < dist[v] and dist[v] - nd > TOL * (1 + abs(nd)):
+                        dist[v] = nd; pred[v] = u; hops[v] = hops[u] + 1; relax += 1
+                        if hops[v] > n: raise ValueError("Có chu trình âm tới được từ nguồn — không có cây đường đi ngắn nhất")
+                        if not inq[v]: inq[v] = 1; q.append(v)
+        else:
+            pq = [(0.0, s)]
+            while pq:
+                if budget and budget.expired(): complete = False; break
+                d, u = heapq.heappop(pq); pops += 1
+                if d > dist[u]: continue
+                for k in range(off[u], off[u + 1]):
+                    v = nbr[k]; nd = d + wt[k]
+                    if nd < dist[v]: dist[v] = nd; pred[v] = u; heapq.heappush(pq, (nd, v)); relax += 1
+    finally:
+        if budget: budget.tally(pops=pops, relaxations=relax)
+    return Tree(s, dist, pred, graph.version, complete)
+
+class TreeCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes; self.trees = OrderedDict(); self.nbytes = 0
+        self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def clear(self): self.trees.clear(); self.nbytes = 0
+
+    def _evict(self):
+        while self.trees and self.nbytes > self.max_bytes:
+            _, t = self.trees.popitem(last=False); self.nbytes -= t.nbytes; self.evictions += 1
+
+    def tree(self, graph, s, budget=None):
+        key = (s, graph.version); t = self.trees.get(key)
+        if t is not None: self.trees.move_to_end(key); self.hits += 1; return t
+        self.misses += 1
+        if self.trees and next(iter(self.trees))[1] != graph.version:
+            self.clear()   # các cây của version cũ không còn dùng được
+        t = shortest_tree(graph, s, budget)
+        if t.complete and t.nbytes <= self.max_bytes:
+            self.trees[key] = t; self.nbytes += t.nbytes; self._evict()
+        return t
+
+_caches = weakref.WeakKeyDictionary()
+
+def cache_for(graph):
+    c = _caches.get(graph)
+    if c is None: c = _caches[graph] = TreeCache()
+    return c
+
+# (đường đi, chi phí, xong) như Graph.dijkstra, nhưng cây từ s được giữ lại cho các truy vấn
+# sau. Budget dừng khi cây chưa xong: không trả lời từ cây dở dang -> (None, inf, False)
+def path(graph, s, t, budget=None):
+    tr = cache_for(graph).tree(graph, s, budget)
+    if not tr.complete: return None, INF, False
+    p = tr.path(t)
+    return (p, tr.dist[t], True) if p else (None, INF, True)
+
+# Nhiều đích từ cùng một nguồn: một lần tính cây, ({đích: (đường đi, chi phí)}, xong);
+# cây dở dang -> ({}, False)
+def paths(graph, s, targets, budget=None):
+    tr = cache_for(graph).tree(graph, s, budget)
+    if not tr.complete: return {}, False
+    return {t: ((tr.path(t), tr.dist[t]) if tr.dist[t] != INF else (None, INF)) for t in targets}, True
@@ -0,0 +1,14 @@
+import bench
+
+def test_every_case_runs_at_tiny_scale():
+    report = bench.run("tiny", repeat=1)
+    assert [r["algorithm"] for r in report["results"]] == [c[0] for c in bench.CASES]
+    for r in report["results"]:
+        assert not r["timed_out"], r["case"]
+        assert r["n"] > 0 and r["seconds"] >= 0 and r["peak_bytes"] > 0, r["case"]
+
+def test_compare_flags_slowdown():
+    old = {"results": [{"case": "x", "n": 10, "seconds": 1.0, "peak_bytes": 100}]}
+    new = {"results": [{"case": "x", "n": 10, "seconds": 2.0, "peak_bytes": 100}]}
+    assert bench.compare(old, new)[0][-1] is True
+    assert bench.compare(old, old)[0][-1] is False
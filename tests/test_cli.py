@@ -0,0 +1,35 @@
+import pytest
+
+import cli
+import graphio
+from model import Graph
+
+def _graph():
+    g = Graph()
+    for i in range(4): g.add_node(i, 0)
+    for u, v in ((0, 1), (1, 2), (2, 3)): g.add_edge(u, v, 1.0, False)
+    g.remove_node(3)
+    return g
+
+@pytest.mark.parametrize("name, params", [
+    ("astar", {"s": 0, "e": 999}),
+    ("dijkstra", {"s": 0, "e": 999}),
+    ("bfs", {"s": 999}),
+    ("dijkstra", {"s": 0, "e": 3}),            # đỉnh đã xóa
+    ("max_flow", {"s": -1, "t": 2}),
+    ("tsp", {"start": 3}),
+    ("paths", {"s": 0, "targets": [1, 7]}),
+    ("batch_paths", {"pairs": [[0, 1], [3, 0]]}),
+])
+def test_bad_node_ids_are_rejected(name, params):
+    with pytest.raises(ValueError):
+        cli.run(_graph(), name, params)
+
+def test_valid_node_ids_still_run():
+    assert cli.run(_graph(), "dijkstra", {"s": 0, "e": 2})["result"] == {"path": [0, 1, 2], "cost": 2.0}
+    assert cli.run(_graph(), "fleury", {"start": None})["algorithm"] == "fleury"
+
+def test_main_reports_bad_node_and_exits_2(tmp_path, capsys):
+    p = str(tmp_path / "g.tspg"); graphio.save(p, *graphio.snapshot(_graph()))
+    assert cli.main([p, "astar", "s=0", "e=999"]) == 2
+    assert "lỗi" in capsys.readouterr().err
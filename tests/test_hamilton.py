@@ -0,0 +1,47 @@
+import itertools
+import random
+import time
+
+import pytest
+
+import generators as gen
+from model import Budget, Graph
+
+# Các bộ từng chạy hết ngân sách (timed_out) trước khi có cắt tỉa theo đỉnh khớp / cạnh bị ép
+SLOW = [
+    ("check_hamilton", lambda: gen.random_geometric(40, degree=7, seed=2)),
+    ("check_hamilton", lambda: gen.random_geometric(35, degree=7, seed=0)),
+    ("check_hamilton", lambda: gen.erdos_renyi(40, m=88, seed=1)),
+    ("check_hamilton_path", lambda: gen.random_geometric(50, degree=7, seed=3)),
+    ("check_hamilton_path", lambda: gen.erdos_renyi(50, m=110, seed=2)),
+]
+
+def _valid(g, path, cycle):
+    out, _ = g._ham_masks(); seq = path[:-1] if cycle else path
+    return sorted(seq) == list(range(len(out))) and all(out[a] >> b & 1 for a, b in zip(path, path[1:]))
+
+@pytest.mark.parametrize("name, make", SLOW)
+def test_former_timeouts_finish_in_seconds(name, make):
+    g = make(); b = Budget(60); t0 = time.perf_counter()
+    ok, path = getattr(g, name)(budget=b)
+    assert not b.timed_out and time.perf_counter() - t0 < 5
+    assert not ok or _valid(g, path, name == "check_hamilton")
+
+def _random(n, p, directed, seed):
+    r = random.Random(seed); g = Graph()
+    for _ in range(n): g.add_node(0, 0)
+    for i in range(n):
+        for j in range(n):
+            if i != j and r.random() < p: g.add_edge(i, j, 1.0, directed or r.random() < 0.3)
+    return g
+
+def test_search_agrees_with_dp(monkeypatch):
+    monkeypatch.setattr(Graph, "HAM_DP_LIMIT", 0)   # luôn tìm kiếm, DP chỉ làm đáp án chuẩn
+    for seed in range(150):
+        n = 5 + seed % 9; g = _random(n, [0.2, 0.3, 0.45][seed % 3], seed % 2 == 0, seed)
+        out, inn = g._ham_masks(); ok, path = g.check_hamilton()
+        assert ok == (all(out) and all(inn) and g._ham_dp(out, inn) is not None)
+        assert not ok or _valid(g, path, True)
+        ok, path = g.check_hamilton_path()
+        assert not ok or _valid(g, path, False)
+        if n <= 7: assert ok == any(_valid(g, list(p), False) for p in itertools.permutations(range(n)))
@@ -0,0 +1,44 @@
+from model import Graph
+
+def _edges(g): return {(e.u, e.v): (e.weight, e.is_directed) for e in g.edges}
+
+def test_undirected_readd_prefers_exact_key():
+    g = Graph()
+    for _ in range(3): g.add_node(0, 0)
+    g.add_edge(1, 0, 2.0, False)      # vô hướng (1, 0) đứng trước
+    g.add_edge(0, 1, 3.0, True)       # có hướng (0, 1)
+    g.add_edge(0, 1, 7.0, False)
+    assert _edges(g) == {(1, 0): (2.0, False), (0, 1): (7.0, False)}
+
+def test_undirected_readd_independent_of_edit_history():
+    g = Graph()
+    for _ in range(3): g.add_node(0, 0)
+    g.add_edge(0, 1, 3.0, True); g.add_edge(1, 2, 1.0, False); g.add_edge(1, 0, 2.0, False)
+    g.remove_edge(0, 1, True)         # swap-pop: (1, 0) lên vị trí 0
+    g.add_edge(0, 1, 3.0, True)
+    g.add_edge(0, 1, 7.0, False)
+    assert _edges(g) == {(1, 2): (1.0, False), (1, 0): (2.0, False), (0, 1): (7.0, False)}
+
+def test_undirected_readd_falls_back_to_reverse():
+    g = Graph()
+    for _ in range(2): g.add_node(0, 0)
+    g.add_edge(1, 0, 2.0, False); g.add_edge(0, 1, 5.0, False)
+    assert _edges(g) == {(1, 0): (5.0, False)}
+
+def _cycle(*wts):
+    # 0 -> 1 -> 2 -> 0 với trọng số wts, thêm 2 -> 3
+    g = Graph()
+    for _ in range(4): g.add_node(0, 0)
+    for (u, v), w in zip([(0, 1), (1, 2), (2, 0)], wts): g.add_edge(u, v, w, True)
+    g.add_edge(2, 3, 1.0, True)
+    return g
+
+def test_rounded_zero_cycle_is_not_negative():
+    g = _cycle(0.1, 0.7, -0.8)        # tổng = -1.1e-16 do làm tròn
+    for fn in (g.spfa, g.bellman_ford):
+        p, c = fn(0, 3)
+        assert p == [0, 1, 2, 3] and abs(c - 1.8) < 1e-9
+
+def test_negative_cycle_still_detected():
+    g = _cycle(0.1, 0.7, -0.8001)
+    for fn in (g.spfa, g.bellman_ford): assert fn(0, 3)[1] == float("-inf")
@@ -0,0 +1,22 @@
+import generators as gen
+import sssp
+from model import Budget
+
+INF = float("inf")
+
+def _expiring(): return Budget(1e-9, every=1)
+
+def test_path_from_stopped_tree_is_not_an_answer():
+    g = gen.GENERATORS["geometric"](300, seed=1); t = len(g.nodes) - 1
+    assert sssp.path(g, 0, t, budget=_expiring()) == (None, INF, False)
+    assert sssp.paths(g, 0, [1, t], budget=_expiring()) == ({}, False)
+    p, c, ok = sssp.path(g, 0, t)
+    assert ok and (p is None or (p[0], p[-1]) == (0, t)) and c == g.dijkstra(0, t)[1]
+
+def test_stopped_tree_is_not_cached():
+    g = gen.GENERATORS["geometric"](300, seed=2); cache = sssp.cache_for(g)
+    sssp.path(g, 0, 5, budget=_expiring())
+    assert not cache.trees and cache.nbytes == 0
+    res, ok = sssp.paths(g, 0, [5, 7])
+    assert ok and len(cache.trees) == 1 and cache.misses == 2
+    assert res[5][1] == g.dijkstra(0, 5)[1]
@@ -0,0 +1,36 @@
+import math
+import random
+
+import tsp
+from model import Graph
+
+def _square():
+    g = Graph()
+    for x, y in ((0, 0), (1, 0), (1, 1), (0, 1), (5, 5)): g.add_node(x, y)
+    for u, v in ((0, 1), (1, 2), (2, 3), (3, 0), (0, 2), (1, 3)): g.add_edge(u, v, 1.0, False)
+    g.remove_node(4)
+    return g
+
+def test_dead_start_returns_no_tour():
+    g = _square()
+    assert tsp.solve(g, start=4) == (None, math.inf)
+    assert tsp.solve(g, start=99) == (None, math.inf)
+
+def test_live_start_with_tombstones():
+    tour, cost = tsp.solve(_square(), start=2)
+    assert tour[0] == tour[-1] == 2 and sorted(tour[:-1]) == [0, 1, 2, 3] and cost == 4.0
+
+def _points(n, seed):
+    r = random.Random(seed); g = Graph()
+    for _ in range(n): g.add_node(r.random() * 100, r.random() * 100)
+    return g
+
+def test_lin_kernighan_keeps_tour_and_never_worsens():
+    gained = 0
+    for seed in range(20):
+        g = _points(60, seed); m = tsp.Metric(g, tsp.EUCLID); nb = m.neighbor_lists()
+        t = tsp.two_opt(m, tsp.nearest_neighbor(m, 0, nb), nb); lk = tsp.lin_kernighan(m, t, nb)
+        assert lk[0] == lk[-1] and sorted(lk[:-1]) == list(range(60))
+        assert tsp.tour_cost(m, lk) <= tsp.tour_cost(m, t) + 1e-9
+        gained += tsp.tour_cost(m, lk) < tsp.tour_cost(m, t) - 1e-9
+    assert gained > 0                 # thoát được cực tiểu 2-opt ở ít nhất một bộ
@@ -0,0 +1,350 @@
+import heapq
+import math
+
+from model import MIXED, _Stop
+import apsp
+
+# =======================================================================================
+# BÀI TOÁN NGƯỜI DU LỊCH (TSP) CÓ TRỌNG SỐ
+# - n <= EXACT_LIMIT: quy hoạch động bitmask Held-Karp (tối ưu chính xác)
+# - n lớn hơn: dựng tour (láng giềng gần nhất / tham lam / Christofides) rồi tối ưu cục bộ
+#   bằng 2-opt, bước Lin-Kernighan giới hạn độ sâu (chuỗi lật 2-opt, tối đa LK_DEPTH cạnh) và
+#   Or-opt (dời đoạn 1..3 đỉnh, tức nước đi or-3opt) trên danh sách láng giềng.
+# =======================================================================================
+GRAPH, EUCLID, CLOSURE = "graph", "euclid", "closure"
+NN, GREEDY, CHRISTOFIDES = "nn", "greedy", "christofides"
+EXACT_LIMIT = 13
+NEIGHBORS = 8
+LK_DEPTH = 6
+EPS = 1e-9
+
+# --- KHOẢNG CÁCH ---
+# GRAPH: trọng số cạnh (cạnh thiếu bị phạt bằng `missing`, lớn hơn mọi tour hợp lệ)
+# EUCLID: khoảng cách hình học giữa tọa độ các đỉnh
+# CLOSURE: bao đóng metric — độ dài đường đi ngắn nhất giữa mọi cặp (apsp.cached), mỗi bước
+#   của tour là một đường đi trong đồ thị
+class Metric:
+    def __init__(self, graph, kind=GRAPH, budget=None):
+        self.n = len(graph.nodes); self.kind = kind
+        if kind == EUCLID:
+            self.graph = graph; xs, ys = graph.nodes.x, graph.nodes.y
+            self.d = lambda i, j: math.hypot(xs[i] - xs[j], ys[i] - ys[j])
+            self.symmetric = True; self.missing = math.inf
+            return
+        # mỗi bước của tour <= tổng |w| (CLOSURE: một đường đi đơn), nên missing lớn hơn mọi tour hợp lệ
+        self.missing = missing = (self.n if kind == CLOSURE else 2) * sum(abs(w) for w in graph.edges.w) + 1
+        self.symmetric = not graph.edges.any_directed()
+        if kind == CLOSURE:
+            D = self.closure = apsp.cached(graph, budget=budget); dist = D.dist; n = self.n
+            self.d = lambda i, j: dist[i * n + j] if dist[i * n + j] != math.inf else missing
+            return
+        c = graph.csr(MIXED); rows = [dict() for _ in range(self.n)]
+        for u in range(self.n):
+            r = rows[u]
+            for v, w in c.row(u):
+                if v != u and w < r.get(v, math.inf): r[v] = w
+        self.rows = rows
+        self.d = lambda i, j: rows[i].get(j, missing)
+
+    def neighbor_lists(self, k=NEIGHBORS):
+        if self.kind == GRAPH:
+            return [sorted(r, key=r.get)[:k] for r in self.rows]
+        if self.kind == CLOSURE:
+            D = self.closure; n = self.n
+            return [heapq.nsmallest(k, (j for j in range(n) if j != i and D.d(i, j) != math.inf), key=lambda j: D.d(i, j)) for i in range(n)]
+        # EUCLID: k láng giềng gần nhất qua lưới không gian thay vì xét mọi cặp đỉnh
+        G = self.graph.grid(); xs, ys = self.graph.nodes.x, self.graph.nodes.y
+        return [G.nearest(xs[i], ys[i], k, exclude=i) for i in range(self.n)]
+
+def tour_cost(m, tour):
+    return sum(m.d(tour[i], tour[i + 1]) for i in range(len(tour) - 1))
+
+# --- HELD-KARP: dp[mask][j] = chi phí nhỏ nhất đi từ 0 qua tập mask, kết thúc ở j+1 ---
+def held_karp(m, budget=None):
+    n = m.n
+    if n <= 1: return [0, 0] if n else [], 0.0
+    k = n - 1; full = (1 << k) - 1; INF = math.inf
+    D = [[m.d(i, j) for j in range(n)] for i in range(n)]
+    dp = [None] * (full + 1)
+    for mask in range(1, full + 1): dp[mask] = [INF] * k
+    for j in range(k): dp[1 << j][j] = D[0][j + 1]
+    for mask in range(1, full + 1):
+        row = dp[mask]; rest0 = full & ~mask
+        if not rest0: continue
+        if budget and budget.expired(): budget.tally(dp_states=mask); raise _Stop
+        for j in range(k):
+            cj = row[j]
+            if cj == INF: continue
+            Dj = D[j + 1]; rest = rest0
+            while rest:
+                b = rest & -rest; rest ^= b; t = b.bit_length() - 1
+                val = cj + Dj[t + 1]; nxt = dp[mask | b]
+                if val < nxt[t]: nxt[t] = val
+    if budget: budget.tally(dp_states=full)
+    last = dp[full]; best = INF; j = -1
+    for t in range(k):
+        val = last[t] + D[t + 1][0]
+        if val < best: best = val; j = t
+    # Truy vết ngược: tìm đỉnh trước đó khớp đúng giá trị dp
+    path = []; mask = full
+    while j >= 0:
+        path.append(j + 1); prev = mask ^ (1 << j); cur = dp[mask][j]; nj = -1
+        if prev:
+            for i in range(k):
+                if prev >> i & 1 and dp[prev][i] + D[i + 1][j + 1] == cur: nj = i; break
+        mask = prev; j = nj
+    tour = [0] + path[::-1] + [0]
+    return tour, best
+
+# --- DỰNG TOUR BAN ĐẦU ---
+def nearest_neighbor(m, start=0, nb=None):
+    n = m.n; d = m.d; vis = bytearray(n); vis[start] = 1; tour = [start]; u = start
+    for _ in range(n - 1):
+        v = -1
+        if nb:
+            for c in nb[u]:
+                if not vis[c]: v = c; break
+        if v < 0: v = min((c for c in range(n) if not vis[c]), key=lambda c: d(u, c))
+        vis[v] = 1; tour.append(v); u = v
+    tour.append(start)
+    return tour
+
+def _link_paths(m, n, pairs):
+    # Nối các cạnh (u, v) đã chọn thành đường đi, tránh chu trình con bằng union-find
+    par = list(range(n)); deg = bytearray(n); adj = [[] for _ in range(n)]
+    def find(i):
+        while par[i] != i: par[i] = par[par[i]]; i = par[i]
+        return i
+    taken = 0
+    for u, v in pairs:
+        if deg[u] >= 2 or deg[v] >= 2: continue
+        ru, rv = find(u), find(v)
+        if ru == rv: continue
+        par[ru] = rv; deg[u] += 1; deg[v] += 1; adj[u].append(v); adj[v].append(u); taken += 1
+        if taken == n - 1: break
+    # Nối các đoạn còn rời theo đầu mút gần nhất
+    ends = [i for i in range(n) if deg[i] < 2]
+    while taken < n - 1:
+        u = ends[0]; ru = find(u)
+        v = min((e for e in ends if find(e) != ru and deg[e] < 2), key=lambda e: m.d(u, e))
+        par[ru] = find(v); deg[u] += 1; deg[v] += 1; adj[u].append(v); adj[v].append(u); taken += 1
+        ends = [i for i in range(n) if deg[i] < 2]
+    start = next(i for i in range(n) if deg[i] < 2)
+    tour = [start]; prev = -1; u = start
+    while len(tour) < n:
+        v = adj[u][0] if adj[u][0] != prev else adj[u][1]
+        tour.append(v); prev, u = u, v
+    tour.append(start)
+    return tour
+
+def greedy(m, nb):
+    n = m.n
+    if n < 3: return nearest_neighbor(m, 0, nb)
+    cand = sorted({(min(u, v), max(u, v)) for u in range(n) for v in nb[u]}, key=lambda e: m.d(*e))
+    return _link_paths(m, n, cand)
+
+def _mst(graph, m):
+    if m.kind == GRAPH:
+        edges, _ = graph.prim()
+        return [(e.u, e.v) for e in edges]
+    # Prim dạng mảng O(n^2) trên đồ thị đầy đủ Euclid
+    n = m.n; d = m.d; best = [math.inf] * n; par = [-1] * n; used = bytearray(n); best[0] = 0; out = []
+    for _ in range(n):
+        u = min((i for i in range(n) if not used[i]), key=best.__getitem__); used[u] = 1
+        if par[u] >= 0: out.append((par[u], u))
+        for v in range(n):
+            if not used[v]:
+                w = d(u, v)
+                if w < best[v]: best[v] = w; par[v] = u
+    return out
+
+def christofides(graph, m, nb):
+    n = m.n
+    if n < 3: return nearest_neighbor(m, 0, nb)
+    multi = [[] for _ in range(n)]; deg = [0] * n
+    for u, v in _mst(graph, m):
+        multi[u].append(v); multi[v].append(u); deg[u] += 1; deg[v] += 1
+    # Ghép cặp các đỉnh bậc lẻ theo kiểu tham lam (xấp xỉ ghép cặp hoàn hảo nhỏ nhất)
+    odd = [i for i in range(n) if deg[i] % 2]; free = set(odd)
+    for _, u, v in sorted((m.d(u, v), u, v) for a, u in enumerate(odd) for v in odd[a + 1:]):
+        if u in free and v in free:
+            free.discard(u); free.discard(v); multi[u].append(v); multi[v].append(u)
+    # Chu trình Euler (Hierholzer trên đa đồ thị) rồi đi tắt qua các đỉnh lặp
+    stack = [0]; walk = []
+    while stack:
+        u = stack[-1]
+        if multi[u]:
+            v = multi[u].pop(); multi[v].remove(u); stack.append(v)
+        else: walk.append(stack.pop())
+    seen = bytearray(n); tour = []
+    for u in walk:
+        if not seen[u]: seen[u] = 1; tour.append(u)
+    for u in range(n):
+        if not seen[u]: tour.append(u)
+    tour.append(tour[0])
+    return tour
+
+# --- TỐI ƯU CỤC BỘ ---
+def _reverse(tour, pos, i, j):
+    # Đảo đoạn vị trí i..j (theo vòng); đảo phần bù nếu ngắn hơn — cùng một chu trình
+    n = len(tour); inner = (j - i) % n + 1
+    if 2 * inner > n: i, j = (j + 1) % n, (i - 1) % n; inner = n - inner
+    for _ in range(inner // 2):
+        a, b = tour[i], tour[j]; tour[i], tour[j] = b, a; pos[b], pos[a] = i, j
+        i = (i + 1) % n; j = (j - 1) % n
+
+def two_opt(m, tour, nb, budget=None):
+    cyc = tour[:-1]; n = len(cyc)
+    if n < 4 or not m.symmetric: return tour
+    d = m.d; pos = [0] * n
+    for i, u in enumerate(cyc): pos[u] = i
+    active = list(range(n)); flag = bytearray(b"\1" * n); moves = 0
+    while active:
+        if budget and budget.expired(): break
+        a = active.pop(); flag[a] = 0; improved = False
+        for succ in (True, False):
+            pa = pos[a]; b = cyc[(pa + 1) % n] if succ else cyc[(pa - 1) % n]; dab = d(a, b)
+            for c in nb[a]:
+                dac = d(a, c)
+                if dac >= dab - EPS: break
+                pc = pos[c]; e = cyc[(pc + 1) % n] if succ else cyc[(pc - 1) % n]
+                if c == b or e == a: continue
+                delta = dac + d(b, e) - dab - d(c, e)
+                if delta < -EPS:
+                    if succ: _reverse(cyc, pos, (pa + 1) % n, pc)
+                    else: _reverse(cyc, pos, pc, (pa - 1) % n)
+                    for x in (a, b, c, e):
+                        if not flag[x]: flag[x] = 1; active.append(x)
+                    improved = True; moves += 1; break
+            if improved: break
+    if budget: budget.tally(two_opt_moves=moves)
+    return cyc + [cyc[0]]
+
+# Lin-Kernighan dạng chuỗi lật: bỏ (t1, t2), nối (t2, t3), bỏ (t4, t3) với t4 đứng trước t3 rồi
+# lật đoạn t2..t4 để tour đóng lại qua (t1, t4); lặp từ t2 := t4 khi tổng lợi g còn dương, tối đa
+# depth bước. Bước 1 thử mọi t3 trong danh sách láng giềng, các bước sau chọn t3 có lợi nhìn trước
+# d(t3, t4) - d(t2, t3) lớn nhất; cạnh đã nối không bị bỏ lại. Giữ tiền tố lợi nhất, lật ngược phần sau.
+def lin_kernighan(m, tour, nb, depth=LK_DEPTH, budget=None):
+    cyc = tour[:-1]; n = len(cyc)
+    if n < 5 or not m.symmetric: return tour
+    d = m.d; pos = [0] * n
+    for i, u in enumerate(cyc): pos[u] = i
+    def step(x, fwd): return cyc[(pos[x] + 1) % n] if fwd else cyc[(pos[x] - 1) % n]
+    def flip(t2, t4, fwd):
+        ij = (pos[t2], pos[t4]) if fwd else (pos[t4], pos[t2])
+        _reverse(cyc, pos, *ij); return ij
+    def chain(t1, t2, t3, fwd):
+        g = d(t1, t2); flips = []; best = 0.0; keep = 0; added = set(); touched = [t1, t2]
+        while True:
+            t4 = step(t3, not fwd); g += d(t3, t4) - d(t2, t3)
+            added.add((min(t2, t3), max(t2, t3))); flips.append(flip(t2, t4, fwd)); touched += (t3, t4)
+            fwd = step(t1, True) == t4
+            if g - d(t4, t1) > best + EPS: best = g - d(t4, t1); keep = len(flips)
+            if len(flips) >= depth: break
+            t2 = t4; t3 = None; look = -math.inf
+            for c in nb[t2]:
+                dc = d(t2, c)
+                if g - dc <= EPS: break
+                if c == t1 or c == step(t2, fwd): continue
+                e = step(c, not fwd)
+                if (min(c, e), max(c, e)) in added: continue
+                if d(c, e) - dc > look: look = d(c, e) - dc; t3 = c
+            if t3 is None: break
+        for ij in reversed(flips[keep:]): _reverse(cyc, pos, *ij)
+        return touched[:2 * keep + 2] if keep else None
+    active = list(range(n)); flag = bytearray(b"\1" * n); moves = 0
+    while active:
+        if budget and budget.expired(): break
+        t1 = active.pop(); flag[t1] = 0; done = None
+        for fwd in (True, False):
+            t2 = step(t1, fwd); g = d(t1, t2)
+            for t3 in nb[t2]:
+                if g - d(t2, t3) <= EPS: break
+                if t3 == t1 or t3 == step(t2, fwd): continue
+                done = chain(t1, t2, t3, fwd)
+                if done: break
+            if done: break
+        if done:
+            moves += 1
+            for x in done:
+                if not flag[x]: flag[x] = 1; active.append(x)
+    if budget: budget.tally(lk_moves=moves)
+    return cyc + [cyc[0]]
+
+def or_opt(m, tour, nb, max_seg=3, budget=None):
+    cyc = tour[:-1]; n = len(cyc)
+    if n < 5: return tour
+    d = m.d; sym = m.symmetric; improved = True; pos = [0] * n; moves = 0
+    for k, u in enumerate(cyc): pos[u] = k
+    while improved:
+        improved = False
+        for L in range(1, max_seg + 1):
+            i = 0
+            while i < n:
+                if budget and budget.expired(): budget.tally(or_opt_moves=moves); return cyc + [cyc[0]]
+                seg = [cyc[(i + k) % n] for k in range(L)]
+                s1, s2 = seg[0], seg[-1]; p = cyc[(i - 1) % n]; q = cyc[(i + L) % n]
+                gain = d(p, s1) + d(s2, q) - d(p, q)
+                if gain <= EPS: i += 1; continue
+                inseg = set(seg); best = None
+                for c in set(nb[s1]) | set(nb[s2]):
+                    if c in inseg or c == p: continue
+                    e = cyc[(pos[c] + 1) % n]
+                    if e in inseg: continue
+                    add = d(c, s1) + d(s2, e) - d(c, e)
+                    if add < gain - EPS and (best is None or add < best[0]): best = (add, c, False)
+                    if sym:
+                        add = d(c, s2) + d(s1, e) - d(c, e)
+                        if add < gain - EPS and (best is None or add < best[0]): best = (add, c, True)
+                if best is None: i += 1; continue
+                _, c, rev = best
+                rest = [x for x in cyc if x not in inseg]; k = rest.index(c) + 1
+                cyc = rest[:k] + (seg[::-1] if rev else seg) + rest[k:]
+                for k, u in enumerate(cyc): pos[u] = k
+                improved = True; moves += 1
+    if budget: budget.tally(or_opt_moves=moves)
+    return cyc + [cyc[0]]
+
+def local_search(m, tour, nb, budget=None):
+    cost = tour_cost(m, tour)
+    while True:
+        tour = two_opt(m, tour, nb, budget)
+        tour = or_opt(m, lin_kernighan(m, tour, nb, budget=budget), nb, budget=budget)
+        new = tour_cost(m, tour)
+        if new >= cost - EPS or (budget and budget.stopped): return tour
+        cost = new
+
+def _rotate(tour, start):
+    cyc = tour[:-1]
+    if start not in cyc: return tour
+    k = cyc.index(start); cyc = cyc[k:] + cyc[:k]
+    return cyc + [start]
+
+# --- GIAO DIỆN CHÍNH ---
+# budget (model.Budget): hết giờ / bị hủy thì trả về tour tốt nhất đang có — Held-Karp
+# dở dang được thay bằng tour láng giềng gần nhất, tối ưu cục bộ dừng ở bước hiện tại.
+def solve(graph, start=0, metric=GRAPH, construct=NN, exact_limit=EXACT_LIMIT, neighbors=NEIGHBORS, budget=None):
+    N = graph.nodes
+    if not (0 <= start < len(N) and N.alive[start]): return None, math.inf   # đỉnh xuất phát đã xóa / không có
+    if N.dead:
+        # Có đỉnh đã xóa: giải trên bản sao dồn chỉ số, đổi tour về id gốc
+        g, keep = graph.dense()
+        tour, cost = solve(g, keep.index(start), metric, construct, exact_limit, neighbors, budget)
+        return ([keep[v] for v in tour] if tour else tour), cost
+    m = Metric(graph, metric, budget); n = m.n
+    if n == 0: return None, math.inf
+    if n == 1: return [0, 0], 0.0
+    tour = None
+    if n <= exact_limit:
+        try: tour, _ = held_karp(m, budget)
+        except _Stop: pass
+    if tour is None:
+        nb = m.neighbor_lists(neighbors)
+        if n <= exact_limit: tour = nearest_neighbor(m, start, nb)
+        elif construct == GREEDY and m.symmetric: tour = greedy(m, nb)
+        elif construct == CHRISTOFIDES and m.symmetric: tour = christofides(graph, m, nb)
+        else: tour = nearest_neighbor(m, start, nb)
+        if not (budget and budget.stopped): tour = local_search(m, tour, nb, budget)
+    tour = _rotate(tour, start); cost = tour_cost(m, tour)
+    if cost >= m.missing: return None, math.inf
+    return tour, cost
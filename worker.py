@@ -0,0 +1,119 @@
+import threading
+import time
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from model import Graph, Budget
+import instrument
+
+# =======================================================================================
+# CHẠY THUẬT TOÁN NGOÀI LUỒNG GIAO DIỆN
+# - ThreadPoolExecutor: việc I/O (đọc / ghi file).
+# - ProcessPoolExecutor: thuật toán nặng CPU (tránh GIL). Đồ thị được chụp bằng to_dict()
+#   và dựng lại trong tiến trình con; cờ hủy (multiprocessing.Event) và tiến độ
+#   (multiprocessing.Value) dùng chung được truyền qua initializer.
+# Kết quả được đưa về luồng Tk bằng root.after() thăm dò Future — không gọi Tk từ luồng khác.
+# Mỗi lần chạy đi qua instrument.run; STATS_KEEP lần gần nhất được giữ trong Worker.stats.
+# =======================================================================================
+POLL_MS = 50
+STATS_KEEP = 50
+_CANCEL = None
+_PROGRESS = None
+
+def _init(event, progress):
+    global _CANCEL, _PROGRESS
+    _CANCEL, _PROGRESS = event, progress
+
+# Giá trị tiến độ khi chạy bằng luồng (cùng giao diện .value với multiprocessing.Value)
+class _Value:
+    def __init__(self): self.value = 0.0
+
+# fn(graph, *args, budget=..., **kw): phương thức Graph (Graph.bfs, ...) hoặc hàm cấp module (tsp.solve)
+def _call(snapshot, fn, args, kw, seconds, event=None, progress=None, name=None, profile=False):
+    g = Graph(); g.from_dict(snapshot)
+    prog = progress if progress is not None else _PROGRESS
+    def report(f): prog.value = f
+    b = Budget(seconds, event=event if event is not None else _CANCEL, progress=report if prog is not None else None)
+    res, st = instrument.run(fn, g, *args, budget=b, profile=profile, name=name, **kw)
+    return res, b.timed_out, b.cancelled, st
+
+class Job:
+    def __init__(self, name, future, on_done, on_error):
+        self.name = name; self.future = future; self.on_done = on_done; self.on_error = on_error
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self): return time.monotonic() - self.started
+
+class Worker:
+    def __init__(self, root, processes=True):
+        self.root = root; self.processes = processes
+        self.io_pool = ThreadPoolExecutor(max_workers=2)
+        self.cpu_pool = None; self.event = None; self.progress = None
+        self.job = None; self.io_jobs = []; self._polling = False
+        self.stats = deque(maxlen=STATS_KEEP)
+
+    @property
+    def busy(self): return self.job is not None
+
+    def _cpu(self):
+        if self.cpu_pool is None:
+            if self.processes:
+                try:
+                    self.event = mp.Event(); self.progress = mp.Value('d', 0.0, lock=False)
+                    self.cpu_pool = ProcessPoolExecutor(max_workers=1, initializer=_init, initargs=(self.event, self.progress))
+                    return self.cpu_pool
+                except (OSError, ImportError, NotImplementedError): self.processes = False
+            # Không tạo được tiến trình con: dùng luồng, vẫn hủy được qua threading.Event
+            self.event = threading.Event(); self.progress = _Value(); self.cpu_pool = ThreadPoolExecutor(max_workers=1)
+        return self.cpu_pool
+
+    # Chạy thuật toán trên bản chụp của graph; on_done(result, timed_out, cancelled) chạy trên luồng Tk.
+    # profile=True: chạy dưới cProfile, bảng kết quả nằm trong Stats.profile
+    def run(self, name, graph, fn, args=(), kw=None, seconds=None, on_done=None, on_error=None, profile=False):
+        if self.job: return False
+        pool = self._cpu(); self.event.clear(); self.progress.value = 0.0
+        ev, prog = (None, None) if self.processes else (self.event, self.progress)
+        fut = pool.submit(_call, graph.to_dict(), fn, tuple(args), kw or {}, seconds, ev, prog, name, profile)
+        self.job = Job(name, fut, on_done, on_error); self._poll_soon()
+        return True
+
+    # Việc I/O: on_done(result) chạy trên luồng Tk
+    def io(self, name, fn, *args, on_done=None, on_error=None):
+        self.io_jobs.append(Job(name, self.io_pool.submit(fn, *args), on_done, on_error)); self._poll_soon()
+
+    # Tiến độ 0..1 do thuật toán đang chạy báo qua Budget.report (0 nếu không báo)
+    @property
+    def fraction(self): return self.progress.value if self.job and self.progress is not None else 0.0
+
+    def cancel(self):
+        if self.job and self.event is not None: self.event.set()
+
+    def _poll_soon(self):
+        if not self._polling: self._polling = True; self.root.after(POLL_MS, self._poll)
+
+    def _finish(self, job, cpu):
+        try: res = job.future.result()
+        except Exception as e:
+            if job.on_error: job.on_error(e)
+            return
+        if cpu: self.stats.append(res[3]); res = res[:3]
+        if job.on_done: job.on_done(*res) if cpu else job.on_done(res)
+
+    # Gọi lại có thể mở popup (vòng lặp sự kiện lồng nhau) hoặc chạy thuật toán tiếp theo,
+    # nên cập nhật trạng thái và hẹn lần thăm dò kế tiếp trước khi gọi lại.
+    def _poll(self):
+        self._polling = False
+        done = [j for j in self.io_jobs if j.future.done()]
+        self.io_jobs = [j for j in self.io_jobs if j not in done]
+        job = self.job if self.job and self.job.future.done() else None
+        if job: self.job = None
+        if self.job or self.io_jobs: self._poll_soon()
+        for j in done: self._finish(j, False)
+        if job: self._finish(job, True)
+
+    def shutdown(self):
+        self.cancel()
+        self.io_pool.shutdown(wait=False)
+        if self.cpu_pool: self.cpu_pool.shutdown(wait=False, cancel_futures=True)